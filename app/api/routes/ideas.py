@@ -2,23 +2,30 @@
 Ideas API routes.
 RESTful endpoints for idea processing with RAG capabilities.
 """
+import asyncio
+import hashlib
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, HTTPException, status
+import orjson
+from fastapi import APIRouter, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from app.api.schemas import (
+    DeleteMemoryResponse,
     IdeaRequest,
     IdeaResponse,
-    IdeaErrorResponse,
     MemoryItem,
     MemoryResponse,
     MemoryStatsResponse,
     ErrorResponse,
 )
-from app.services.idea_service import process_idea
-from app.rag.retriever import get_all_memories, get_memory_stats, delete_idea
+from app.services.idea_service import process_idea_async, semantic_cache, stream_idea_async
+from app.rag.retriever import get_all_memories, get_memory_stats, delete_idea, session_prefetcher
 from app.core.exceptions import RAGException
+from app.core.response_cache import response_cache
+from app.rag.embed_batcher import embed_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -36,63 +43,143 @@ router = APIRouter()
     summary="Process a new idea",
     description="Transform a raw thought into structured output using RAG",
 )
-def submit_idea(request: IdeaRequest) -> dict[str, Any]:
+async def submit_idea(
+    request: IdeaRequest,
+    x_session_id: str | None = Header(
+        default=None,
+        max_length=128,
+        description="Client session ID; enables related-idea prefetching for follow-ups",
+    ),
+    x_user_id: str | None = Header(
+        default=None,
+        max_length=128,
+        description="User ID; ideas are stored under it and recall only searches its ideas",
+    ),
+) -> IdeaResponse:
     """
     Process a raw thought and transform it into structured output.
 
     Uses RAG to find related past ideas and enhance the response.
     Optionally stores the idea in vector memory for future recall.
+    Identical requests are answered from the response cache.
     """
-    try:
-        result = process_idea(
-            raw_text=request.content,
-            store_in_memory=request.store_in_memory,
-        )
-
-        # Check if result contains error
-        if "error" in result:
-            return result
-
-        return result
-
-    except RAGException as e:
-        logger.error(f"RAG error processing idea: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"error": "rag_error", "message": str(e)},
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error processing idea: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"error": "internal_error", "message": "Failed to process idea"},
-        )
+    user_id = x_user_id or None
+    cache_key = response_cache.make_key(
+        "idea", request.content, request.store_in_memory, x_user_id or ""
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await process_idea_async(
+        raw_text=request.content,
+        store_in_memory=request.store_in_memory,
+        session_id=x_session_id,
+        user_id=user_id,
+    )
+    response_cache.set(cache_key, result)
+    return result
+
+
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Server-Sent Events stream", "content": {"text/event-stream": {}}},
+        422: {"description": "Validation error", "model": ErrorResponse},
+    },
+    summary="Process a new idea (streaming)",
+    description="Stream LLM output as Server-Sent Events, ending with the structured result",
+)
+async def stream_idea(
+    request: IdeaRequest,
+    x_session_id: str | None = Header(
+        default=None,
+        max_length=128,
+        description="Client session ID; enables related-idea prefetching for follow-ups",
+    ),
+    x_user_id: str | None = Header(
+        default=None,
+        max_length=128,
+        description="User ID; ideas are stored under it and recall only searches its ideas",
+    ),
+) -> StreamingResponse:
+    """
+    Process a raw thought and stream the LLM output as it is generated.
+
+    Emits `data: {"delta": ...}` events for each token, then a terminal
+    `event: result` (or `event: error`) carrying the structured output.
+    """
+    user_id = x_user_id or None
+    cache_key = response_cache.make_key(
+        "idea", request.content, request.store_in_memory, x_user_id or ""
+    )
+
+    async def event_generator() -> AsyncIterator[str]:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield _sse(cached, event="result")
+            return
+
+        try:
+            async for event, data in stream_idea_async(
+                raw_text=request.content,
+                store_in_memory=request.store_in_memory,
+                session_id=x_session_id,
+                user_id=user_id,
+            ):
+                if event == "result":
+                    response_cache.set(cache_key, data)
+                    yield _sse(data, event="result")
+                else:
+                    yield _sse(data)
+        except RAGException as e:
+            # Headers are already sent, so the global handler can't answer
+            logger.error("RAG error streaming idea: %s", e)
+            yield _sse({"error": e.error_type, "message": e.message}, event="error")
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def _sse(data: dict[str, Any] | BaseModel, event: str | None = None) -> str:
+    """Format a Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    payload = data.model_dump_json() if isinstance(data, BaseModel) else orjson.dumps(data).decode()
+    return f"{prefix}data: {payload}\n\n"
 
 
 @router.get(
     "/memory",
     response_model=MemoryResponse,
-    summary="Get all stored memories",
-    description="Retrieve all ideas stored in vector memory (debug endpoint)",
+    summary="Get stored memories",
+    description="Retrieve a page of ideas stored in vector memory (debug endpoint)",
     tags=["Debug"],
 )
-def read_memory() -> dict[str, Any]:
+def read_memory(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum memories to return"),
+    offset: int = Query(0, ge=0, le=10_000, description="Number of memories to skip"),
+) -> Any:
     """
-    Retrieve all stored ideas from vector memory.
+    Retrieve a page of stored ideas from vector memory.
 
     This is primarily a debug/admin endpoint for inspecting stored data.
+    Supports conditional requests via ETag / If-None-Match.
     """
-    try:
-        memories = get_all_memories()
-        return {
-            "count": len(memories),
-            "memories": memories,
-        }
-    except RAGException as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"error": "vector_store_error", "message": str(e)},
-        )
+    memories = get_all_memories(limit=limit, offset=offset)
+    etag = _make_etag({
+        "page": [limit, offset],
+        "ids": [m["id"] for m in memories],
+        "ts": max((m["metadata"].get("created_at", "") for m in memories), default=""),
+    })
+    not_modified = _conditional(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return {
+        "count": len(memories),
+        "memories": memories,
+    }
 
 
 @router.get(
@@ -102,40 +189,68 @@ def read_memory() -> dict[str, Any]:
     description="Get statistics about the vector memory store",
     tags=["Debug"],
 )
-def get_stats() -> dict[str, Any]:
+def get_stats(request: Request, response: Response) -> Any:
     """
     Get statistics about the vector memory store.
 
-    Returns total count, embedding provider info, and health status.
+    Returns total count, embedding provider info, health status and
+    response, embedding and prefetch cache counters. Supports conditional requests
+    via ETag / If-None-Match.
     """
-    try:
-        return get_memory_stats()
-    except RAGException as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"error": "vector_store_error", "message": str(e)},
-        )
+    stats = get_memory_stats()
+    stats["response_cache"] = response_cache.stats()
+    stats["embed_cache"] = embed_batcher.stats()
+    stats["prefetch"] = session_prefetcher.stats()
+    not_modified = _conditional(request, response, _make_etag(stats))
+    if not_modified is not None:
+        return not_modified
+    return stats
+
+
+MEMORY_CACHE_CONTROL = "private, max-age=10"
+
+
+def _make_etag(data: Any) -> str:
+    """Build a strong ETag from JSON-serializable data."""
+    digest = hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
+    return f'"{digest}"'
+
+
+def _conditional(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Set caching headers and answer 304 when the client already has this version.
+
+    Returns:
+        A 304 response if If-None-Match matches, otherwise None
+    """
+    headers = {"ETag": etag, "Cache-Control": MEMORY_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
 
 
 @router.delete(
     "/memory/{doc_id}",
-    response_model=dict,
+    response_model=DeleteMemoryResponse,
     summary="Delete a memory",
     description="Delete a specific idea from vector memory",
     tags=["Debug"],
 )
-def remove_memory(doc_id: str) -> dict[str, Any]:
+async def remove_memory(doc_id: str) -> dict[str, Any]:
     """
     Delete a specific idea from vector memory by its ID.
 
+    Cached responses referencing the deleted idea are invalidated and
+    session prefetch pools are dropped.
+
     Args:
         doc_id: The document ID to delete
     """
-    try:
-        success = delete_idea(doc_id)
-        return {"success": success, "deleted_id": doc_id}
-    except RAGException as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"error": "vector_store_error", "message": str(e)},
-        )
+    success = await asyncio.to_thread(delete_idea, doc_id)
+    response_cache.invalidate_doc(doc_id)
+    semantic_cache.invalidate_doc(doc_id)
+    session_prefetcher.clear()
+    return {"success": success, "deleted_id": doc_id}
@@ -3,13 +3,16 @@ Tasks API routes.
 RESTful endpoints for task extraction from text.
 """
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, HTTPException, status
+import orjson
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 from app.api.schemas import TaskExtractRequest, TaskExtractResponse, ErrorResponse
-from app.services.task_service import extract_tasks
+from app.services.task_service import extract_tasks_async, extract_tasks_stream
 from app.core.exceptions import RAGException
+from app.core.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -27,27 +30,74 @@ router = APIRouter()
     summary="Extract tasks from text",
     description="Identify and extract actionable tasks from raw text input",
 )
-def extract_tasks_endpoint(request: TaskExtractRequest) -> dict[str, Any]:
+async def extract_tasks_endpoint(request: TaskExtractRequest) -> dict[str, Any]:
     """
     Extract actionable tasks from raw text input.
 
     Uses LLM to identify specific, doable tasks and assign priority levels.
+    Identical requests are answered from the response cache. A failed
+    extraction answers 503 and is not cached.
     """
-    try:
-        tasks = extract_tasks(request.content)
-        return {
-            "count": len(tasks),
-            "tasks": tasks,
-        }
-    except RAGException as e:
-        logger.error(f"Task extraction failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"error": "llm_error", "message": str(e)},
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error in task extraction: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"error": "internal_error", "message": "Failed to extract tasks"},
-        )
+    cache_key = response_cache.make_key("tasks", request.content)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    tasks = await extract_tasks_async(request.content, strict=True)
+    result = {
+        "count": len(tasks),
+        "tasks": tasks,
+    }
+    response_cache.set(cache_key, result)
+    return result
+
+
+@router.post(
+    "/extract/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Server-Sent Events stream", "content": {"text/event-stream": {}}},
+        422: {"description": "Validation error", "model": ErrorResponse},
+    },
+    summary="Extract tasks from text (streaming)",
+    description="Stream each task as Server-Sent Events as soon as it is extracted",
+)
+async def stream_tasks_endpoint(request: TaskExtractRequest) -> StreamingResponse:
+    """
+    Extract tasks and stream each one as soon as the model has emitted it.
+
+    Emits `data: {"task": ...}` events, then a terminal `event: result`
+    (or `event: error`) carrying the same body as `/extract`.
+    """
+    cache_key = response_cache.make_key("tasks", request.content)
+
+    async def event_generator() -> AsyncIterator[str]:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            for task in cached["tasks"]:
+                yield _sse({"task": task})
+            yield _sse(cached, event="result")
+            return
+
+        tasks = []
+        try:
+            async for task in extract_tasks_stream(request.content):
+                tasks.append(task)
+                yield _sse({"task": task})
+        except RAGException as e:
+            # Headers are already sent, so the global handler can't answer
+            logger.error("Error streaming tasks: %s", e)
+            yield _sse({"error": e.error_type, "message": e.message}, event="error")
+            return
+
+        result = {"count": len(tasks), "tasks": tasks}
+        response_cache.set(cache_key, result)
+        yield _sse(result, event="result")
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def _sse(data: dict[str, Any], event: str | None = None) -> str:
+    """Format a Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode()}\n\n"
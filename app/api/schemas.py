@@ -2,10 +2,22 @@
 Pydantic schemas for API requests and responses.
 Provides type-safe, documented models for the RESTful API.
 """
+import re
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Control characters other than tab/newline/carriage return only show up in
+# binary payloads (pydantic already rejects lone surrogates)
+_JUNK_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _reject_junk(value: str) -> str:
+    """Reject content that looks binary before it reaches embedding/LLM calls."""
+    if _JUNK_CHARS.search(value):
+        raise ValueError("content contains binary or control characters")
+    return value
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -14,6 +26,9 @@ from pydantic import BaseModel, Field
 
 class IdeaRequest(BaseModel):
     """Request body for submitting a new idea."""
+    # Stripping runs before min_length, so all-whitespace content is rejected
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     content: str = Field(
         ...,
         min_length=1,
@@ -26,9 +41,13 @@ class IdeaRequest(BaseModel):
         description="Whether to store this idea for future recall",
     )
 
+    _check_content = field_validator("content")(_reject_junk)
+
 
 class TaskExtractRequest(BaseModel):
     """Request body for extracting tasks from text."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     content: str = Field(
         ...,
         min_length=1,
@@ -37,6 +56,8 @@ class TaskExtractRequest(BaseModel):
         examples=["Need to buy groceries, call the dentist, and finish the report by Friday"],
     )
 
+    _check_content = field_validator("content")(_reject_junk)
+
 
 # ─────────────────────────────────────────────────────────────────
 # Response Schemas
@@ -67,13 +88,10 @@ class IdeaResponse(BaseModel):
         default=0,
         description="Number of related ideas found",
     )
-
-
-class IdeaErrorResponse(BaseModel):
-    """Error response from idea processing."""
-    error: str
-    raw_output: str | None = None
-    context_used: bool = False
+    memory_id: str | None = Field(
+        default=None,
+        description="ID of the stored memory, if the idea was stored",
+    )
 
 
 class TaskExtractResponse(BaseModel):
@@ -91,8 +109,8 @@ class MemoryItem(BaseModel):
 
 class MemoryResponse(BaseModel):
     """Response from memory retrieval."""
-    count: int = Field(..., description="Total number of stored memories")
-    memories: list[MemoryItem] = Field(..., description="List of stored memories")
+    count: int = Field(..., description="Number of memories in this page")
+    memories: list[MemoryItem] = Field(..., description="Page of stored memories")
 
 
 class MemoryStatsResponse(BaseModel):
@@ -101,6 +119,23 @@ class MemoryStatsResponse(BaseModel):
     embedding_provider: str
     embedding_dimension: int
     health: dict[str, Any]
+    response_cache: dict[str, int] = Field(default_factory=dict)
+    embed_cache: dict[str, int] = Field(default_factory=dict)
+    prefetch: dict[str, int] = Field(default_factory=dict)
+
+
+class DeleteMemoryResponse(BaseModel):
+    """Response from memory deletion."""
+    success: bool
+    deleted_id: str
+
+
+class RootResponse(BaseModel):
+    """API root response."""
+    message: str
+    version: str
+    docs: str
+    health: str
 
 
 class HealthResponse(BaseModel):
@@ -23,6 +23,13 @@ class Settings(BaseSettings):
     # ─────────────────────────────────────────────────────────────
     groq_api_key: str
     groq_model: str = "llama-3.3-70b-versatile"
+    # Task extraction is a narrow JSON job; a small model does it for a fraction of the cost
+    task_extract_model: str = "llama-3.1-8b-instant"
+    llm_max_concurrency: int = 8
+    llm_acquire_timeout_s: float = 2.0
+    # Provider rate limits applied to `run_llm_batch`; 0 disables a limit
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
 
     # ─────────────────────────────────────────────────────────────
     # Voyage AI Configuration (Embedding Provider)
@@ -36,16 +43,72 @@ class Settings(BaseSettings):
     # ─────────────────────────────────────────────────────────────
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = True
     qdrant_api_key: str = ""
     qdrant_collection_name: str = "ideas"
+    collection_info_ttl_s: float = 2
+    qdrant_int8_quantization: bool = True
+    qdrant_vectors_on_disk: bool = False
+    point_id_worker: int | None = None
 
     # ─────────────────────────────────────────────────────────────
     # RAG Configuration
     # ─────────────────────────────────────────────────────────────
     rag_top_k: int = 5
     rag_score_threshold: float = 0.7
+    rag_inmemory_fallback: bool = False
+    rag_inmemory_max_points: int = 10000
     llm_temperature: float = 0.3
     llm_max_tokens: int = 1024
+    # Constrain task extraction to a JSON schema (only on Groq models that support it)
+    task_json_schema: bool = False
+    # Skip the LLM for short thoughts and ones without an action cue ("buy", "need to", ...)
+    task_prefilter: bool = False
+
+    # ─────────────────────────────────────────────────────────────
+    # Startup Configuration
+    # ─────────────────────────────────────────────────────────────
+    warmup_on_startup: bool = True
+    warmup_timeout_s: float = 10
+
+    # ─────────────────────────────────────────────────────────────
+    # Prompt Configuration
+    # ─────────────────────────────────────────────────────────────
+    prompt_hot_reload: bool = False
+
+    # ─────────────────────────────────────────────────────────────
+    # Batching Configuration
+    # ─────────────────────────────────────────────────────────────
+    embed_batch_max_size: int = 64
+    embed_batch_max_wait_ms: float = 10
+    search_batch_max_size: int = 32
+    search_batch_max_wait_ms: float = 5
+    upsert_batch_max_size: int = 64
+    upsert_batch_max_wait_ms: float = 20
+
+    # ─────────────────────────────────────────────────────────────
+    # Cache Configuration
+    # ─────────────────────────────────────────────────────────────
+    semantic_cache_threshold: float = 0.97
+    semantic_cache_max_entries: int = 4096
+    embed_cache_max_entries: int = 10000
+    embed_cache_ttl_s: float = 600
+    search_cache_max_entries: int = 4096
+    # Bounds staleness from stores made by other workers
+    search_cache_ttl_s: float = 600
+    task_cache_max_entries: int = 1024
+    task_cache_ttl_s: float = 3600
+    # Reuse tasks of thoughts differing only in numbers, times, quotes or URLs
+    task_template_cache: bool = False
+    # Second tier for paraphrased thoughts, kept in its own Qdrant collection
+    task_semantic_cache: bool = False
+    task_semantic_cache_threshold: float = 0.92
+    task_semantic_cache_ttl_s: float = 3600
+    task_cache_collection_name: str = "task_cache"
+    prefetch_pool_factor: int = 3
+    prefetch_anchor_similarity: float = 0.8
+    prefetch_ttl_s: float = 60
 
     @property
     def active_embedding_dim(self) -> int:
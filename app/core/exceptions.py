@@ -8,6 +8,9 @@ from fastapi import HTTPException, status
 class RAGException(Exception):
     """Base exception for RAG-related errors."""
 
+    # Error type identifier returned in API error responses
+    error_type = "rag_error"
+
     def __init__(self, message: str, details: dict | None = None):
         self.message = message
         self.details = details or {}
@@ -16,22 +19,27 @@ class RAGException(Exception):
 
 class EmbeddingError(RAGException):
     """Raised when embedding generation fails."""
-    pass
+    error_type = "embedding_error"
 
 
 class LLMError(RAGException):
     """Raised when LLM inference fails."""
+    error_type = "llm_error"
+
+
+class LLMSaturatedError(LLMError):
+    """Raised when all LLM concurrency slots are busy."""
     pass
 
 
 class VectorStoreError(RAGException):
     """Raised when vector store operations fail."""
-    pass
+    error_type = "vector_store_error"
 
 
 class ConfigurationError(RAGException):
     """Raised when configuration is invalid."""
-    pass
+    error_type = "configuration_error"
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -0,0 +1,73 @@
+"""
+Shared HTTP clients.
+Pooled HTTP/2 clients reused by the embedding and LLM services, so
+connections (and their TLS sessions) survive across requests.
+"""
+import ssl
+import threading
+from functools import lru_cache
+
+import certifi
+import httpx
+
+_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30.0,
+)
+
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """
+    SSL context shared by every client.
+
+    Building one loads the CA bundle from disk (~10 ms), so clients
+    recreated after a close reuse this one instead of building their own.
+    """
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+_CLIENT: httpx.AsyncClient | None = None
+_SYNC_CLIENT: httpx.Client | None = None
+_SYNC_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared async HTTP client."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            http2=True, verify=_ssl_context(), limits=_LIMITS, timeout=30.0
+        )
+    return _CLIENT
+
+
+def get_sync_http_client() -> httpx.Client:
+    """
+    Get or create the shared sync HTTP client (used by the sync code paths).
+
+    The sync paths run in worker threads, so creation is locked to avoid
+    opening duplicate connection pools.
+    """
+    global _SYNC_CLIENT
+    client = _SYNC_CLIENT
+    if client is None or client.is_closed:
+        with _SYNC_CLIENT_LOCK:
+            if _SYNC_CLIENT is None or _SYNC_CLIENT.is_closed:
+                _SYNC_CLIENT = httpx.Client(
+                    http2=True, verify=_ssl_context(), limits=_LIMITS, timeout=30.0
+                )
+            client = _SYNC_CLIENT
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients and release pooled connections."""
+    global _CLIENT, _SYNC_CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+    if _SYNC_CLIENT is not None:
+        _SYNC_CLIENT.close()
+        _SYNC_CLIENT = None
@@ -0,0 +1,51 @@
+"""
+Logging configuration.
+Routes application log records through a queue so handler I/O happens on a
+background thread instead of the request path.
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: QueueListener | None = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Attach a QueueHandler to the root logger and start its listener.
+
+    Uvicorn's own loggers keep their handlers and don't propagate, so the
+    access log is unaffected.
+
+    Args:
+        level: Root logger level
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the listener and detach the queue handler."""
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(handler)
+    _listener = None
@@ -0,0 +1,79 @@
+"""
+Exact-match response cache.
+Stores final API responses keyed by a SHA-256 digest of the request content.
+"""
+import copy
+import hashlib
+from typing import Any
+
+from cachetools import TTLCache
+
+
+def memory_id_of(response: Any) -> str | None:
+    """Return the stored memory ID a cached response (dict or model) refers to."""
+    if isinstance(response, dict):
+        return response.get("memory_id")
+    return getattr(response, "memory_id", None)
+
+
+class ResponseCache:
+    """
+    Process-local TTL cache for final responses (dicts or Pydantic models).
+
+    Only touched from the event loop (async routes), so no lock is needed:
+    every operation completes without yielding control.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 3600):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def make_key(namespace: str, content: str, *parts: Any) -> str:
+        """Build a cache key from a namespace, request content and extra parts."""
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        return ":".join([namespace, digest, *(str(p) for p in parts)])
+
+    def get(self, key: str) -> Any | None:
+        """Return a copy of the cached response, or None on a miss."""
+        value = self._cache.get(key)
+        if value is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Cache a copy of the response."""
+        self._cache[key] = copy.deepcopy(value)
+
+    def invalidate_doc(self, doc_id: str) -> int:
+        """
+        Drop cached responses that reference a stored memory.
+
+        Args:
+            doc_id: The document ID that was deleted
+
+        Returns:
+            Number of entries removed
+        """
+        stale = [k for k, v in self._cache.items() if memory_id_of(v) == doc_id]
+        for key in stale:
+            self._cache.pop(key, None)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+        }
+
+
+response_cache = ResponseCache()
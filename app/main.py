@@ -2,6 +2,7 @@
 Main FastAPI application entry point.
 Configures the application with all routes, middleware, and lifecycle events.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import Any
@@ -11,15 +12,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.router import router
-from app.api.schemas import HealthResponse
+from app.api.schemas import HealthResponse, RootResponse
 from app.core.config import get_settings
 from app.core.exceptions import RAGException
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+from app.core.http import close_http_client, get_http_client
+from app.core.logging import setup_logging, shutdown_logging
+from app.rag.embed_batcher import embed_batcher
+from app.rag.task_cache import close_task_store
+from app.rag.retriever import (
+    close_vector_store,
+    get_vector_store,
+    search_batcher,
+    session_prefetcher,
+    upsert_batcher,
 )
+from app.services.embedding_service import get_embedding_service
+from app.services.llm_service import get_async_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,16 +36,85 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifecycle management."""
     # Startup
+    setup_logging()
     logger.info("Starting Personal AI Assistant API...")
     settings = get_settings()
-    logger.info(f"Using embedding provider: Voyage AI ({settings.voyage_embedding_model})")
-    logger.info(f"Using LLM model: Groq ({settings.groq_model})")
-    logger.info(f"Qdrant host: {settings.qdrant_host}:{settings.qdrant_port}")
+    logger.info("Using embedding provider: Voyage AI (%s)", settings.voyage_embedding_model)
+    logger.info("Using LLM model: Groq (%s)", settings.groq_model)
+    logger.info("Qdrant host: %s:%s", settings.qdrant_host, settings.qdrant_port)
+
+    # Shared clients, created once and reused by every request
+    get_http_client()
+    app.state.embedding_service = get_embedding_service()
+    app.state.llm = get_async_client()
+    try:
+        app.state.vector_store = await asyncio.to_thread(get_vector_store)
+        app.state.qdrant = app.state.vector_store.aclient
+    except RAGException as e:
+        logger.warning("Vector store unavailable at startup: %s", e.message)
+        app.state.vector_store = None
+        app.state.qdrant = None
+
+    embed_batcher.start()
+    search_batcher.start()
+    upsert_batcher.start()
+
+    if settings.warmup_on_startup:
+        await _warmup(app)
 
     yield
 
     # Shutdown
     logger.info("Shutting down Personal AI Assistant API...")
+    await embed_batcher.stop()
+    await search_batcher.stop()
+    await upsert_batcher.stop()
+    await session_prefetcher.stop()
+    await close_vector_store()
+    await close_task_store()
+    await close_http_client()
+    shutdown_logging()
+
+
+async def _warmup(app: FastAPI) -> None:
+    """
+    Open connections to Voyage, Qdrant and Groq before the first real request.
+
+    Failures are only logged so startup still succeeds on dev boxes without
+    network access or a running Qdrant.
+    """
+    settings = get_settings()
+    probe = [1.0] + [0.0] * (settings.active_embedding_dim - 1)
+
+    calls = {
+        "voyage": app.state.embedding_service.embed_batch_async(["warmup"], input_type="query"),
+        "groq": app.state.llm.chat.completions.create(
+            model=settings.groq_model,
+            messages=[{"role": "user", "content": "."}],
+            max_tokens=1,
+        ),
+    }
+    if app.state.qdrant is not None:
+        calls["qdrant"] = app.state.qdrant.query_points(
+            collection_name=settings.qdrant_collection_name,
+            query=probe,
+            limit=1,
+        )
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*calls.values(), return_exceptions=True),
+            timeout=settings.warmup_timeout_s,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Warmup timed out after %ss", settings.warmup_timeout_s)
+        return
+
+    for name, result in zip(calls, results):
+        if isinstance(result, Exception):
+            logger.warning("Warmup of %s failed: %s", name, result)
+        else:
+            logger.info("Warmed up %s connection", name)
 
 
 # Initialize the FastAPI app with metadata
@@ -75,21 +153,34 @@ app.add_middleware(
 )
 
 
-# Global exception handler for RAG exceptions
+# Global exception handlers; routes let errors propagate here
 @app.exception_handler(RAGException)
 async def rag_exception_handler(request: Request, exc: RAGException):
-    """Handle RAG-related exceptions globally."""
-    logger.error(f"RAG Exception: {exc.message}")
+    """Map RAG-related exceptions to 503 with their error type."""
+    logger.error("%s on %s %s: %s", type(exc).__name__, request.method, request.url.path, exc.message)
     return JSONResponse(
         status_code=503,
         content={
-            "error": "rag_error",
+            "error": exc.error_type,
             "message": exc.message,
             "details": exc.details,
         },
     )
 
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Turn unexpected exceptions into a generic 500."""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path)
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": "internal_error",
+            "message": "An unexpected error occurred",
+        },
+    )
+
+
 # Include routers
 app.include_router(router)
 
@@ -97,6 +188,7 @@ app.include_router(router)
 # Root endpoint
 @app.get(
     "/",
+    response_model=RootResponse,
     summary="API Root",
     description="Welcome message and API information",
 )
@@ -117,7 +209,7 @@ def read_root() -> dict[str, Any]:
     summary="Health Check",
     description="Check the health status of all services",
 )
-def health_check() -> dict[str, Any]:
+def health_check(request: Request) -> dict[str, Any]:
     """
     Check health status of all dependent services.
 
@@ -131,8 +223,7 @@ def health_check() -> dict[str, Any]:
 
     # Check Qdrant
     try:
-        from app.rag.retriever import get_vector_store
-        vector_store = get_vector_store()
+        vector_store = getattr(request.app.state, "vector_store", None) or get_vector_store()
         services["qdrant"] = vector_store.health_check()
     except Exception as e:
         services["qdrant"] = {"status": "unhealthy", "error": str(e)}
@@ -1,13 +1,44 @@
-# app/prompts/prompts.py
-def load_prompt(prompt_file: str, **kwargs) -> str:
-    try:
-        with open(prompt_file, 'r') as file:
-            prompt = file.read()
+"""
+Prompt loading.
+Prompt files are read once and cached; `{{ key }}` placeholders are filled in
+a single regex pass. With `prompt_hot_reload` enabled, a file is re-read
+when its modification time changes.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
 
-        # Replace placeholders in the prompt with provided values (kwargs)
-        for key, value in kwargs.items():
-            prompt = prompt.replace(f"{{{{ {key} }}}}", value)
+from app.core.config import get_settings
 
+PROMPTS_DIR = Path(__file__).parent
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+@lru_cache(maxsize=64)
+def _read_prompt(prompt_file: str, mtime_ns: int | None = None) -> str:
+    # mtime_ns only keys the cache, so an edited file misses and is re-read
+    return (PROMPTS_DIR / prompt_file).read_text()
+
+
+def load_prompt(prompt_file: str, **kwargs: str) -> str:
+    """
+    Load a prompt template and fill its `{{ key }}` placeholders.
+
+    Args:
+        prompt_file: File name (or absolute path) of the prompt
+        **kwargs: Placeholder values; unknown placeholders are left as-is
+
+    Returns:
+        The rendered prompt
+
+    Raises:
+        FileNotFoundError: If the prompt file doesn't exist
+    """
+    mtime_ns = None
+    if get_settings().prompt_hot_reload:
+        mtime_ns = (PROMPTS_DIR / prompt_file).stat().st_mtime_ns
+    prompt = _read_prompt(prompt_file, mtime_ns)
+    if not kwargs:
         return prompt
-    except FileNotFoundError:
-        return "Prompt file not found."
+    return _PLACEHOLDER.sub(lambda m: str(kwargs.get(m.group(1), m.group(0))), prompt)
@@ -0,0 +1,97 @@
+"""
+Async micro-batching primitives.
+Coalesces concurrent requests arriving within a short window into one call.
+"""
+import asyncio
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Base class for request coalescing.
+
+    Callers `_enqueue` a request and await its future. A background worker
+    collects up to `max_batch` requests, waiting at most `max_wait_ms` after
+    the first one, then hands the batch to `_flush`. Subclasses implement
+    `_flush` and resolve every future in the batch.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background worker and fail any requests still queued."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{type(self).__name__} stopped"))
+        self._worker = None
+
+    async def _enqueue(self, *request: Any) -> Any:
+        """Queue a request and wait for its result."""
+        self.start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((*request, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Flush concurrently so a slow call doesn't stall the next batch
+            task = loop.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _fail(futures: list[asyncio.Future], error: Exception) -> None:
+        """Propagate a batch failure to every waiting caller."""
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    def _resolve(futures: list[asyncio.Future], results: list[Any]) -> None:
+        """Hand each waiting caller its own result."""
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,106 @@
+"""
+Embedding micro-batcher.
+Coalesces concurrent embedding requests into batched Voyage AI calls and
+remembers vectors for texts it has already embedded.
+"""
+import logging
+from typing import Literal
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.core.config import get_settings
+from app.core.exceptions import EmbeddingError
+from app.rag.batching import MicroBatcher
+from app.rag.similarity import normalize
+from app.services.embedding_service import embedding_cache_key, get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+InputType = Literal["query", "document"]
+
+
+class EmbedBatcher(MicroBatcher):
+    """
+    Collects embedding requests arriving within a short window and sends
+    them to Voyage AI as a single batch, resolving each caller's future
+    with its own vector.
+
+    Queries and documents use different Voyage input types, so each batch
+    is split by input type before calling the API. Vectors are cached by
+    `embedding_cache_key` as read-only, L2-normalized float32 arrays, so
+    repeated texts never leave the process.
+    """
+
+    def __init__(self, max_batch: int = 64, max_wait_ms: float = 10, cache_size: int = 10000):
+        super().__init__(max_batch, max_wait_ms)
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def submit(self, text: str, input_type: InputType = "query") -> np.ndarray:
+        """
+        Return a cached vector or queue the text for embedding.
+
+        Args:
+            text: The text to embed
+            input_type: Voyage input type ("query" or "document")
+
+        Returns:
+            The L2-normalized embedding vector (read-only float32 array)
+        """
+        key = embedding_cache_key(text, input_type)
+        vector = self._cache.get(key)
+        if vector is not None:
+            self.cache_hits += 1
+            return vector
+        self.cache_misses += 1
+        return await self._enqueue(key, text, input_type)
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        groups: dict[InputType, dict[bytes, tuple[str, list]]] = {}
+        for key, text, input_type, future in batch:
+            # Identical texts in one window share a single API slot
+            _, futures = groups.setdefault(input_type, {}).setdefault(key, (text, []))
+            futures.append(future)
+
+        embedding_service = get_embedding_service()
+        for input_type, items in groups.items():
+            texts = [text for text, _ in items.values()]
+            try:
+                vectors = await embedding_service.embed_batch_async(texts, input_type=input_type)
+            except Exception as e:
+                logger.error("Batched embedding of %s texts failed: %s", len(texts), e)
+                self._fail([f for _, futures in items.values() for f in futures], e)
+                continue
+
+            if len(vectors) != len(items):
+                # Vectors can't be matched to texts, so no caller gets one
+                logger.error("Voyage AI returned %s vectors for %s texts", len(vectors), len(items))
+                self._fail(
+                    [f for _, futures in items.values() for f in futures],
+                    EmbeddingError(f"Expected {len(items)} embeddings, got {len(vectors)}"),
+                )
+                continue
+
+            for (key, (_, futures)), vector in zip(items.items(), vectors):
+                vector = normalize(vector)
+                vector.setflags(write=False)
+                self._cache[key] = vector
+                self._resolve(futures, [vector] * len(futures))
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current size of the vector cache."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+        }
+
+
+_settings = get_settings()
+embed_batcher = EmbedBatcher(
+    max_batch=_settings.embed_batch_max_size,
+    max_wait_ms=_settings.embed_batch_max_wait_ms,
+    cache_size=_settings.embed_cache_max_entries,
+)
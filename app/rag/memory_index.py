@@ -0,0 +1,101 @@
+"""
+In-process vector index.
+Mirrors a small Qdrant collection as one float32 matrix so searches are a
+matrix-vector product instead of a round-trip to the server.
+"""
+import threading
+from typing import Any
+
+import numpy as np
+
+from app.rag.similarity import normalize, rank
+
+
+class InMemoryIndex:
+    """
+    Row-per-point matrix of L2-normalized embeddings with parallel ID and
+    payload lists.
+
+    Capacity doubles when full so appends are amortized O(1). Deletes move
+    the last row into the freed slot. A lock guards writes from the sync
+    path's worker threads against concurrent searches.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._payloads: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(
+        self,
+        doc_ids: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        payloads: list[dict[str, Any]],
+    ) -> None:
+        """Append points to the index."""
+        with self._lock:
+            needed = len(self._ids) + len(doc_ids)
+            if needed > self._matrix.shape[0]:
+                grown = np.zeros((max(needed, 2 * self._matrix.shape[0]), self.dim), dtype=np.float32)
+                grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+                self._matrix = grown
+
+            for doc_id, embedding, payload in zip(doc_ids, embeddings, payloads):
+                row = len(self._ids)
+                self._matrix[row] = normalize(embedding)
+                self._ids.append(doc_id)
+                self._payloads.append(payload)
+                self._rows[doc_id] = row
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a point; returns False if it isn't indexed."""
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._payloads[row] = self._payloads[last]
+                self._rows[self._ids[row]] = row
+            self._ids.pop()
+            self._payloads.pop()
+            return True
+
+    def search(
+        self,
+        embedding: list[float] | np.ndarray,
+        top_k: int,
+        score_threshold: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Find the nearest indexed points by cosine similarity.
+
+        Args:
+            embedding: Query embedding vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+
+        Returns:
+            List of results with id, text, score, and metadata
+        """
+        with self._lock:
+            matrix = self._matrix[: len(self._ids)]
+            order, scores = rank(matrix, normalize(embedding), top_k, score_threshold)
+            hits = [(self._ids[i], self._payloads[i]) for i in order]
+        return [
+            {
+                "id": doc_id,
+                "text": payload.get("text", ""),
+                "score": float(score),
+                "metadata": {k: v for k, v in payload.items() if k != "text"},
+            }
+            for (doc_id, payload), score in zip(hits, scores)
+        ]
@@ -0,0 +1,145 @@
+"""
+Session-scoped related-idea prefetching.
+Follow-up thoughts in a session tend to land near the previous one, so after
+each idea a wider pool of neighbours is fetched in the background and the
+next query in the same session is answered from it.
+"""
+import asyncio
+import logging
+from typing import Callable
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.core.config import get_settings
+from app.rag.qdrant_store import QdrantVectorStore, idea_filter
+from app.rag.similarity import normalize, rank
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPrefetcher:
+    """
+    Per-session pool of ideas near the session's latest query.
+
+    A pool holds `pool_factor * rag_top_k` neighbours of an anchor embedding
+    together with their vectors. A later query is answered from the pool by
+    rescoring it locally, but only when it lies within `anchor_similarity` of
+    the anchor; otherwise the pool may not contain its true neighbours and
+    the caller falls back to Qdrant.
+
+    Pools are keyed by (user, session), and a user's pool only holds that
+    user's ideas.
+    """
+
+    def __init__(
+        self,
+        get_store: Callable[[], QdrantVectorStore],
+        pool_factor: int = 3,
+        anchor_similarity: float = 0.8,
+        maxsize: int = 1024,
+        ttl: float = 60,
+    ):
+        self._get_store = get_store
+        self.pool_factor = pool_factor
+        self.anchor_similarity = anchor_similarity
+        self._pools: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tasks: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def schedule(
+        self,
+        session_id: str,
+        embedding: list[float] | np.ndarray,
+        user_id: str | None = None,
+    ) -> None:
+        """Refresh the session's pool around `embedding` in the background."""
+        task = asyncio.get_running_loop().create_task(
+            self._prefetch(session_id, embedding, user_id)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prefetch(
+        self,
+        session_id: str,
+        embedding: list[float] | np.ndarray,
+        user_id: str | None,
+    ) -> None:
+        limit = get_settings().rag_top_k * self.pool_factor
+        try:
+            points = await self._get_store().asearch_with_vectors(
+                embedding, limit, idea_filter(user_id)
+            )
+        except Exception as e:
+            logger.warning("Prefetch for session %s failed: %s", session_id, e)
+            return
+        if not points:
+            return
+
+        self._pools[(user_id, session_id)] = (
+            normalize(embedding),
+            np.asarray([p["vector"] for p in points], dtype=np.float32),
+            [p["text"] for p in points],
+        )
+
+    def lookup(
+        self,
+        session_id: str,
+        embedding: list[float] | np.ndarray,
+        top_k: int | None = None,
+        score_threshold: float | None = None,
+        user_id: str | None = None,
+    ) -> list[str] | None:
+        """
+        Answer a similarity search from the session's prefetched pool.
+
+        Args:
+            session_id: Client session identifier
+            embedding: Query embedding vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            user_id: User the session belongs to
+
+        Returns:
+            Matching idea texts, or None if the pool can't answer this query
+        """
+        pool = self._pools.get((user_id, session_id))
+        if pool is None:
+            self.misses += 1
+            return None
+
+        anchor, matrix, texts = pool
+        vec = normalize(embedding)
+        if float(anchor @ vec) < self.anchor_similarity:
+            self.misses += 1
+            return None
+
+        settings = get_settings()
+        top_k = top_k or settings.rag_top_k
+        score_threshold = score_threshold or settings.rag_score_threshold
+
+        # Stored vectors are unit length (cosine collection), so dot == score
+        order, _ = rank(matrix, vec, top_k, score_threshold)
+        self.hits += 1
+        return [texts[i] for i in order]
+
+    def clear(self) -> None:
+        """Drop every pool, e.g. after a memory is deleted."""
+        self._pools.clear()
+
+    async def stop(self) -> None:
+        """Cancel in-flight prefetches."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and number of live pools."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._pools),
+        }
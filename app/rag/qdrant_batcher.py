@@ -0,0 +1,109 @@
+"""
+Qdrant micro-batchers.
+Coalesce concurrent similarity searches into one `query_batch_points` call
+and concurrent inserts into one `upsert`.
+"""
+import logging
+from typing import Any, Callable
+
+from app.core.config import get_settings
+from app.rag.batching import MicroBatcher
+from app.rag.qdrant_store import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBatcher(MicroBatcher):
+    """
+    Collects searches arriving within a short window and sends them to
+    Qdrant as a single batch request over the async gRPC client.
+    """
+
+    def __init__(
+        self,
+        get_store: Callable[[], QdrantVectorStore],
+        max_batch: int = 32,
+        max_wait_ms: float = 5,
+    ):
+        super().__init__(max_batch, max_wait_ms)
+        self._get_store = get_store
+
+    async def submit(
+        self,
+        embedding: list[float],
+        top_k: int | None = None,
+        score_threshold: float | None = None,
+        filter_conditions: dict | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Queue a similarity search and wait for its results.
+
+        Args:
+            embedding: Query embedding vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            filter_conditions: Optional Qdrant filter conditions
+
+        Returns:
+            List of results with text, score, and metadata
+        """
+        settings = get_settings()
+        top_k = top_k or settings.rag_top_k
+        score_threshold = score_threshold or settings.rag_score_threshold
+        return await self._enqueue(embedding, top_k, score_threshold, filter_conditions)
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        queries = [query for *query, _ in batch]
+        futures = [future for *_, future in batch]
+        try:
+            results = await self._get_store().asearch_batch(queries)
+        except Exception as e:
+            logger.error("Batched search of %s queries failed: %s", len(queries), e)
+            self._fail(futures, e)
+            return
+        self._resolve(futures, results)
+
+
+class UpsertBatcher(MicroBatcher):
+    """
+    Collects inserts arriving within a short window and writes them to
+    Qdrant as a single upsert over the async client.
+    """
+
+    def __init__(
+        self,
+        get_store: Callable[[], QdrantVectorStore],
+        max_batch: int = 64,
+        max_wait_ms: float = 20,
+    ):
+        super().__init__(max_batch, max_wait_ms)
+        self._get_store = get_store
+
+    async def submit(
+        self,
+        embedding: list[float],
+        text: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Queue a document for storage and wait for its ID.
+
+        Args:
+            embedding: The vector embedding
+            text: The original text content
+            metadata: Optional additional metadata
+
+        Returns:
+            The generated document ID
+        """
+        return await self._enqueue(embedding, text, metadata or {})
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        embeddings, texts, metadata_list, futures = (list(column) for column in zip(*batch))
+        try:
+            doc_ids = await self._get_store().aadd_batch(embeddings, texts, metadata_list)
+        except Exception as e:
+            logger.error("Batched upsert of %s documents failed: %s", len(texts), e)
+            self._fail(futures, e)
+            return
+        self._resolve(futures, doc_ids)
@@ -3,19 +3,56 @@ Qdrant Vector Store implementation.
 Handles storage and retrieval of embeddings with metadata support.
 """
 import logging
-import uuid
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterator
 
-from qdrant_client import QdrantClient
+import numpy as np
+from cachetools import TTLCache
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from app.core.config import get_settings
 from app.core.exceptions import VectorStoreError
+from app.core.ids import new_point_id, parse_point_id
+from app.rag.memory_index import InMemoryIndex
 
 logger = logging.getLogger(__name__)
 
+# Payload fields that searches filter on; each gets a keyword index
+INDEXED_PAYLOAD_FIELDS = ("user_id", "type")
+
+# Qdrant's default indexing threshold, restored after bulk ingestion when
+# the collection's own value can't be read
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# Bulk batches at least this large go through the parallel uploader
+BULK_UPLOAD_MIN_POINTS = 10000
+BULK_UPLOAD_BATCH_SIZE = 1024
+BULK_UPLOAD_PARALLEL = 8
+
+
+def idea_filter(user_id: str | None) -> dict | None:
+    """
+    Build filter conditions restricting a search to one user's ideas.
+
+    Args:
+        user_id: The owning user, or None to search all ideas
+
+    Returns:
+        Filter conditions for `search`, or None when no user is given
+    """
+    if user_id is None:
+        return None
+    return {
+        "must": [
+            {"key": "type", "match": {"value": "idea"}},
+            {"key": "user_id", "match": {"value": user_id}},
+        ]
+    }
+
 
 class QdrantVectorStore:
     """
@@ -24,6 +61,7 @@ class QdrantVectorStore:
     - Configurable connection settings
     - Metadata support for documents
     - Score-based filtering
+    - Optional in-process NumPy search for small collections
     """
 
     def __init__(
@@ -35,19 +73,67 @@ class QdrantVectorStore:
         self.collection_name = collection_name or settings.qdrant_collection_name
         self.embedding_dim = embedding_dim or settings.active_embedding_dim
 
-        # Initialize client with configurable settings
-        # Use HTTPS only when API key is provided (for Qdrant Cloud)
+        # Search defaults, read once instead of per search
+        self._default_top_k = settings.rag_top_k
+        self._default_threshold = settings.rag_score_threshold
+
+        # Initialize client with configurable settings; gRPC avoids JSON
+        # (de)serialization per call. Use HTTPS only when API key is
+        # provided (for Qdrant Cloud)
         use_https = bool(settings.qdrant_api_key)
         self.client = QdrantClient(
             host=settings.qdrant_host,
             port=settings.qdrant_port,
+            grpc_port=settings.qdrant_grpc_port,
+            prefer_grpc=settings.qdrant_prefer_grpc,
             api_key=settings.qdrant_api_key or None,
             https=use_https,
         )
+        self._aclient: AsyncQdrantClient | None = None
+
+        # Collection info backs count() and health_check(); stats endpoints
+        # poll it, so reuse it briefly instead of an RPC per call
+        self._info_cache: TTLCache = TTLCache(maxsize=1, ttl=settings.collection_info_ttl_s)
+        self._info_lock = threading.Lock()
+
+        # Overlapping bulk_indexing sections share one pause; the last to
+        # exit restores the threshold read by the first
+        self._bulk_lock = threading.Lock()
+        self._bulk_depth = 0
+        self._bulk_threshold = DEFAULT_INDEXING_THRESHOLD
 
         # Safely initialize collection (preserve existing data)
         self._ensure_collection()
 
+        # Small collections can be mirrored and searched in process. The
+        # mirror only sees this process's writes, so it's for single-process
+        # (dev/test) deployments.
+        self._index: InMemoryIndex | None = None
+        if settings.rag_inmemory_fallback:
+            self._index = self._load_index(settings.rag_inmemory_max_points)
+
+    @property
+    def aclient(self) -> AsyncQdrantClient:
+        """Async gRPC client, created on first use inside the event loop."""
+        if self._aclient is None:
+            settings = get_settings()
+            self._aclient = AsyncQdrantClient(
+                host=settings.qdrant_host,
+                port=settings.qdrant_port,
+                grpc_port=settings.qdrant_grpc_port,
+                prefer_grpc=settings.qdrant_prefer_grpc,
+                api_key=settings.qdrant_api_key or None,
+                https=bool(settings.qdrant_api_key),
+            )
+        return self._aclient
+
+    async def aclose(self) -> None:
+        """Close the sync client and the async client, if it was created."""
+        self.client.close()
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
+
     def _ensure_collection(self) -> None:
         """Create collection only if it doesn't exist (preserves data on restart)."""
         try:
@@ -55,21 +141,92 @@ class QdrantVectorStore:
             existing_names = [c.name for c in collections.collections]
 
             if self.collection_name not in existing_names:
-                logger.info(f"Creating new collection: {self.collection_name}")
+                logger.info("Creating new collection: %s", self.collection_name)
+                settings = get_settings()
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=qdrant_models.VectorParams(
                         size=self.embedding_dim,
                         distance=qdrant_models.Distance.COSINE,
+                        on_disk=settings.qdrant_vectors_on_disk,
                     ),
+                    quantization_config=self._quantization_config(),
                 )
             else:
-                logger.info(f"Using existing collection: {self.collection_name}")
+                logger.info("Using existing collection: %s", self.collection_name)
+
+            # Filtered searches use these indexes instead of scanning payloads
+            for field in INDEXED_PAYLOAD_FIELDS:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+                )
 
         except Exception as e:
-            logger.error(f"Failed to initialize collection: {e}")
+            logger.error("Failed to initialize collection: %s", e)
             raise VectorStoreError(f"Failed to initialize Qdrant collection: {str(e)}")
 
+    @staticmethod
+    def _quantization_config() -> qdrant_models.ScalarQuantization | None:
+        """
+        INT8 scalar quantization for new collections, if enabled.
+
+        Quantized vectors stay in RAM for the HNSW search (a quarter of the
+        float32 size); Qdrant rescores the top candidates with the original
+        vectors, so recall on normalized embeddings is essentially unchanged.
+        """
+        if not get_settings().qdrant_int8_quantization:
+            return None
+        return qdrant_models.ScalarQuantization(
+            scalar=qdrant_models.ScalarQuantizationConfig(
+                type=qdrant_models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            )
+        )
+
+    def _load_index(self, max_points: int) -> InMemoryIndex | None:
+        """Mirror the collection into an InMemoryIndex if it has at most `max_points` points."""
+        if self.count() > max_points:
+            logger.info("Collection exceeds %s points; in-memory search disabled", max_points)
+            return None
+
+        index = InMemoryIndex(self.embedding_dim)
+        records, _ = self.client.scroll(
+            collection_name=self.collection_name,
+            limit=max_points,
+            with_payload=qdrant_models.PayloadSelectorExclude(exclude=["embedding"]),
+            with_vectors=True,
+        )
+        index.add(
+            [str(p.id) for p in records],
+            [p.vector for p in records],
+            [p.payload for p in records],
+        )
+        logger.info("Loaded %s points into the in-memory index", len(index))
+        return index
+
+    def _on_stored(self, points: list[qdrant_models.PointStruct]) -> None:
+        """
+        Update local state after an upsert.
+
+        Drops the cached collection info and mirrors the points into the
+        in-memory index, dropping the index once it outgrows its cap.
+        """
+        self._invalidate_info()
+        if self._index is None:
+            return
+        if len(self._index) + len(points) > get_settings().rag_inmemory_max_points:
+            logger.info("In-memory index outgrew its cap; searching Qdrant from now on")
+            self._index = None
+            return
+        self._index.add(
+            [str(p.id) for p in points],
+            [p.vector for p in points],
+            [p.payload for p in points],
+        )
+
     def add(
         self,
         embedding: list[float],
@@ -87,34 +244,25 @@ class QdrantVectorStore:
         Returns:
             The generated document ID
         """
-        doc_id = str(uuid.uuid4())
-        payload = {
-            "text": text,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            **(metadata or {}),
-        }
+        doc_ids, points = self._build_points([embedding], [text], [metadata])
 
         try:
             self.client.upsert(
                 collection_name=self.collection_name,
-                points=[
-                    qdrant_models.PointStruct(
-                        id=doc_id,
-                        vector=embedding,
-                        payload=payload,
-                    )
-                ],
+                points=points,
             )
-            return doc_id
         except Exception as e:
-            logger.error(f"Failed to add document: {e}")
+            logger.error("Failed to add document: %s", e)
             raise VectorStoreError(f"Failed to store document: {str(e)}")
+        self._on_stored(points)
+        return doc_ids[0]
 
     def add_batch(
         self,
         embeddings: list[list[float]],
         texts: list[str],
         metadata_list: list[dict[str, Any]] | None = None,
+        bulk: bool = False,
     ) -> list[str]:
         """
         Add multiple documents in a single batch operation.
@@ -123,43 +271,207 @@ class QdrantVectorStore:
             embeddings: List of vector embeddings
             texts: List of original text content
             metadata_list: Optional list of metadata dicts
+            bulk: Ingest with HNSW indexing paused (see `bulk_indexing`);
+                batches of `BULK_UPLOAD_MIN_POINTS` or more are also
+                uploaded in parallel chunks
 
         Returns:
             List of generated document IDs
         """
+        doc_ids, points = self._build_points(embeddings, texts, metadata_list)
+        try:
+            if bulk:
+                with self.bulk_indexing():
+                    self._upload(points)
+            else:
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                )
+        except Exception as e:
+            logger.error("Failed to add batch: %s", e)
+            raise VectorStoreError(f"Failed to store documents: {str(e)}")
+        self._on_stored(points)
+        return doc_ids
+
+    def _upload(self, points: list[qdrant_models.PointStruct]) -> None:
+        """Write a bulk batch, in parallel chunks once it is large enough."""
+        if len(points) < BULK_UPLOAD_MIN_POINTS:
+            self.client.upsert(collection_name=self.collection_name, points=points)
+            return
+        self.client.upload_points(
+            collection_name=self.collection_name,
+            points=points,
+            batch_size=BULK_UPLOAD_BATCH_SIZE,
+            parallel=BULK_UPLOAD_PARALLEL,
+            wait=True,
+        )
+
+    @contextmanager
+    def bulk_indexing(self) -> Iterator[None]:
+        """
+        Pause HNSW indexing for the duration of a bulk ingestion.
+
+        Qdrant otherwise rebuilds the index as segments fill, which dominates
+        CPU during imports. The collection's indexing threshold is set to 0
+        on entry and restored on exit, after which Qdrant indexes the new
+        points in one pass.
+
+        Overlapping sections in this process share one pause. A threshold
+        already at 0 is left over from a run that never restored it, or
+        belongs to another process's run, so the default is restored instead.
+        """
+        with self._bulk_lock:
+            if self._bulk_depth == 0:
+                self._bulk_threshold = self._read_indexing_threshold()
+                self._set_indexing_threshold(0)
+            self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            with self._bulk_lock:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0:
+                    self._set_indexing_threshold(self._bulk_threshold)
+
+    def _read_indexing_threshold(self) -> int:
+        """Read the collection's indexing threshold to restore after a bulk run."""
+        try:
+            threshold = self.client.get_collection(
+                self.collection_name
+            ).config.optimizer_config.indexing_threshold
+        except Exception as e:
+            logger.warning("Could not read indexing threshold, assuming default: %s", e)
+            threshold = None
+        return threshold or DEFAULT_INDEXING_THRESHOLD
+
+    def _set_indexing_threshold(self, threshold: int) -> None:
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=qdrant_models.OptimizersConfigDiff(indexing_threshold=threshold),
+        )
+
+    async def aadd_batch(
+        self,
+        embeddings: list[list[float]],
+        texts: list[str],
+        metadata_list: list[dict[str, Any]] | None = None,
+    ) -> list[str]:
+        """
+        Add multiple documents in a single upsert over the async client.
+
+        Args:
+            embeddings: List of vector embeddings
+            texts: List of original text content
+            metadata_list: Optional list of metadata dicts
+
+        Returns:
+            List of generated document IDs
+        """
+        doc_ids, points = self._build_points(embeddings, texts, metadata_list)
+        try:
+            await self.aclient.upsert(
+                collection_name=self.collection_name,
+                points=points,
+            )
+        except Exception as e:
+            logger.error("Failed to add batch: %s", e)
+            raise VectorStoreError(f"Failed to store documents: {str(e)}")
+        self._on_stored(points)
+        return doc_ids
+
+    @staticmethod
+    def _build_points(
+        embeddings: list[list[float]],
+        texts: list[str],
+        metadata_list: list[dict[str, Any]] | None = None,
+    ) -> tuple[list[str], list[qdrant_models.PointStruct]]:
+        """Assign IDs and build the points for a batch upsert."""
         if len(embeddings) != len(texts):
             raise VectorStoreError("Embeddings and texts must have same length")
 
-        metadata_list = metadata_list or [{} for _ in texts]
+        metadata_list = metadata_list or [None] * len(texts)
         doc_ids = []
         points = []
+        # Points in one batch share an ingestion time; read the clock once
+        created_at = datetime.now(timezone.utc).isoformat()
 
         for embedding, text, metadata in zip(embeddings, texts, metadata_list):
-            doc_id = str(uuid.uuid4())
-            doc_ids.append(doc_id)
+            point_id = new_point_id()
+            payload = {"text": text, "created_at": created_at}
+            if metadata:
+                payload.update(metadata)
+            if isinstance(embedding, np.ndarray):
+                embedding = embedding.tolist()
+            doc_ids.append(str(point_id))
+            # Every field is already well-typed here, so skip validation and
+            # the copies of the vector and payload it would make per point
             points.append(
-                qdrant_models.PointStruct(
-                    id=doc_id,
-                    vector=embedding,
-                    payload={
-                        "text": text,
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        **metadata,
-                    },
+                qdrant_models.PointStruct.model_construct(
+                    id=point_id, vector=embedding, payload=payload
                 )
             )
+        return doc_ids, points
+
+    def search(
+        self,
+        embedding: list[float],
+        top_k: int | None = None,
+        score_threshold: float | None = None,
+        filter_conditions: dict | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for similar documents.
+
+        Args:
+            embedding: Query embedding vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score (0-1)
+            filter_conditions: Optional Qdrant filter conditions
+
+        Returns:
+            List of results with text, score, and metadata
+        """
+        if filter_conditions is None and top_k is None and score_threshold is None:
+            return self._search_default(embedding)
+
+        top_k = top_k or self._default_top_k
+        score_threshold = score_threshold or self._default_threshold
+
+        if self._index is not None and not filter_conditions:
+            return self._index.search(embedding, top_k, score_threshold)
 
         try:
-            self.client.upsert(
+            response = self.client.query_points(
                 collection_name=self.collection_name,
-                points=points,
+                query=embedding,
+                limit=top_k,
+                score_threshold=score_threshold,
+                query_filter=qdrant_models.Filter(**filter_conditions) if filter_conditions else None,
             )
-            return doc_ids
+            return self._to_results(response.points)
         except Exception as e:
-            logger.error(f"Failed to add batch: {e}")
-            raise VectorStoreError(f"Failed to store documents: {str(e)}")
+            logger.error("Search failed: %s", e)
+            raise VectorStoreError(f"Search failed: {str(e)}")
 
-    def search(
+    def _search_default(self, embedding: list[float]) -> list[dict[str, Any]]:
+        """Unfiltered search with the default top_k and threshold (the common case)."""
+        if self._index is not None:
+            return self._index.search(embedding, self._default_top_k, self._default_threshold)
+
+        try:
+            response = self.client.query_points(
+                collection_name=self.collection_name,
+                query=embedding,
+                limit=self._default_top_k,
+                score_threshold=self._default_threshold,
+            )
+            return self._to_results(response.points)
+        except Exception as e:
+            logger.error("Search failed: %s", e)
+            raise VectorStoreError(f"Search failed: {str(e)}")
+
+    async def asearch(
         self,
         embedding: list[float],
         top_k: int | None = None,
@@ -167,7 +479,7 @@ class QdrantVectorStore:
         filter_conditions: dict | None = None,
     ) -> list[dict[str, Any]]:
         """
-        Search for similar documents.
+        Search for similar documents over the async client.
 
         Args:
             embedding: Query embedding vector
@@ -178,38 +490,121 @@ class QdrantVectorStore:
         Returns:
             List of results with text, score, and metadata
         """
-        settings = get_settings()
-        top_k = top_k or settings.rag_top_k
-        score_threshold = score_threshold or settings.rag_score_threshold
+        top_k = top_k or self._default_top_k
+        score_threshold = score_threshold or self._default_threshold
+
+        if self._index is not None and not filter_conditions:
+            return self._index.search(embedding, top_k, score_threshold)
 
         try:
-            response = self.client.query_points(
+            response = await self.aclient.query_points(
                 collection_name=self.collection_name,
                 query=embedding,
                 limit=top_k,
                 score_threshold=score_threshold,
                 query_filter=qdrant_models.Filter(**filter_conditions) if filter_conditions else None,
             )
-            results = response.points
+            return self._to_results(response.points)
+        except Exception as e:
+            logger.error("Search failed: %s", e)
+            raise VectorStoreError(f"Search failed: {str(e)}")
+
+    async def asearch_batch(
+        self,
+        queries: list[tuple[list[float], int, float, dict | None]],
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Run several searches in a single Qdrant round-trip.
+
+        Args:
+            queries: List of (embedding, top_k, score_threshold, filter_conditions) tuples
+
+        Returns:
+            One result list per query, in the same order
+        """
+        if self._index is not None and not any(conditions for *_, conditions in queries):
+            return [self._index.search(*query[:3]) for query in queries]
+
+        requests = [
+            qdrant_models.QueryRequest(
+                query=embedding,
+                limit=top_k,
+                score_threshold=score_threshold,
+                filter=qdrant_models.Filter(**conditions) if conditions else None,
+                with_payload=True,
+            )
+            for embedding, top_k, score_threshold, conditions in queries
+        ]
+        try:
+            responses = await self.aclient.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests,
+            )
+            return [self._to_results(response.points) for response in responses]
+        except Exception as e:
+            logger.error("Batch search failed: %s", e)
+            raise VectorStoreError(f"Batch search failed: {str(e)}")
 
+    async def asearch_with_vectors(
+        self,
+        embedding: list[float],
+        limit: int,
+        filter_conditions: dict | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch nearest neighbours together with their stored vectors.
+
+        Args:
+            embedding: Query embedding vector
+            limit: Number of neighbours to return
+            filter_conditions: Optional Qdrant filter conditions
+
+        Returns:
+            List of results with text and vector
+        """
+        try:
+            response = await self.aclient.query_points(
+                collection_name=self.collection_name,
+                query=embedding,
+                limit=limit,
+                query_filter=qdrant_models.Filter(**filter_conditions) if filter_conditions else None,
+                with_payload=qdrant_models.PayloadSelectorInclude(include=["text"]),
+                with_vectors=True,
+            )
             return [
-                {
-                    "id": str(hit.id),
-                    "text": hit.payload.get("text", ""),
-                    "score": hit.score,
-                    "metadata": {k: v for k, v in hit.payload.items() if k != "text"},
-                }
-                for hit in results
+                {"text": hit.payload.get("text", ""), "vector": hit.vector}
+                for hit in response.points
             ]
         except Exception as e:
-            logger.error(f"Search failed: {e}")
-            raise VectorStoreError(f"Search failed: {str(e)}")
+            logger.error("Vector search failed: %s", e)
+            raise VectorStoreError(f"Vector search failed: {str(e)}")
+
+    @staticmethod
+    def _to_results(points: list[Any]) -> list[dict[str, Any]]:
+        """
+        Convert scored Qdrant points to result dicts.
+
+        Each hit's payload dict is its own, so the text is popped off it and
+        the remainder reused as the metadata instead of copied.
+        """
+        results = []
+        for hit in points:
+            metadata = hit.payload
+            text = metadata.pop("text", "")
+            results.append({
+                "id": str(hit.id),
+                "text": text,
+                "score": hit.score,
+                "metadata": metadata,
+            })
+        return results
 
     def search_texts(
         self,
         embedding: list[float],
         top_k: int | None = None,
         score_threshold: float | None = None,
+        filter_conditions: dict | None = None,
     ) -> list[str]:
         """
         Search and return only text content (backward compatible).
@@ -218,27 +613,71 @@ class QdrantVectorStore:
             embedding: Query embedding vector
             top_k: Number of results to return
             score_threshold: Minimum similarity score
+            filter_conditions: Optional Qdrant filter conditions
 
         Returns:
             List of matching text strings
         """
-        results = self.search(embedding, top_k, score_threshold)
-        return [r["text"] for r in results]
+        top_k = top_k or self._default_top_k
+        score_threshold = score_threshold or self._default_threshold
+
+        if self._index is not None and not filter_conditions:
+            return [r["text"] for r in self._index.search(embedding, top_k, score_threshold)]
+
+        try:
+            # Only the text field is transferred and deserialized
+            response = self.client.query_points(
+                collection_name=self.collection_name,
+                query=embedding,
+                limit=top_k,
+                score_threshold=score_threshold,
+                query_filter=qdrant_models.Filter(**filter_conditions) if filter_conditions else None,
+                with_payload=qdrant_models.PayloadSelectorInclude(include=["text"]),
+            )
+        except Exception as e:
+            logger.error("Search failed: %s", e)
+            raise VectorStoreError(f"Search failed: {str(e)}")
 
-    def get_all(self, limit: int = 100) -> list[dict[str, Any]]:
+        texts = []
+        for hit in response.points:
+            # Hits come back best-first, so the rest are below the threshold too
+            if hit.score < score_threshold:
+                break
+            texts.append(hit.payload.get("text", ""))
+        return texts
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
         """
-        Retrieve all documents (for debugging/admin purposes).
+        Retrieve a page of documents (for debugging/admin purposes).
+
+        Large payload fields (`embedding`) and vectors are never fetched.
 
         Args:
             limit: Maximum number of documents to return
+            offset: Number of documents to skip
 
         Returns:
-            List of all stored documents with metadata
+            List of stored documents with metadata
         """
         try:
+            # Qdrant scroll offsets are point IDs: skip `offset` points fetching
+            # IDs only, then read the page from the cursor that returns
+            start = None
+            if offset:
+                _, start = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=offset,
+                    with_payload=False,
+                    with_vectors=False,
+                )
+                if start is None:
+                    return []
             records, _ = self.client.scroll(
                 collection_name=self.collection_name,
                 limit=limit,
+                offset=start,
+                with_payload=qdrant_models.PayloadSelectorExclude(exclude=["embedding"]),
+                with_vectors=False,
             )
             return [
                 {
@@ -249,7 +688,7 @@ class QdrantVectorStore:
                 for p in records
             ]
         except Exception as e:
-            logger.error(f"Failed to get all documents: {e}")
+            logger.error("Failed to get all documents: %s", e)
             raise VectorStoreError(f"Failed to retrieve documents: {str(e)}")
 
     def delete(self, doc_id: str) -> bool:
@@ -265,26 +704,84 @@ class QdrantVectorStore:
         try:
             self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=qdrant_models.PointIdsList(points=[doc_id]),
+                points_selector=qdrant_models.PointIdsList(points=[parse_point_id(doc_id)]),
             )
+            self._invalidate_info()
+            if self._index is not None:
+                self._index.remove(doc_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete document {doc_id}: {e}")
+            logger.error("Failed to delete document %s: %s", doc_id, e)
             raise VectorStoreError(f"Failed to delete document: {str(e)}")
 
+    def delete_where(self, filter_conditions: dict) -> None:
+        """
+        Delete every point matching Qdrant filter conditions.
+
+        Args:
+            filter_conditions: Qdrant filter conditions
+        """
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=qdrant_models.FilterSelector(
+                    filter=qdrant_models.Filter(**filter_conditions)
+                ),
+            )
+        except Exception as e:
+            logger.error("Failed to delete documents: %s", e)
+            raise VectorStoreError(f"Failed to delete documents: {str(e)}")
+        self._on_deleted_where()
+
+    async def adelete_where(self, filter_conditions: dict) -> None:
+        """Async variant of `delete_where`."""
+        try:
+            await self.aclient.delete(
+                collection_name=self.collection_name,
+                points_selector=qdrant_models.FilterSelector(
+                    filter=qdrant_models.Filter(**filter_conditions)
+                ),
+            )
+        except Exception as e:
+            logger.error("Failed to delete documents: %s", e)
+            raise VectorStoreError(f"Failed to delete documents: {str(e)}")
+        self._on_deleted_where()
+
+    def _on_deleted_where(self) -> None:
+        # The mirror can't evaluate Qdrant filters, so it can't tell which
+        # of its points were deleted
+        self._invalidate_info()
+        if self._index is not None:
+            logger.info("Filtered delete; searching Qdrant from now on")
+            self._index = None
+
+    def _collection_info(self) -> Any:
+        """Fetch collection info, reusing a result younger than `collection_info_ttl_s`."""
+        with self._info_lock:
+            info = self._info_cache.get("info")
+        if info is None:
+            info = self.client.get_collection(self.collection_name)
+            with self._info_lock:
+                self._info_cache["info"] = info
+        return info
+
+    def _invalidate_info(self) -> None:
+        with self._info_lock:
+            self._info_cache.clear()
+
     def count(self) -> int:
         """Get the total number of documents in the collection."""
         try:
-            info = self.client.get_collection(self.collection_name)
+            info = self._collection_info()
             return info.points_count
         except Exception as e:
-            logger.error(f"Failed to get count: {e}")
+            logger.error("Failed to get count: %s", e)
             return 0
 
     def health_check(self) -> dict[str, Any]:
         """Check Qdrant connection health."""
         try:
-            info = self.client.get_collection(self.collection_name)
+            info = self._collection_info()
             return {
                 "status": "healthy",
                 "collection": self.collection_name,
@@ -3,35 +3,144 @@ RAG Retriever module.
 Provides high-level functions for storing and retrieving ideas using semantic search.
 """
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+
 from app.services.embedding_service import get_embedding_service
-from app.rag.qdrant_store import QdrantVectorStore
+from app.rag.embed_batcher import embed_batcher
+from app.rag.prefetch import SessionPrefetcher
+from app.rag.qdrant_batcher import SearchBatcher, UpsertBatcher
+from app.rag.qdrant_store import QdrantVectorStore, idea_filter
+from app.services.semantic_cache import SemanticCache
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
 _vector_store: QdrantVectorStore | None = None
-_embedding_service = None
+_vector_store_lock = threading.Lock()
 
 
 def get_vector_store() -> QdrantVectorStore:
-    """Get or create the vector store singleton."""
+    """Get or create the vector store singleton (thread-safe)."""
     global _vector_store
     if _vector_store is None:
-        settings = get_settings()
-        _vector_store = QdrantVectorStore(
-            collection_name=settings.qdrant_collection_name,
-            embedding_dim=settings.active_embedding_dim,
-        )
+        with _vector_store_lock:
+            if _vector_store is None:
+                settings = get_settings()
+                _vector_store = QdrantVectorStore(
+                    collection_name=settings.qdrant_collection_name,
+                    embedding_dim=settings.active_embedding_dim,
+                )
     return _vector_store
 
 
+async def close_vector_store() -> None:
+    """Close the vector store's clients, if the store was created."""
+    global _vector_store
+    if _vector_store is not None:
+        await _vector_store.aclose()
+        _vector_store = None
+
+
+_settings = get_settings()
+search_batcher = SearchBatcher(
+    get_vector_store,
+    max_batch=_settings.search_batch_max_size,
+    max_wait_ms=_settings.search_batch_max_wait_ms,
+)
+upsert_batcher = UpsertBatcher(
+    get_vector_store,
+    max_batch=_settings.upsert_batch_max_size,
+    max_wait_ms=_settings.upsert_batch_max_wait_ms,
+)
+session_prefetcher = SessionPrefetcher(
+    get_vector_store,
+    pool_factor=_settings.prefetch_pool_factor,
+    anchor_similarity=_settings.prefetch_anchor_similarity,
+    ttl=_settings.prefetch_ttl_s,
+)
+
+# Default-parameter search results keyed by query embedding and scoped by
+# user. The sync path runs in worker threads, so access goes through a lock.
+# Stores only invalidate this process's cache; the TTL bounds how long a
+# store made by another worker can go unseen.
+search_cache = SemanticCache(
+    dim=_settings.active_embedding_dim,
+    threshold=_settings.semantic_cache_threshold,
+    max_entries=_settings.search_cache_max_entries,
+    ttl=_settings.search_cache_ttl_s,
+)
+_search_cache_lock = threading.Lock()
+# Bumped on every invalidation, so a search that was in flight while an idea
+# was stored doesn't cache results that may already miss it
+_search_cache_generation = 0
+
+
+def _cached_search(
+    embedding: list[float] | np.ndarray,
+    user_id: str | None = None,
+) -> tuple[list[str] | None, int]:
+    """
+    Return cached results for a near-identical earlier query, if any,
+    along with the cache generation to hand back to `_cache_search`.
+    """
+    with _search_cache_lock:
+        return search_cache.lookup(embedding, scope=user_id), _search_cache_generation
+
+
+def _cache_search(
+    embedding: list[float] | np.ndarray,
+    texts: list[str],
+    user_id: str | None,
+    generation: int,
+) -> None:
+    """
+    Remember the results of a default-parameter search, unless the cache
+    was invalidated since its lookup.
+    """
+    with _search_cache_lock:
+        if generation == _search_cache_generation:
+            search_cache.add(embedding, texts, scope=user_id)
+
+
+def _invalidate_search_cache(
+    embedding: list[float] | np.ndarray,
+    user_id: str | None = None,
+) -> None:
+    """
+    Drop cached searches a newly stored idea could now appear in.
+
+    Results only include ideas scoring at least `rag_score_threshold`, so
+    queries further than that from the new idea are unaffected.
+    """
+    global _search_cache_generation
+    with _search_cache_lock:
+        _search_cache_generation += 1
+        search_cache.invalidate_near(
+            embedding, get_settings().rag_score_threshold, scope=user_id
+        )
+
+
+def _idea_metadata(metadata: dict[str, Any] | None, user_id: str | None) -> dict[str, Any]:
+    """Build the stored payload metadata for an idea."""
+    full_metadata = {
+        "type": "idea",
+        "stored_at": datetime.now(timezone.utc).isoformat(),
+        **(metadata or {}),
+    }
+    if user_id is not None:
+        full_metadata["user_id"] = user_id
+    return full_metadata
+
+
 def store_idea(
     text: str,
     metadata: dict[str, Any] | None = None,
+    user_id: str | None = None,
 ) -> str:
     """
     Store a new idea in the vector database.
@@ -39,6 +148,7 @@ def store_idea(
     Args:
         text: The idea text to store
         metadata: Optional additional metadata
+        user_id: Owner of the idea, used to filter later searches
 
     Returns:
         The generated document ID
@@ -49,28 +159,28 @@ def store_idea(
     # Generate embedding using document mode for storage
     embedding = embedding_service.embed_document(text)
 
-    # Add metadata
-    full_metadata = {
-        "type": "idea",
-        "stored_at": datetime.now(timezone.utc).isoformat(),
-        **(metadata or {}),
-    }
-
-    return vector_store.add(embedding, text, full_metadata)
+    doc_id = vector_store.add(embedding, text, _idea_metadata(metadata, user_id))
+    _invalidate_search_cache(embedding, user_id)
+    return doc_id
 
 
 def retrieve_similar_ideas(
     text: str,
     top_k: int | None = None,
     score_threshold: float | None = None,
+    user_id: str | None = None,
 ) -> list[str]:
     """
     Retrieve ideas similar to the given text.
 
+    Default-parameter searches are answered from the search cache when a
+    near-identical query was seen since the last relevant store.
+
     Args:
         text: Query text to find similar ideas
         top_k: Number of results to return
         score_threshold: Minimum similarity score
+        user_id: Restrict the search to this user's ideas
 
     Returns:
         List of similar idea texts
@@ -79,19 +189,114 @@ def retrieve_similar_ideas(
     embedding_service = get_embedding_service()
     vector_store = get_vector_store()
 
+    cacheable = top_k is None and score_threshold is None
     top_k = top_k or settings.rag_top_k
     score_threshold = score_threshold or settings.rag_score_threshold
 
     # Generate embedding using query mode for retrieval
     embedding = embedding_service.embed_query(text)
 
-    return vector_store.search_texts(embedding, top_k, score_threshold)
+    if cacheable:
+        cached, generation = _cached_search(embedding, user_id)
+        if cached is not None:
+            return cached
+
+    texts = vector_store.search_texts(embedding, top_k, score_threshold, idea_filter(user_id))
+    if cacheable:
+        _cache_search(embedding, texts, user_id, generation)
+    return texts
+
+
+async def store_idea_async(
+    text: str,
+    metadata: dict[str, Any] | None = None,
+    embedding: np.ndarray | None = None,
+    user_id: str | None = None,
+) -> str:
+    """
+    Store a new idea without blocking the event loop.
+
+    Concurrent stores are coalesced into one Qdrant upsert.
+
+    Args:
+        text: The idea text to store
+        metadata: Optional additional metadata
+        embedding: Precomputed document embedding, if already available
+        user_id: Owner of the idea, used to filter later searches
+
+    Returns:
+        The generated document ID
+    """
+    if embedding is None:
+        embedding = await embed_batcher.submit(text, input_type="document")
+
+    doc_id = await upsert_batcher.submit(embedding, text, _idea_metadata(metadata, user_id))
+    _invalidate_search_cache(embedding, user_id)
+    return doc_id
+
+
+async def retrieve_similar_ideas_async(
+    text: str,
+    top_k: int | None = None,
+    score_threshold: float | None = None,
+    user_id: str | None = None,
+) -> list[str]:
+    """
+    Retrieve ideas similar to the given text without blocking the event loop.
+
+    Args:
+        text: Query text to find similar ideas
+        top_k: Number of results to return
+        score_threshold: Minimum similarity score
+        user_id: Restrict the search to this user's ideas
+
+    Returns:
+        List of similar idea texts
+    """
+    embedding = await embed_batcher.submit(text, input_type="query")
+    return await search_similar_ideas_async(embedding, top_k, score_threshold, user_id)
+
+
+async def search_similar_ideas_async(
+    embedding: list[float] | np.ndarray,
+    top_k: int | None = None,
+    score_threshold: float | None = None,
+    user_id: str | None = None,
+) -> list[str]:
+    """
+    Retrieve ideas similar to an already computed query embedding.
+
+    Default-parameter searches are answered from the search cache when a
+    near-identical query was seen since the last relevant store; the rest
+    are coalesced into one Qdrant batch request.
+
+    Args:
+        embedding: Query embedding vector
+        top_k: Number of results to return
+        score_threshold: Minimum similarity score
+        user_id: Restrict the search to this user's ideas
+
+    Returns:
+        List of similar idea texts
+    """
+    cacheable = top_k is None and score_threshold is None
+    if cacheable:
+        cached, generation = _cached_search(embedding, user_id)
+        if cached is not None:
+            return cached
+
+    results = await search_batcher.submit(embedding, top_k, score_threshold, idea_filter(user_id))
+    texts = [r["text"] for r in results]
+    if cacheable:
+        _cache_search(embedding, texts, user_id, generation)
+    return texts
 
 
 def retrieve_similar_ideas_with_scores(
     text: str,
     top_k: int | None = None,
     score_threshold: float | None = None,
+    user_id: str | None = None,
 ) -> list[dict[str, Any]]:
     """
     Retrieve ideas with similarity scores and metadata.
@@ -100,30 +305,56 @@ def retrieve_similar_ideas_with_scores(
         text: Query text to find similar ideas
         top_k: Number of results to return
         score_threshold: Minimum similarity score
+        user_id: Restrict the search to this user's ideas
 
     Returns:
         List of results with text, score, and metadata
     """
-    settings = get_settings()
     embedding_service = get_embedding_service()
     vector_store = get_vector_store()
 
-    top_k = top_k or settings.rag_top_k
-    score_threshold = score_threshold or settings.rag_score_threshold
-
+    # The store fills in defaults, taking its fast path for default searches
     embedding = embedding_service.embed_query(text)
-    return vector_store.search(embedding, top_k, score_threshold)
+    return vector_store.search(embedding, top_k, score_threshold, idea_filter(user_id))
 
 
-def get_all_memories() -> list[dict[str, Any]]:
+async def retrieve_similar_ideas_with_scores_async(
+    text: str,
+    top_k: int | None = None,
+    score_threshold: float | None = None,
+    user_id: str | None = None,
+) -> list[dict[str, Any]]:
     """
-    Get all stored memories/ideas (for debugging).
+    Retrieve ideas with similarity scores and metadata without blocking the event loop.
+
+    Args:
+        text: Query text to find similar ideas
+        top_k: Number of results to return
+        score_threshold: Minimum similarity score
+        user_id: Restrict the search to this user's ideas
+
+    Returns:
+        List of results with text, score, and metadata
+    """
+    embedding = await embed_batcher.submit(text, input_type="query")
+    return await get_vector_store().asearch(
+        embedding, top_k, score_threshold, idea_filter(user_id)
+    )
+
+
+def get_all_memories(limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+    """
+    Get a page of stored memories/ideas (for debugging).
+
+    Args:
+        limit: Maximum number of memories to return
+        offset: Number of memories to skip
 
     Returns:
-        List of all stored documents with metadata
+        List of stored documents with metadata
     """
     vector_store = get_vector_store()
-    return vector_store.get_all()
+    return vector_store.get_all(limit=limit, offset=offset)
 
 
 def delete_idea(doc_id: str) -> bool:
@@ -136,8 +367,14 @@ def delete_idea(doc_id: str) -> bool:
     Returns:
         True if deletion was successful
     """
+    global _search_cache_generation
     vector_store = get_vector_store()
-    return vector_store.delete(doc_id)
+    deleted = vector_store.delete(doc_id)
+    if deleted:
+        with _search_cache_lock:
+            _search_cache_generation += 1
+            search_cache.clear()
+    return deleted
 
 
 def get_memory_stats() -> dict[str, Any]:
@@ -0,0 +1,44 @@
+"""
+Vector similarity helpers.
+Vectorized cosine scoring over stacked float32 embeddings.
+"""
+import numpy as np
+
+
+def normalize(embedding: list[float] | np.ndarray) -> np.ndarray:
+    """Return `embedding` as an L2-normalized float32 array (zero vectors unchanged)."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def rank(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    top_k: int,
+    score_threshold: float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score rows of `matrix` against `query` in one matrix-vector product.
+
+    Both sides must already be L2-normalized so the dot product is the
+    cosine similarity. Only the top `top_k` rows are sorted.
+
+    Args:
+        matrix: (N, D) float32 array of unit vectors
+        query: (D,) float32 unit vector
+        top_k: Maximum number of rows to return
+        score_threshold: Optional minimum similarity
+
+    Returns:
+        (row indices, scores), best first
+    """
+    sims = matrix @ query
+    if top_k < sims.shape[0]:
+        candidates = np.argpartition(-sims, top_k)[:top_k]
+    else:
+        candidates = np.arange(sims.shape[0])
+    order = candidates[np.argsort(-sims[candidates])]
+    if score_threshold is not None:
+        order = order[sims[order] >= score_threshold]
+    return order, sims[order]
@@ -0,0 +1,165 @@
+"""
+Semantic task cache.
+Task lists extracted from earlier thoughts, kept in their own Qdrant
+collection so a paraphrased thought can reuse them instead of calling the
+LLM. Entries are shared across processes, only match extractions made
+with the same model and prompt, and expire after `task_semantic_cache_ttl_s`.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core.config import get_settings
+from app.rag.qdrant_store import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+
+_task_store: QdrantVectorStore | None = None
+_task_store_lock = threading.Lock()
+
+# Expired entries no longer match but stay stored until deleted; each
+# process deletes them at most this often, piggybacking on a store
+PURGE_INTERVAL_S = 600
+_next_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def get_task_store() -> QdrantVectorStore:
+    """Get or create the task cache store singleton (thread-safe)."""
+    global _task_store
+    if _task_store is None:
+        with _task_store_lock:
+            if _task_store is None:
+                settings = get_settings()
+                _task_store = QdrantVectorStore(
+                    collection_name=settings.task_cache_collection_name,
+                    embedding_dim=settings.active_embedding_dim,
+                )
+    return _task_store
+
+
+async def close_task_store() -> None:
+    """Close the task cache store's clients, if the store was created."""
+    global _task_store
+    if _task_store is not None:
+        await _task_store.aclose()
+        _task_store = None
+
+
+def _cutoff() -> str:
+    """Creation time before which entries are past the cache TTL."""
+    ttl = get_settings().task_semantic_cache_ttl_s
+    return (datetime.now(timezone.utc) - timedelta(seconds=ttl)).isoformat()
+
+
+def _fresh_filter(prompt_key: str) -> dict:
+    """Filter conditions matching unexpired entries made under a (model, prompt) pair."""
+    return {"must": [
+        {"key": "created_at", "range": {"gte": _cutoff()}},
+        {"key": "prompt_key", "match": {"value": prompt_key}},
+    ]}
+
+
+def _expired_filter() -> dict:
+    """Filter conditions matching entries past the cache TTL."""
+    return {"must": [{"key": "created_at", "range": {"lt": _cutoff()}}]}
+
+
+def _purge_due() -> bool:
+    """Whether this process should delete expired entries now; claims the run if so."""
+    global _next_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if now < _next_purge:
+            return False
+        _next_purge = now + PURGE_INTERVAL_S
+        return True
+
+
+def _tasks_of(hits: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
+    return hits[0]["metadata"].get("tasks") if hits else None
+
+
+def lookup_tasks(embedding: list[float], prompt_key: str) -> list[dict[str, Any]] | None:
+    """
+    Find the tasks of a fresh, near-identical earlier thought.
+
+    Args:
+        embedding: Query embedding of the thought
+        prompt_key: `template_key` of the extraction model and prompt
+
+    Returns:
+        The cached task list, or None on a miss or if the store is unreachable
+    """
+    try:
+        hits = get_task_store().search(
+            embedding,
+            top_k=1,
+            score_threshold=get_settings().task_semantic_cache_threshold,
+            filter_conditions=_fresh_filter(prompt_key),
+        )
+    except Exception as e:
+        logger.warning("Task cache lookup failed: %s", e)
+        return None
+    return _tasks_of(hits)
+
+
+async def lookup_tasks_async(
+    embedding: list[float],
+    prompt_key: str,
+) -> list[dict[str, Any]] | None:
+    """Async variant of `lookup_tasks`."""
+    try:
+        hits = await get_task_store().asearch(
+            embedding,
+            top_k=1,
+            score_threshold=get_settings().task_semantic_cache_threshold,
+            filter_conditions=_fresh_filter(prompt_key),
+        )
+    except Exception as e:
+        logger.warning("Task cache lookup failed: %s", e)
+        return None
+    return _tasks_of(hits)
+
+
+def store_tasks(
+    embedding: list[float],
+    thought: str,
+    tasks: list[dict[str, Any]],
+    prompt_key: str,
+) -> None:
+    """
+    Cache the tasks extracted from a thought, deleting expired entries every
+    `PURGE_INTERVAL_S`. Failures are only logged.
+
+    Args:
+        embedding: Query embedding of the thought
+        thought: The thought the tasks were extracted from
+        tasks: The parsed task list
+        prompt_key: `template_key` of the extraction model and prompt
+    """
+    try:
+        store = get_task_store()
+        store.add(embedding, thought, {"tasks": tasks, "prompt_key": prompt_key})
+        if _purge_due():
+            store.delete_where(_expired_filter())
+    except Exception as e:
+        logger.warning("Failed to cache tasks: %s", e)
+
+
+async def store_tasks_async(
+    embedding: list[float],
+    thought: str,
+    tasks: list[dict[str, Any]],
+    prompt_key: str,
+) -> None:
+    """Async variant of `store_tasks`."""
+    try:
+        store = get_task_store()
+        await store.aadd_batch([embedding], [thought], [{"tasks": tasks, "prompt_key": prompt_key}])
+        if _purge_due():
+            await store.adelete_where(_expired_filter())
+    except Exception as e:
+        logger.warning("Failed to cache tasks: %s", e)
@@ -0,0 +1,189 @@
+"""
+Batch task extraction service.
+Extracts tasks from large sets of thoughts through the provider's Batch API
+(Groq implements OpenAI's), which is billed at half price in exchange for
+asynchronous completion within the batch window. For backfills and
+evaluations, where latency doesn't matter.
+"""
+import logging
+import time
+from typing import Any
+
+import orjson
+
+from app.core.config import get_settings
+from app.core.exceptions import LLMError
+from app.prompts.prompt import load_prompt
+from app.services.llm_service import JSON_MODE, get_client
+from app.services.task_service import PROMPT_FILE, is_trivial_thought, parse_tasks
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _build_batch_file(system_prompt: str, thoughts: list[str]) -> bytes:
+    """Serialize one chat completion request per thought as JSONL, keyed by index."""
+    settings = get_settings()
+    return b"\n".join(
+        orjson.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": settings.task_extract_model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": thought},
+                ],
+                "temperature": 0.1,
+                "max_tokens": settings.llm_max_tokens,
+                "response_format": JSON_MODE,
+            },
+        })
+        for i, thought in enumerate(thoughts)
+    )
+
+
+def submit_task_batch(thoughts: list[str]) -> str:
+    """
+    Upload a task extraction batch and start it.
+
+    Args:
+        thoughts: Raw user thoughts
+
+    Returns:
+        The batch ID, for `wait_for_batch`
+
+    Raises:
+        FileNotFoundError: If the prompt file is missing
+        LLMError: If the upload or batch creation fails
+    """
+    system_prompt = load_prompt(PROMPT_FILE)
+    client = get_client()
+    try:
+        input_file = client.files.create(
+            file=("tasks.jsonl", _build_batch_file(system_prompt, thoughts)),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+    except Exception as e:
+        logger.error("Failed to submit task batch: %s", e)
+        raise LLMError(f"Failed to submit task batch: {str(e)}")
+    logger.info("Submitted task batch %s with %s thoughts", batch.id, len(thoughts))
+    return batch.id
+
+
+def wait_for_batch(
+    batch_id: str,
+    timeout_s: float = 24 * 3600,
+    initial_interval_s: float = 5.0,
+    max_interval_s: float = 300.0,
+) -> Any:
+    """
+    Poll a batch until it finishes, backing off between polls.
+
+    Args:
+        batch_id: ID returned by `submit_task_batch`
+        timeout_s: Give up after this many seconds
+        initial_interval_s: First polling interval, doubled after each poll
+        max_interval_s: Upper bound on the polling interval
+
+    Returns:
+        The completed batch
+
+    Raises:
+        LLMError: If the batch fails, expires, is cancelled or times out
+    """
+    client = get_client()
+    deadline = time.monotonic() + timeout_s
+    interval = initial_interval_s
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            break
+        if time.monotonic() + interval > deadline:
+            raise LLMError(
+                f"Task batch {batch_id} did not finish in time",
+                details={"status": batch.status},
+            )
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval_s)
+
+    if batch.status != "completed":
+        raise LLMError(
+            f"Task batch {batch_id} {batch.status}",
+            details={"status": batch.status},
+        )
+    return batch
+
+
+def collect_task_batch(batch: Any, count: int) -> list[list[dict[str, Any]]]:
+    """
+    Download a completed batch's output and map it back to its thoughts.
+
+    Args:
+        batch: Completed batch from `wait_for_batch`
+        count: Number of thoughts submitted
+
+    Returns:
+        One task list per thought, in order (empty where a request failed)
+    """
+    results: list[list[dict[str, Any]]] = [[] for _ in range(count)]
+    if not batch.output_file_id:
+        return results
+
+    content = get_client().files.content(batch.output_file_id).content
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = orjson.loads(line)
+            index = int(item["custom_id"])
+            body = item["response"]["body"]
+            output = body["choices"][0]["message"]["content"]
+            tasks = parse_tasks(output)
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            logger.warning("Skipping unusable batch result line: %s", e)
+            continue
+        if 0 <= index < count:
+            results[index] = tasks
+    return results
+
+
+def extract_tasks_via_batch(
+    thoughts: list[str],
+    timeout_s: float = 24 * 3600,
+) -> list[list[dict[str, Any]]]:
+    """
+    Extract tasks from many thoughts through the Batch API, blocking until done.
+
+    Args:
+        thoughts: Raw user thoughts
+        timeout_s: Give up waiting after this many seconds
+
+    Returns:
+        One task list per thought, in order (empty where a request failed or
+        the thought can't hold a task)
+
+    Raises:
+        LLMError: If the batch can't be submitted or doesn't complete
+    """
+    results: list[list[dict[str, Any]]] = [[] for _ in thoughts]
+    # Trivial thoughts get no tasks without being sent, as on the other paths
+    pending = [i for i, thought in enumerate(thoughts) if not is_trivial_thought(thought)]
+    if not pending:
+        return results
+    batch = wait_for_batch(
+        submit_task_batch([thoughts[i] for i in pending]), timeout_s=timeout_s
+    )
+    for i, tasks in zip(pending, collect_task_batch(batch, len(pending))):
+        results[i] = tasks
+    return results
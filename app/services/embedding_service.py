@@ -2,24 +2,75 @@
 Voyage AI embedding service.
 Provides text embeddings using Voyage AI's API for RAG retrieval.
 """
+import hashlib
 import logging
+import threading
 from typing import Literal
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
+from cachetools import TTLCache
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from app.core.config import get_settings
 from app.core.exceptions import EmbeddingError
+from app.core.http import get_http_client, get_sync_http_client
 
 logger = logging.getLogger(__name__)
 
 VOYAGE_API_URL = "https://api.voyageai.com/v1/embeddings"
 
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _is_transient(e: BaseException) -> bool:
+    """Retry connection failures, timeouts, rate limits and 5xx; not client errors."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in _RETRY_STATUSES
+    return isinstance(e, httpx.TransportError)
+
+
+def _retry_policy(input_type: str | None) -> dict:
+    """
+    Tenacity arguments for a Voyage call.
+
+    Queries sit on the user's request path, so they get one retry; document
+    embeddings feed background writes and get two. Jittered backoff starts
+    around 200 ms so concurrent callers don't retry in lockstep.
+    """
+    return {
+        "stop": stop_after_attempt(2 if input_type == "query" else 3),
+        "wait": wait_random_exponential(multiplier=0.2, max=4.0),
+        "retry": retry_if_exception(_is_transient),
+        "reraise": True,
+    }
+
+
+def embedding_cache_key(text: str, input_type: str | None) -> bytes:
+    """
+    Cache key for an embedding: a BLAKE2b digest of (input type, text).
+
+    Whitespace is collapsed first so inputs that differ only in spacing or
+    trailing newlines share one vector.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.blake2b(f"{input_type}\0{normalized}".encode(), digest_size=16).digest()
+
 
 class EmbeddingService:
     """
     Embedding service using Voyage AI.
     Supports query/document input types for optimized retrieval.
+
+    Single-text sync calls are cached in a thread-safe TTL cache, since the
+    sync path runs in worker threads; the async path caches in the embedding
+    batcher instead.
     """
 
     def __init__(self):
@@ -29,51 +80,98 @@ class EmbeddingService:
         self.api_key = settings.voyage_api_key
         self.model = settings.voyage_embedding_model
         self._dimension = settings.voyage_embedding_dim
+        self._cache: TTLCache = TTLCache(
+            maxsize=settings.embed_cache_max_entries,
+            ttl=settings.embed_cache_ttl_s,
+        )
+        self._cache_lock = threading.Lock()
+
+    def _build_request(
+        self,
+        texts: str | list[str],
+        input_type: Literal["query", "document"] | None = None,
+    ) -> tuple[dict[str, str], dict]:
+        """Build headers and JSON payload for a Voyage AI embedding request."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+        payload = {
+            "input": texts,
+            "model": self.model,
+        }
+        if input_type:
+            payload["input_type"] = input_type
+        return headers, payload
+
+    @staticmethod
+    def _handle_error(e: httpx.HTTPError) -> EmbeddingError:
+        """Log an HTTP failure and convert it to an EmbeddingError."""
+        if isinstance(e, httpx.HTTPStatusError):
+            error_body = e.response.text
+            logger.error("Voyage AI API error (%s): %s", e.response.status_code, error_body)
+            return EmbeddingError(f"Voyage AI API error: {error_body}")
+        logger.error("Voyage AI request failed: %s", e)
+        return EmbeddingError(f"Voyage AI request failed: {str(e)}")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
     def _call_api(
         self,
         texts: str | list[str],
         input_type: Literal["query", "document"] | None = None,
     ) -> list[list[float]]:
-        """Call Voyage AI embedding API."""
+        """Call Voyage AI embedding API over the shared sync HTTP client."""
+        headers, payload = self._build_request(texts, input_type)
         try:
-            with httpx.Client(timeout=30.0) as client:
-                payload = {
-                    "input": texts,
-                    "model": self.model,
-                }
-                if input_type:
-                    payload["input_type"] = input_type
-
-                response = client.post(
-                    VOYAGE_API_URL,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {self.api_key}",
-                    },
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return [item["embedding"] for item in data["data"]]
-        except httpx.HTTPStatusError as e:
-            error_body = e.response.text
-            logger.error(f"Voyage AI API error ({e.response.status_code}): {error_body}")
-            raise EmbeddingError(f"Voyage AI API error: {error_body}")
+            for attempt in Retrying(**_retry_policy(input_type)):
+                with attempt:
+                    response = get_sync_http_client().post(
+                        VOYAGE_API_URL, headers=headers, json=payload
+                    )
+                    response.raise_for_status()
+            data = orjson.loads(response.content)
+            return [item["embedding"] for item in data["data"]]
+        except httpx.HTTPError as e:
+            raise self._handle_error(e)
+
+    async def _call_api_async(
+        self,
+        texts: str | list[str],
+        input_type: Literal["query", "document"] | None = None,
+    ) -> list[list[float]]:
+        """Call Voyage AI embedding API over the shared async HTTP client."""
+        headers, payload = self._build_request(texts, input_type)
+        try:
+            async for attempt in AsyncRetrying(**_retry_policy(input_type)):
+                with attempt:
+                    response = await get_http_client().post(
+                        VOYAGE_API_URL, headers=headers, json=payload
+                    )
+                    response.raise_for_status()
+            data = orjson.loads(response.content)
+            return [item["embedding"] for item in data["data"]]
         except httpx.HTTPError as e:
-            logger.error(f"Voyage AI request failed: {e}")
-            raise EmbeddingError(f"Voyage AI request failed: {str(e)}")
+            raise self._handle_error(e)
+
+    def _embed_cached(self, text: str, input_type: Literal["query", "document"]) -> list[float]:
+        """Return a cached embedding or fetch and cache it."""
+        key = embedding_cache_key(text, input_type)
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+        if embedding is not None:
+            return list(embedding)
+
+        embedding = self._call_api(text, input_type=input_type)[0]
+        with self._cache_lock:
+            self._cache[key] = tuple(embedding)
+        return embedding
 
     def embed_query(self, text: str) -> list[float]:
         """Generate embedding for a search query."""
-        results = self._call_api(text, input_type="query")
-        return results[0]
+        return self._embed_cached(text, "query")
 
     def embed_document(self, text: str) -> list[float]:
         """Generate embedding for a document to be stored."""
-        results = self._call_api(text, input_type="document")
-        return results[0]
+        return self._embed_cached(text, "document")
 
     def embed_batch(
         self,
@@ -83,6 +181,24 @@ class EmbeddingService:
         """Generate embeddings for multiple texts."""
         return self._call_api(texts, input_type=input_type)
 
+    async def embed_query_async(self, text: str) -> list[float]:
+        """Generate embedding for a search query without blocking the event loop."""
+        results = await self._call_api_async(text, input_type="query")
+        return results[0]
+
+    async def embed_document_async(self, text: str) -> list[float]:
+        """Generate embedding for a document without blocking the event loop."""
+        results = await self._call_api_async(text, input_type="document")
+        return results[0]
+
+    async def embed_batch_async(
+        self,
+        texts: list[str],
+        input_type: Literal["query", "document"] = "document",
+    ) -> list[list[float]]:
+        """Generate embeddings for multiple texts without blocking the event loop."""
+        return await self._call_api_async(texts, input_type=input_type)
+
     @property
     def dimension(self) -> int:
         """Return the embedding dimension."""
@@ -99,13 +215,16 @@ class EmbeddingService:
 # ─────────────────────────────────────────────────────────────────
 
 _service: EmbeddingService | None = None
+_service_lock = threading.Lock()
 
 
 def get_embedding_service() -> EmbeddingService:
-    """Get or create the embedding service singleton."""
+    """Get or create the embedding service singleton (thread-safe)."""
     global _service
     if _service is None:
-        _service = EmbeddingService()
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
     return _service
 
 
@@ -117,7 +236,3 @@ def embed_text(text: str) -> list[float]:
 def embed_query(text: str) -> list[float]:
     """Embed text as a query (convenience function)."""
     return get_embedding_service().embed_query(text)
-
-
-# Export embedding dimension
-EMBEDDING_DIM = get_settings().active_embedding_dim
@@ -2,44 +2,76 @@
 Idea processing service.
 Core RAG flow for transforming messy thoughts into structured output.
 """
-import json
+import asyncio
 import logging
-from pathlib import Path
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
-from app.services.llm_service import run_llm, run_llm_with_context
-from app.rag.retriever import store_idea, retrieve_similar_ideas
+import numpy as np
+import orjson
+
+from app.api.schemas import IdeaResponse
+from app.core.config import get_settings
+from app.core.exceptions import ConfigurationError, LLMError
+from app.prompts.prompt import load_prompt
+from app.services.llm_service import (
+    run_llm,
+    run_llm_with_context,
+    run_llm_with_context_async,
+    stream_llm_with_context_async,
+)
+from app.services.semantic_cache import SemanticCache
+from app.rag.embed_batcher import embed_batcher
+from app.rag.retriever import (
+    delete_idea,
+    store_idea,
+    store_idea_async,
+    retrieve_similar_ideas,
+    search_similar_ideas_async,
+    session_prefetcher,
+)
 
 logger = logging.getLogger(__name__)
 
-PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "refine_prompt.txt"
+PROMPT_FILE = "refine_prompt.txt"
+
+_settings = get_settings()
+semantic_cache = SemanticCache(
+    dim=_settings.active_embedding_dim,
+    threshold=_settings.semantic_cache_threshold,
+    max_entries=_settings.semantic_cache_max_entries,
+)
 
 
-def process_idea(raw_text: str, store_in_memory: bool = True) -> dict[str, Any]:
+def process_idea(
+    raw_text: str,
+    store_in_memory: bool = True,
+    user_id: str | None = None,
+) -> IdeaResponse:
     """
     Core RAG flow for idea processing:
     1. Retrieve similar past ideas for context
     2. Generate structured output using LLM with context
     3. Store the new idea in vector memory
-    4. Return structured JSON response
+    4. Return structured response
 
     Args:
         raw_text: The raw, unstructured thought from user
         store_in_memory: Whether to store this idea for future recall
+        user_id: Optional owner; recall is limited to this user's ideas
 
     Returns:
-        Structured dict with clean_note, themes, and suggested_tasks
+        IdeaResponse with clean_note, themes, and suggested_tasks
+
+    Raises:
+        ConfigurationError: If the prompt file is missing
+        LLMError: If the LLM fails or returns unusable output
     """
-    # Load system prompt
-    try:
-        system_prompt = PROMPT_PATH.read_text()
-    except FileNotFoundError:
-        logger.error(f"Prompt file not found: {PROMPT_PATH}")
-        return {"error": "System configuration error", "raw_output": None}
+    system_prompt = _load_system_prompt()
 
     # 1️⃣ MEMORY READ — retrieve similar ideas for context
-    related_ideas = retrieve_similar_ideas(raw_text)
-    logger.info(f"Retrieved {len(related_ideas)} related ideas for context")
+    related_ideas = retrieve_similar_ideas(raw_text, user_id=user_id)
+    logger.info("Retrieved %s related ideas for context", len(related_ideas))
 
     # 2️⃣ GENERATION WITH CONTEXT
     llm_output = run_llm_with_context(
@@ -49,23 +81,298 @@ def process_idea(raw_text: str, store_in_memory: bool = True) -> dict[str, Any]:
     )
 
     # 3️⃣ MEMORY WRITE — store current idea for future recall
+    doc_id = None
     if store_in_memory:
-        doc_id = store_idea(raw_text, metadata={"source": "user_input"})
-        logger.info(f"Stored idea with ID: {doc_id}")
+        doc_id = store_idea(raw_text, metadata={"source": "user_input"}, user_id=user_id)
+        logger.info("Stored idea with ID: %s", doc_id)
+
+    # 4️⃣ PARSE AND RETURN STRUCTURED RESPONSE
+    return _parse_idea_output(llm_output, related_ideas, doc_id)
+
+
+async def process_idea_async(
+    raw_text: str,
+    store_in_memory: bool = True,
+    session_id: str | None = None,
+    user_id: str | None = None,
+) -> IdeaResponse:
+    """
+    Async variant of `process_idea` for use from async API routes.
+
+    Embedding, vector search and LLM calls are awaited so the event loop can
+    serve other requests while waiting on the network. The idea's document
+    embedding and upsert run alongside retrieval and the LLM call, and are
+    rolled back if the request fails. Paraphrases of a previously processed
+    idea are answered from the semantic cache, and follow-ups within a
+    session from that session's prefetched ideas.
+
+    Args:
+        raw_text: The raw, unstructured thought from user
+        store_in_memory: Whether to store this idea for future recall
+        session_id: Optional client session used for related-idea prefetching
+        user_id: Optional owner; recall is limited to this user's ideas
+
+    Returns:
+        IdeaResponse with clean_note, themes, and suggested_tasks
+
+    Raises:
+        ConfigurationError: If the prompt file is missing
+        LLMError: If the LLM fails or returns unusable output
+    """
+    system_prompt = _load_system_prompt()
+
+    query_embedding, cached = await _recall(raw_text, store_in_memory, user_id)
+    if cached is not None:
+        return cached
+
+    async with _pending_store(raw_text, store_in_memory, user_id) as pending:
+        related_ideas = await _related_ideas(query_embedding, session_id, user_id)
+        if pending is not None:
+            pending.start()
+
+        llm_output = await run_llm_with_context_async(
+            system_prompt=system_prompt,
+            user_input=raw_text,
+            context=related_ideas if related_ideas else None,
+        )
+
+        return await _finalize(
+            llm_output, related_ideas, query_embedding, pending, session_id, user_id
+        )
+
+
+async def stream_idea_async(
+    raw_text: str,
+    store_in_memory: bool = True,
+    session_id: str | None = None,
+    user_id: str | None = None,
+) -> AsyncIterator[tuple[str, dict[str, Any] | IdeaResponse]]:
+    """
+    Streaming variant of `process_idea_async`.
+
+    Yields ("delta", {"delta": text}) events while the LLM generates, then a
+    single terminal ("result", IdeaResponse) event. Failures raise the same
+    exceptions as `process_idea_async`.
+
+    Args:
+        raw_text: The raw, unstructured thought from user
+        store_in_memory: Whether to store this idea for future recall
+        session_id: Optional client session used for related-idea prefetching
+        user_id: Optional owner; recall is limited to this user's ideas
+    """
+    system_prompt = _load_system_prompt()
+
+    query_embedding, cached = await _recall(raw_text, store_in_memory, user_id)
+    if cached is not None:
+        yield "result", cached
+        return
+
+    async with _pending_store(raw_text, store_in_memory, user_id) as pending:
+        related_ideas = await _related_ideas(query_embedding, session_id, user_id)
+        if pending is not None:
+            pending.start()
+
+        chunks = []
+        async for delta in stream_llm_with_context_async(
+            system_prompt=system_prompt,
+            user_input=raw_text,
+            context=related_ideas if related_ideas else None,
+        ):
+            chunks.append(delta)
+            yield "delta", {"delta": delta}
+
+        result = await _finalize(
+            "".join(chunks), related_ideas, query_embedding, pending, session_id, user_id
+        )
+    yield "result", result
+
+
+async def _recall(
+    raw_text: str,
+    store_in_memory: bool,
+    user_id: str | None = None,
+) -> tuple[np.ndarray, IdeaResponse | None]:
+    """
+    Embed the query and look up a semantic cache hit.
 
-    # 4️⃣ PARSE AND RETURN STRUCTURED OUTPUT
+    On a hit, the idea is still stored if requested, and the returned copy
+    carries the new idea's ID.
+
+    Returns:
+        (query embedding, cached result or None)
+    """
+    query_embedding = await embed_batcher.submit(raw_text, input_type="query")
+
+    cached = semantic_cache.lookup(query_embedding, scope=user_id)
+    if cached is not None:
+        logger.info("Semantic cache hit")
+        if store_in_memory:
+            # The hit is a copy; it points at this idea, not the earlier one
+            cached.memory_id = await store_idea_async(
+                raw_text, metadata={"source": "user_input"}, user_id=user_id
+            )
+    return query_embedding, cached
+
+
+async def _related_ideas(
+    query_embedding: np.ndarray,
+    session_id: str | None = None,
+    user_id: str | None = None,
+) -> list[str]:
+    """Find related ideas from the session's prefetched pool, else from Qdrant."""
+    related_ideas = None
+    if session_id:
+        related_ideas = session_prefetcher.lookup(session_id, query_embedding, user_id=user_id)
+    if related_ideas is None:
+        related_ideas = await search_similar_ideas_async(query_embedding, user_id=user_id)
+    logger.info("Retrieved %s related ideas for context", len(related_ideas))
+    return related_ideas
+
+
+class _PendingStore:
+    """
+    Write path for one idea, run alongside retrieval and generation.
+
+    The document embedding starts on creation; `start()` queues the upsert
+    once retrieval is done (so the idea can't be its own context), and
+    `commit()` waits for its ID. An upsert that was never committed is
+    deleted again by `rollback()`.
+    """
+
+    def __init__(self, raw_text: str, user_id: str | None = None):
+        self.raw_text = raw_text
+        self.user_id = user_id
+        self._embedding = asyncio.ensure_future(
+            embed_batcher.submit(raw_text, input_type="document")
+        )
+        self._write: asyncio.Future | None = None
+        self._committed = False
+
+    def start(self) -> None:
+        """Queue the upsert; it runs while the caller awaits the LLM."""
+        if self._write is None:
+            self._write = asyncio.ensure_future(self._store())
+
+    async def _store(self) -> str:
+        return await store_idea_async(
+            self.raw_text,
+            metadata={"source": "user_input"},
+            embedding=await self._embedding,
+            user_id=self.user_id,
+        )
+
+    async def commit(self) -> str:
+        """Wait for the upsert and return the stored idea's ID."""
+        self.start()
+        doc_id = await self._write
+        self._committed = True
+        logger.info("Stored idea with ID: %s", doc_id)
+        return doc_id
+
+    async def rollback(self) -> None:
+        """Cancel the write path, deleting the idea if it was already stored."""
+        if self._committed:
+            return
+        if self._write is None:
+            self._embedding.cancel()
+            if self._embedding.done() and not self._embedding.cancelled():
+                self._embedding.exception()  # mark a failure retrieved
+            return
+        # An upsert already handed to the batcher lands even if cancelled,
+        # so let it finish and undo it
+        try:
+            doc_id = await asyncio.shield(self._write)
+        except Exception:
+            return
+        try:
+            await asyncio.to_thread(delete_idea, doc_id)
+            logger.info("Rolled back idea %s after a failed request", doc_id)
+        except Exception as e:
+            logger.error("Failed to roll back idea %s: %s", doc_id, e)
+
+
+@asynccontextmanager
+async def _pending_store(
+    raw_text: str,
+    store_in_memory: bool,
+    user_id: str | None = None,
+) -> AsyncIterator[_PendingStore | None]:
+    """
+    Run the idea's write path in the background for the duration of the block.
+
+    Yields None when the idea won't be stored. If the block exits without
+    committing (LLM failure, invalid output, client disconnect), the write
+    is rolled back.
+    """
+    if not store_in_memory:
+        yield None
+        return
+
+    pending = _PendingStore(raw_text, user_id)
+    try:
+        yield pending
+    finally:
+        await pending.rollback()
+
+
+async def _finalize(
+    llm_output: str,
+    related_ideas: list[str],
+    query_embedding: np.ndarray,
+    pending: _PendingStore | None,
+    session_id: str | None = None,
+    user_id: str | None = None,
+) -> IdeaResponse:
+    """
+    Parse the LLM output, commit the stored idea and cache the result.
+
+    Output is parsed before committing so an unusable response rolls the
+    idea back. Prefetching for the session starts after storing so the pool
+    includes this idea.
+    """
+    result = _parse_idea_output(llm_output, related_ideas)
+    if pending is not None:
+        result.memory_id = await pending.commit()
+    if session_id:
+        session_prefetcher.schedule(session_id, query_embedding, user_id)
+
+    semantic_cache.add(query_embedding, result, scope=user_id)
+    return result
+
+
+def _load_system_prompt() -> str:
+    """Load the idea refinement prompt, raising ConfigurationError if missing."""
+    try:
+        return load_prompt(PROMPT_FILE)
+    except FileNotFoundError:
+        logger.error("Prompt file not found: %s", PROMPT_FILE)
+        raise ConfigurationError("System configuration error: prompt file not found")
+
+
+def _parse_idea_output(
+    llm_output: str,
+    related_ideas: list[str],
+    doc_id: str | None = None,
+) -> IdeaResponse:
+    """
+    Parse the LLM's JSON output and annotate it with context usage.
+
+    Raises:
+        LLMError: If the output isn't JSON matching the response schema
+    """
     try:
-        result = json.loads(llm_output)
-        result["context_used"] = len(related_ideas) > 0
-        result["related_ideas_count"] = len(related_ideas)
-        return result
-    except json.JSONDecodeError:
-        logger.warning(f"LLM returned invalid JSON: {llm_output[:200]}")
-        return {
-            "error": "LLM returned invalid JSON",
-            "raw_output": llm_output,
+        return IdeaResponse.model_validate({
+            **orjson.loads(llm_output),
             "context_used": len(related_ideas) > 0,
-        }
+            "related_ideas_count": len(related_ideas),
+            "memory_id": doc_id,
+        })
+    except (ValueError, TypeError) as e:
+        logger.warning("LLM returned invalid output: %s", llm_output[:200])
+        raise LLMError(
+            "LLM returned invalid JSON",
+            details={"raw_output": llm_output, "reason": str(e)},
+        )
 
 
 def process_idea_without_memory(raw_text: str) -> dict[str, Any]:
@@ -80,13 +387,13 @@ def process_idea_without_memory(raw_text: str) -> dict[str, Any]:
         Structured dict with clean_note, themes, and suggested_tasks
     """
     try:
-        system_prompt = PROMPT_PATH.read_text()
+        system_prompt = load_prompt(PROMPT_FILE)
     except FileNotFoundError:
         return {"error": "System configuration error"}
 
     llm_output = run_llm(system_prompt, raw_text)
 
     try:
-        return json.loads(llm_output)
-    except json.JSONDecodeError:
+        return orjson.loads(llm_output)
+    except orjson.JSONDecodeError:
         return {"error": "LLM returned invalid JSON", "raw_output": llm_output}
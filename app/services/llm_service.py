@@ -2,26 +2,183 @@
 LLM Service using Groq's chat completion API (Llama 3.3 70B).
 Groq uses an OpenAI-compatible API, so we use the openai SDK with a custom base_url.
 """
+import asyncio
 import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random_exponential,
+)
 
 from app.core.config import get_settings
-from app.core.exceptions import LLMError
+from app.core.exceptions import LLMError, LLMSaturatedError
+from app.core.http import get_http_client, get_sync_http_client
 
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client (OpenAI-compatible API)
-settings = get_settings()
-client = OpenAI(
-    api_key=settings.groq_api_key,
-    base_url="https://api.groq.com/openai/v1",
-)
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Default structured-output format: the server only returns valid JSON
+JSON_MODE = {"type": "json_object"}
+
+# Groq clients (OpenAI-compatible API), rebuilt whenever the shared HTTP
+# client they pool connections on is replaced. SDK retries are disabled so
+# each call site's own retry policy is the only one.
+_client: OpenAI | None = None
+_sync_http_client = None
+_client_lock = threading.Lock()
+_async_client: AsyncOpenAI | None = None
+_async_http_client = None
+
+# Caps in-flight Groq calls; bound to the event loop it was created on
+_llm_semaphore: asyncio.Semaphore | None = None
+_llm_semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_client() -> OpenAI:
+    """Get or create the sync Groq client backed by the shared sync HTTP client."""
+    global _client, _sync_http_client
+    settings = get_settings()
+    http_client = get_sync_http_client()
+    with _client_lock:
+        if _client is None or _sync_http_client is not http_client:
+            _sync_http_client = http_client
+            _client = OpenAI(
+                api_key=settings.groq_api_key,
+                base_url=GROQ_BASE_URL,
+                http_client=http_client,
+                max_retries=0,
+            )
+        return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Get or create the async Groq client backed by the shared HTTP client."""
+    global _async_client, _async_http_client
+    settings = get_settings()
+    http_client = get_http_client()
+    if _async_client is None or _async_http_client is not http_client:
+        _async_http_client = http_client
+        _async_client = AsyncOpenAI(
+            api_key=settings.groq_api_key,
+            base_url=GROQ_BASE_URL,
+            http_client=http_client,
+            max_retries=0,
+        )
+    return _async_client
+
+
+@asynccontextmanager
+async def _llm_slot() -> AsyncIterator[None]:
+    """
+    Hold one of the `llm_max_concurrency` Groq slots for the duration of a call.
+
+    Raises:
+        LLMSaturatedError: If no slot frees up within `llm_acquire_timeout_s`
+    """
+    global _llm_semaphore, _llm_semaphore_loop
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    if _llm_semaphore is None or _llm_semaphore_loop is not loop:
+        _llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        _llm_semaphore_loop = loop
+
+    semaphore = _llm_semaphore
+    try:
+        await asyncio.wait_for(semaphore.acquire(), settings.llm_acquire_timeout_s)
+    except asyncio.TimeoutError:
+        logger.warning("LLM saturated: %d calls in flight", settings.llm_max_concurrency)
+        raise LLMSaturatedError(
+            "LLM saturated, try again shortly",
+            details={"max_concurrency": settings.llm_max_concurrency},
+        )
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+# Provider errors worth retrying: rate limits, 5xx, dropped connections and timeouts
+_TRANSIENT_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+STRUCTURED_MAX_ATTEMPTS = 5
+
+
+def _transient_retry_policy(max_attempts: int = STRUCTURED_MAX_ATTEMPTS) -> dict:
+    """
+    Tenacity arguments for a structured or batched call: bounded, jittered
+    exponential backoff on transient provider errors only. Anything else
+    fails at once.
+    """
+    return {
+        "stop": stop_after_attempt(max_attempts),
+        "wait": wait_random_exponential(multiplier=1, max=30),
+        "retry": retry_if_exception_type(_TRANSIENT_ERRORS),
+        "reraise": True,
+    }
+
+
+def _temperature(temperature: float | None) -> float:
+    """The requested temperature, else `llm_temperature`; 0.0 is a valid override."""
+    return temperature if temperature is not None else get_settings().llm_temperature
+
+
+def _build_messages(
+    system_prompt: str,
+    user_input: str,
+    context: str | None = None,
+) -> list[dict[str, str]]:
+    """
+    Build the chat messages for a system prompt and user input.
+
+    Per-request context goes in its own user message after the input, so
+    the system message stays a stable prefix for provider prompt caching.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_input},
+    ]
+    if context:
+        messages.append({"role": "user", "content": context})
+    return messages
+
+
+def _build_context_prompt(system_prompt: str, context: list[str] | None) -> str:
+    """Append RAG context to the system prompt when available."""
+    if not context:
+        return system_prompt
+    # One join, so a long system prompt is copied once rather than twice
+    return "".join([
+        system_prompt,
+        "\n\n---\n**Relevant Context:**\n",
+        "\n".join(f"- {c}" for c in context),
+    ])
 
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
-def run_llm(system_prompt: str, user_input: str, temperature: float | None = None) -> str:
+def run_llm(
+    system_prompt: str,
+    user_input: str,
+    temperature: float | None = None,
+    model: str | None = None,
+) -> str:
     """
     Run LLM inference using Groq's Llama 3.3 70B.
 
@@ -29,6 +186,7 @@ def run_llm(system_prompt: str, user_input: str, temperature: float | None = Non
         system_prompt: The system prompt defining AI behavior
         user_input: The user's input text
         temperature: Optional temperature override (0.0-1.0)
+        model: Optional model override (defaults to `groq_model`)
 
     Returns:
         The LLM's response text
@@ -36,20 +194,18 @@ def run_llm(system_prompt: str, user_input: str, temperature: float | None = Non
     Raises:
         LLMError: If the API call fails after retries
     """
+    settings = get_settings()
     try:
-        response = client.chat.completions.create(
-            model=settings.groq_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input},
-            ],
-            temperature=temperature or settings.llm_temperature,
+        response = get_client().chat.completions.create(
+            model=model or settings.groq_model,
+            messages=_build_messages(system_prompt, user_input),
+            temperature=_temperature(temperature),
             max_tokens=settings.llm_max_tokens,
         )
         return response.choices[0].message.content
 
     except Exception as e:
-        logger.error(f"LLM inference failed: {e}")
+        logger.error("LLM inference failed: %s", e)
         raise LLMError(f"Failed to generate response: {str(e)}")
 
 
@@ -72,12 +228,7 @@ def run_llm_with_context(
     Returns:
         The LLM's response text
     """
-    # Build context-enhanced prompt
-    enhanced_prompt = system_prompt
-    if context:
-        context_block = "\n\n---\n**Relevant Context:**\n" + "\n".join(f"- {c}" for c in context)
-        enhanced_prompt = system_prompt + context_block
-
+    enhanced_prompt = _build_context_prompt(system_prompt, context)
     return run_llm(enhanced_prompt, user_input, temperature)
 
 
@@ -85,6 +236,8 @@ def run_llm_structured(
     system_prompt: str,
     user_input: str,
     response_format: dict | None = None,
+    context: str | None = None,
+    model: str | None = None,
 ) -> str:
     """
     Run LLM with structured output (JSON mode).
@@ -92,24 +245,323 @@ def run_llm_structured(
     Args:
         system_prompt: The system prompt defining AI behavior
         user_input: The user's input text
-        response_format: Optional response format specification
+        response_format: Response format sent to the API; defaults to JSON mode
+        context: Optional per-request context, sent as a message after the input
+        model: Optional model override (defaults to `groq_model`)
 
     Returns:
         The LLM's response text (expected to be valid JSON)
+
+    Raises:
+        LLMError: If the call fails, after retrying transient errors
     """
+    settings = get_settings()
     try:
-        response = client.chat.completions.create(
-            model=settings.groq_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input},
-            ],
-            temperature=0.1,  # Lower temperature for structured output
-            max_tokens=settings.llm_max_tokens,
-            response_format={"type": "json_object"} if response_format else None,
-        )
+        for attempt in Retrying(**_transient_retry_policy()):
+            with attempt:
+                response = get_client().chat.completions.create(
+                    model=model or settings.groq_model,
+                    messages=_build_messages(system_prompt, user_input, context),
+                    temperature=0.1,  # Lower temperature for structured output
+                    max_tokens=settings.llm_max_tokens,
+                    response_format=response_format or JSON_MODE,
+                )
+        return response.choices[0].message.content
+
+    except Exception as e:
+        logger.error("Structured LLM inference failed: %s", e)
+        raise LLMError(f"Failed to generate structured response: {str(e)}")
+
+
+# ─────────────────────────────────────────────────────────────────
+# Async variants (used by the async API routes)
+# ─────────────────────────────────────────────────────────────────
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=1, max=10),
+    retry=retry_if_not_exception_type(LLMSaturatedError),
+)
+async def run_llm_async(
+    system_prompt: str,
+    user_input: str,
+    temperature: float | None = None,
+    model: str | None = None,
+) -> str:
+    """
+    Run LLM inference without blocking the event loop.
+
+    Args:
+        system_prompt: The system prompt defining AI behavior
+        user_input: The user's input text
+        temperature: Optional temperature override (0.0-1.0)
+        model: Optional model override (defaults to `groq_model`)
+
+    Returns:
+        The LLM's response text
+
+    Raises:
+        LLMError: If the API call fails after retries
+        LLMSaturatedError: If every concurrency slot stays busy
+    """
+    settings = get_settings()
+    async with _llm_slot():
+        try:
+            response = await get_async_client().chat.completions.create(
+                model=model or settings.groq_model,
+                messages=_build_messages(system_prompt, user_input),
+                temperature=_temperature(temperature),
+                max_tokens=settings.llm_max_tokens,
+            )
+            return response.choices[0].message.content
+
+        except Exception as e:
+            logger.error("LLM inference failed: %s", e)
+            raise LLMError(f"Failed to generate response: {str(e)}")
+
+
+async def run_llm_with_context_async(
+    system_prompt: str,
+    user_input: str,
+    context: list[str] | None = None,
+    temperature: float | None = None,
+) -> str:
+    """
+    Run async LLM inference with optional RAG context.
+
+    Args:
+        system_prompt: The system prompt defining AI behavior
+        user_input: The user's input text
+        context: Optional list of relevant context strings from RAG
+        temperature: Optional temperature override (0.0-1.0)
+
+    Returns:
+        The LLM's response text
+    """
+    enhanced_prompt = _build_context_prompt(system_prompt, context)
+    return await run_llm_async(enhanced_prompt, user_input, temperature)
+
+
+async def run_llm_structured_async(
+    system_prompt: str,
+    user_input: str,
+    response_format: dict | None = None,
+    context: str | None = None,
+    model: str | None = None,
+) -> str:
+    """
+    Run async LLM with structured output (JSON mode).
+
+    Args:
+        system_prompt: The system prompt defining AI behavior
+        user_input: The user's input text
+        response_format: Response format sent to the API; defaults to JSON mode
+        context: Optional per-request context, sent as a message after the input
+        model: Optional model override (defaults to `groq_model`)
+
+    Returns:
+        The LLM's response text (expected to be valid JSON)
+
+    Raises:
+        LLMError: If the call fails, after retrying transient errors
+        LLMSaturatedError: If every concurrency slot stays busy
+    """
+    settings = get_settings()
+    try:
+        async for attempt in AsyncRetrying(**_transient_retry_policy()):
+            with attempt:
+                # A slot is held per attempt, not across backoff sleeps
+                async with _llm_slot():
+                    response = await get_async_client().chat.completions.create(
+                        model=model or settings.groq_model,
+                        messages=_build_messages(system_prompt, user_input, context),
+                        temperature=0.1,  # Lower temperature for structured output
+                        max_tokens=settings.llm_max_tokens,
+                        response_format=response_format or JSON_MODE,
+                    )
         return response.choices[0].message.content
 
+    except LLMSaturatedError:
+        raise
     except Exception as e:
-        logger.error(f"Structured LLM inference failed: {e}")
+        logger.error("Structured LLM inference failed: %s", e)
         raise LLMError(f"Failed to generate structured response: {str(e)}")
+
+
+async def stream_llm_with_context_async(
+    system_prompt: str,
+    user_input: str,
+    context: list[str] | None = None,
+    temperature: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream LLM output token deltas as they are generated.
+
+    Not retried: a stream that fails midway cannot be replayed transparently.
+
+    Args:
+        system_prompt: The system prompt defining AI behavior
+        user_input: The user's input text
+        context: Optional list of relevant context strings from RAG
+        temperature: Optional temperature override (0.0-1.0)
+
+    Yields:
+        Text deltas in generation order
+    """
+    settings = get_settings()
+    enhanced_prompt = _build_context_prompt(system_prompt, context)
+    async with _llm_slot():
+        try:
+            stream = await get_async_client().chat.completions.create(
+                model=settings.groq_model,
+                messages=_build_messages(enhanced_prompt, user_input),
+                temperature=_temperature(temperature),
+                max_tokens=settings.llm_max_tokens,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error("LLM streaming failed: %s", e)
+            raise LLMError(f"Failed to stream response: {str(e)}")
+
+
+async def stream_llm_structured_async(
+    system_prompt: str,
+    user_input: str,
+    response_format: dict | None = None,
+    context: str | None = None,
+    model: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream structured (JSON mode) output deltas as they are generated.
+
+    Not retried: a stream that fails midway cannot be replayed transparently.
+
+    Args:
+        system_prompt: The system prompt defining AI behavior
+        user_input: The user's input text
+        response_format: Response format sent to the API; defaults to JSON mode
+        context: Optional per-request context, sent as a message after the input
+        model: Optional model override (defaults to `groq_model`)
+
+    Yields:
+        Text deltas in generation order
+    """
+    settings = get_settings()
+    async with _llm_slot():
+        try:
+            stream = await get_async_client().chat.completions.create(
+                model=model or settings.groq_model,
+                messages=_build_messages(system_prompt, user_input, context),
+                temperature=0.1,  # Lower temperature for structured output
+                max_tokens=settings.llm_max_tokens,
+                response_format=response_format or JSON_MODE,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error("Structured LLM streaming failed: %s", e)
+            raise LLMError(f"Failed to stream structured response: {str(e)}")
+
+
+# ─────────────────────────────────────────────────────────────────
+# Batched calls
+# ─────────────────────────────────────────────────────────────────
+
+class _RateLimiter:
+    """
+    Token buckets for a provider's requests-per-minute and tokens-per-minute
+    limits. A limit of 0 is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._limits = (requests_per_minute, tokens_per_minute)
+        self._available = [float(requests_per_minute), float(tokens_per_minute)]
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        for i, limit in enumerate(self._limits):
+            self._available[i] = min(limit, self._available[i] + elapsed * limit / 60)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of about `tokens` tokens fits both budgets."""
+        # Never ask for more than a full bucket, or the wait would never end
+        cost = [min(cost, limit) for cost, limit in zip((1, tokens), self._limits)]
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = max(
+                    ((c - available) * 60 / limit if limit else 0)
+                    for c, available, limit in zip(cost, self._available, self._limits)
+                )
+                if wait <= 0:
+                    self._available = [a - c for a, c in zip(self._available, cost)]
+                    return
+                await asyncio.sleep(wait)
+
+
+def _estimate_tokens(system_prompt: str, user_input: str) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the completion budget."""
+    return (len(system_prompt) + len(user_input)) // 4 + get_settings().llm_max_tokens
+
+
+async def run_llm_batch(
+    pairs: list[tuple[str, str]],
+    concurrency: int = 10,
+    temperature: float | None = None,
+    max_attempts: int = STRUCTURED_MAX_ATTEMPTS,
+    model: str | None = None,
+) -> list[str | LLMError]:
+    """
+    Run many independent LLM calls concurrently.
+
+    At most `concurrency` calls from the batch are in flight at once, and
+    they also count against the shared `llm_max_concurrency` slots. Calls
+    are paced to `llm_requests_per_minute` / `llm_tokens_per_minute` and
+    retried with jittered exponential backoff on transient provider errors.
+    A call that still fails yields its error in place of a response instead
+    of failing the batch.
+
+    Args:
+        pairs: (system_prompt, user_input) pairs
+        concurrency: Maximum in-flight calls for this batch
+        temperature: Optional temperature override (0.0-1.0)
+        max_attempts: Attempts per call, including the first
+        model: Optional model override (defaults to `groq_model`)
+
+    Returns:
+        One response text or LLMError per pair, in the same order
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = _RateLimiter(settings.llm_requests_per_minute, settings.llm_tokens_per_minute)
+
+    async def _one(system_prompt: str, user_input: str) -> str | LLMError:
+        try:
+            async with semaphore:
+                async for attempt in AsyncRetrying(**_transient_retry_policy(max_attempts)):
+                    with attempt:
+                        await limiter.acquire(_estimate_tokens(system_prompt, user_input))
+                        async with _llm_slot():
+                            response = await get_async_client().chat.completions.create(
+                                model=model or settings.groq_model,
+                                messages=_build_messages(system_prompt, user_input),
+                                temperature=_temperature(temperature),
+                                max_tokens=settings.llm_max_tokens,
+                            )
+                        return response.choices[0].message.content
+        except Exception as e:
+            logger.error("Batched LLM call failed: %s", e)
+            return e if isinstance(e, LLMError) else LLMError(f"Failed to generate response: {str(e)}")
+
+    return await asyncio.gather(*(_one(system_prompt, user_input) for system_prompt, user_input in pairs))
@@ -0,0 +1,149 @@
+"""
+Template-aware response cache.
+Thoughts that differ from an earlier one only in literal values (numbers,
+times, quoted text, URLs, emails) reuse its response with those values
+swapped in, instead of calling the LLM again.
+"""
+import copy
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from typing import Any
+
+from cachetools import TTLCache
+
+# Literal values treated as slots; everything else is the thought's skeleton
+_SLOT = re.compile(
+    r'"[^"\n]+"'
+    r"|https?://\S+"
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"
+    r"|\d+(?:[:.,]\d+)*"
+)
+
+
+@lru_cache(maxsize=64)
+def template_key(model: str, template: str) -> str:
+    """Key for a (model, prompt template) pair: a BLAKE2b digest, computed once per pair."""
+    return hashlib.blake2b(f"{model}\x1f{template}".encode(), digest_size=16).hexdigest()
+
+
+def split_slots(text: str) -> tuple[str, tuple[str, ...]]:
+    """
+    Split a thought into its skeleton and its slot values.
+
+    The skeleton is lowercased and whitespace-collapsed, with each slot
+    replaced by a marker, so "Pay rent of 1200 on the 5th" and "pay rent
+    of 950 on the 12th" share one skeleton.
+    """
+    values = tuple(m.group(0) for m in _SLOT.finditer(text))
+    skeleton = " ".join(_SLOT.sub("\0", text).lower().split())
+    return skeleton, values
+
+
+def _slot_pattern(values: list[str]) -> re.Pattern:
+    """
+    Match any of the slot values, longest first so "12" isn't matched inside
+    "12:30", and never as part of a longer number.
+    """
+    alternatives = []
+    for value in sorted(values, key=len, reverse=True):
+        escaped = re.escape(value)
+        if value[0].isdigit():
+            escaped = rf"(?<![\d.,:]){escaped}(?![.,:]?\d)"
+        alternatives.append(escaped)
+    return re.compile("|".join(alternatives))
+
+
+def _substitute(response: Any, pattern: re.Pattern, mapping: dict[str, str], seen: set[str]) -> Any:
+    """Replace slot values in every string of a JSON-like response, in one pass."""
+    if isinstance(response, str):
+        def replace(m: re.Match) -> str:
+            seen.add(m.group(0))
+            return mapping[m.group(0)]
+        return pattern.sub(replace, response)
+    if isinstance(response, list):
+        return [_substitute(item, pattern, mapping, seen) for item in response]
+    if isinstance(response, dict):
+        return {k: _substitute(v, pattern, mapping, seen) for k, v in response.items()}
+    return response
+
+
+class PromptCache:
+    """
+    Cache of responses keyed by (prompt template, thought skeleton).
+
+    A lookup only synthesizes a response when it can do so confidently:
+    the skeleton must match exactly, every slot value that changed must
+    appear verbatim in the cached response, and no old value may map to
+    two different new values. Anything else is a miss, and the caller
+    falls through to its other tiers.
+
+    Thread-safe, since the sync extraction path runs in worker threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, template: str, text: str) -> Any | None:
+        """
+        Synthesize a response for `text` from a structurally identical one.
+
+        Args:
+            template: Template key from `template_key`
+            text: The new thought
+
+        Returns:
+            The adapted response, or None when no confident match exists
+        """
+        skeleton, values = split_slots(text)
+        if not values:
+            # Nothing to substitute; only an exact match could apply
+            return None
+        with self._lock:
+            entry = self._cache.get((template, skeleton))
+        response = self._adapt(entry, values) if entry is not None else None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    @staticmethod
+    def _adapt(entry: tuple[tuple[str, ...], Any], values: tuple[str, ...]) -> Any | None:
+        old_values, response = entry
+        mapping: dict[str, str] = {}
+        for old, new in zip(old_values, values):
+            if mapping.setdefault(old, new) != new:
+                return None
+        changed = {old: new for old, new in mapping.items() if old != new}
+        if not changed:
+            return copy.deepcopy(response)
+
+        seen: set[str] = set()
+        adapted = _substitute(response, _slot_pattern(list(changed)), changed, seen)
+        return adapted if len(seen) == len(changed) else None
+
+    def add(self, template: str, text: str, response: Any) -> None:
+        """Remember a response for the thought's skeleton (thoughts without slots are skipped)."""
+        skeleton, values = split_slots(text)
+        if not values:
+            return
+        with self._lock:
+            self._cache[(template, skeleton)] = (values, copy.deepcopy(response))
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+        }
@@ -0,0 +1,239 @@
+"""
+Semantic response cache.
+Returns a cached response when a new query embedding is close enough
+(cosine similarity) to a previously answered one.
+"""
+import copy
+import time
+from typing import Any
+
+import numpy as np
+
+from app.core.response_cache import memory_id_of
+from app.rag.similarity import normalize
+
+
+class SemanticCache:
+    """
+    Fixed-capacity cache of (query embedding, response) pairs.
+
+    Embeddings are L2-normalized on insert so a single matrix-vector product
+    yields cosine similarities. Small caches are scanned exhaustively; once
+    the cache holds more than `lsh_min_entries` entries, candidates are
+    narrowed with random-projection LSH before scoring.
+
+    Entries can carry a scope (e.g. a user ID); a lookup only considers
+    entries from its own scope, so answers built from one user's memories
+    are never served to another and never shadow a match in the caller's
+    own scope.
+
+    With a `ttl`, entries expire that many seconds after they were added, for
+    responses that can go stale in ways the owner cannot invalidate.
+
+    The matrix is stored as float16 to halve memory traffic. Exhaustive scans
+    upcast `tile_rows` rows at a time so the float32 working set stays in
+    cache; float16 rounding moves similarities by well under 1e-2, far below
+    the gap between paraphrases and unrelated queries.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        threshold: float = 0.97,
+        max_entries: int = 4096,
+        lsh_min_entries: int = 2048,
+        lsh_tables: int = 8,
+        lsh_bits: int = 16,
+        tile_rows: int = 512,
+        seed: int = 0,
+        ttl: float | None = None,
+    ):
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.lsh_min_entries = lsh_min_entries
+        self.tile_rows = tile_rows
+        self.ttl = ttl
+
+        self._matrix = np.zeros((max_entries, dim), dtype=np.float16)
+        self._responses: list[Any | None] = [None] * max_entries
+        # Object array so a lookup can mask other scopes in one comparison
+        self._scopes = np.full(max_entries, None, dtype=object)
+        self._expires = np.full(max_entries, np.inf)
+        self._size = 0
+        self._next = 0
+
+        # Random hyperplanes: (tables, bits, dim)
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((lsh_tables, lsh_bits, dim)).astype(np.float32)
+        self._buckets: list[dict[bytes, set[int]]] = [{} for _ in range(lsh_tables)]
+        self._codes: list[list[bytes] | None] = [None] * max_entries
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _hash(self, vec: np.ndarray) -> list[bytes]:
+        """Compute one bucket code per LSH table."""
+        bits = (self._planes @ vec) > 0
+        return [row.tobytes() for row in np.packbits(bits, axis=1)]
+
+    def _candidates(self, vec: np.ndarray) -> np.ndarray:
+        """Collect slots sharing an LSH bucket with the query in any table."""
+        found: set[int] = set()
+        for table, code in zip(self._buckets, self._hash(vec)):
+            found.update(table.get(code, ()))
+        return np.fromiter(found, dtype=np.intp, count=len(found))
+
+    def lookup(self, embedding: list[float] | np.ndarray, scope: str | None = None) -> Any | None:
+        """
+        Find a cached response for a semantically equivalent query.
+
+        Args:
+            embedding: Query embedding
+            scope: Only match entries added with the same scope
+
+        Returns:
+            A copy of the cached response, or None if nothing is similar enough
+        """
+        if self._size == 0:
+            return None
+
+        vec = normalize(embedding)
+        # Unexpired entries in the caller's scope; masked before the argmax
+        # so another scope's closer entry can't hide a match
+        eligible = (self._expires[:self._size] > time.monotonic()) & (
+            self._scopes[:self._size] == scope
+        )
+        if self._size < self.lsh_min_entries:
+            slot, score = self._scan(vec, eligible)
+        else:
+            slots = self._candidates(vec)
+            slots = slots[eligible[slots]]
+            if slots.size == 0:
+                return None
+            sims = self._matrix[slots].astype(np.float32) @ vec
+            best = int(np.argmax(sims))
+            slot, score = int(slots[best]), float(sims[best])
+
+        if slot < 0 or score < self.threshold:
+            return None
+        response = self._responses[slot]
+        return copy.deepcopy(response) if response is not None else None
+
+    def _scan(self, vec: np.ndarray, eligible: np.ndarray) -> tuple[int, float]:
+        """Score the eligible entries tile by tile; return the best slot and score."""
+        best_slot, best_score = -1, -np.inf
+        for start in range(0, self._size, self.tile_rows):
+            end = min(start + self.tile_rows, self._size)
+            sims = self._matrix[start:end].astype(np.float32) @ vec
+            sims[~eligible[start:end]] = -np.inf
+            i = int(np.argmax(sims))
+            if sims[i] > best_score:
+                best_slot, best_score = start + i, float(sims[i])
+        return best_slot, best_score
+
+    def add(
+        self,
+        embedding: list[float] | np.ndarray,
+        response: Any,
+        scope: str | None = None,
+    ) -> None:
+        """Cache a response, evicting the oldest entry when full."""
+        slot = self._next
+        self._evict(slot)
+
+        vec = normalize(embedding)
+        codes = self._hash(vec)
+        for table, code in zip(self._buckets, codes):
+            table.setdefault(code, set()).add(slot)
+
+        self._matrix[slot] = vec
+        self._responses[slot] = copy.deepcopy(response)
+        self._scopes[slot] = scope
+        self._expires[slot] = time.monotonic() + self.ttl if self.ttl is not None else np.inf
+        self._codes[slot] = codes
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def _evict(self, slot: int) -> None:
+        codes = self._codes[slot]
+        if codes is None:
+            return
+        for table, code in zip(self._buckets, codes):
+            bucket = table.get(code)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del table[code]
+        self._codes[slot] = None
+
+    def invalidate_doc(self, doc_id: str) -> int:
+        """
+        Drop cached responses that reference a stored memory.
+
+        The freed slot is zeroed so it can no longer match.
+
+        Args:
+            doc_id: The document ID that was deleted
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for slot, response in enumerate(self._responses):
+            if response is not None and memory_id_of(response) == doc_id:
+                self._evict(slot)
+                self._responses[slot] = None
+                self._matrix[slot] = 0.0
+                removed += 1
+        return removed
+
+    def invalidate_near(
+        self,
+        embedding: list[float] | np.ndarray,
+        threshold: float,
+        scope: str | None = None,
+    ) -> int:
+        """
+        Drop cached entries whose query lies within `threshold` of an embedding.
+
+        Used when cached responses are search results: a newly stored document
+        can only enter the results of queries it scores at least the search
+        threshold against, and only of unscoped queries or those in its own
+        scope, so only those entries go stale.
+
+        Args:
+            embedding: Embedding of the newly stored document
+            threshold: Minimum cosine similarity at which an entry is dropped
+            scope: Scope the document belongs to
+
+        Returns:
+            Number of entries removed
+        """
+        if self._size == 0:
+            return 0
+
+        vec = normalize(embedding)
+        removed = 0
+        for start in range(0, self._size, self.tile_rows):
+            end = min(start + self.tile_rows, self._size)
+            sims = self._matrix[start:end].astype(np.float32) @ vec
+            for slot in (start + np.flatnonzero(sims >= threshold)).tolist():
+                if self._responses[slot] is None or self._scopes[slot] not in (None, scope):
+                    continue
+                self._evict(slot)
+                self._responses[slot] = None
+                self._matrix[slot] = 0.0
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._matrix.fill(0.0)
+        self._responses = [None] * self.max_entries
+        self._scopes.fill(None)
+        self._expires.fill(np.inf)
+        self._codes = [None] * self.max_entries
+        self._buckets = [{} for _ in self._buckets]
+        self._size = 0
+        self._next = 0
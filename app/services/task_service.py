@@ -2,84 +2,669 @@
 Task extraction service.
 Extracts actionable tasks from messy thoughts using LLM.
 """
-import json
+import asyncio
+import copy
+import hashlib
 import logging
-from pathlib import Path
-from typing import Any
+import re
+import threading
+from typing import Any, AsyncIterator
 
-from app.services.llm_service import run_llm_structured
+import orjson
+from cachetools import TTLCache
+
+from app.core.config import get_settings
+from app.core.exceptions import LLMError, LLMSaturatedError
+from app.prompts.prompt import load_prompt
+from app.rag.embed_batcher import embed_batcher
+from app.rag.task_cache import lookup_tasks, lookup_tasks_async, store_tasks, store_tasks_async
+from app.services.embedding_service import get_embedding_service
+from app.services.llm_service import (
+    JSON_MODE,
+    run_llm_structured,
+    run_llm_structured_async,
+    stream_llm_structured_async,
+)
+from app.services.prompt_cache import PromptCache, template_key
 
 logger = logging.getLogger(__name__)
 
-PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "task_extract_prompt.txt"
+PROMPT_FILE = "task_extract_prompt.txt"
+
+# Structured-output schema for a single thought's tasks
+TASKS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "tasks",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "tasks": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task": {"type": "string"},
+                            "priority": {"type": "string", "enum": ["low", "medium", "high"]},
+                        },
+                        "required": ["task", "priority"],
+                    },
+                },
+            },
+            "required": ["tasks"],
+        },
+    },
+}
+
+# Exact-match cache of parsed task lists. The sync functions run in worker
+# threads, so access goes through a lock.
+_settings = get_settings()
+_task_cache: TTLCache = TTLCache(
+    maxsize=_settings.task_cache_max_entries,
+    ttl=_settings.task_cache_ttl_s,
+)
+_task_cache_lock = threading.Lock()
+
+# Tasks for thoughts that differ from an earlier one only in literal values
+prompt_cache = PromptCache(
+    maxsize=_settings.task_cache_max_entries,
+    ttl=_settings.task_cache_ttl_s,
+)
+
+
+def _task_cache_key(system_prompt: str, user_input: str, context: str | None = None) -> bytes:
+    """
+    Cache key for an extraction: a BLAKE2b digest of (model, system prompt, input, context).
+
+    The (model, prompt) pair enters through its memoized template key, so
+    only the thought and context are hashed per call.
+    """
+    raw = "\x1f".join((
+        template_key(get_settings().task_extract_model, system_prompt),
+        user_input,
+        context or "",
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+
+def _cached_tasks(key: bytes) -> list[dict[str, Any]] | None:
+    """Return a copy of the cached task list, or None on a miss."""
+    with _task_cache_lock:
+        tasks = _task_cache.get(key)
+    return copy.deepcopy(tasks) if tasks is not None else None
+
+
+def _cache_tasks(key: bytes, tasks: list[dict[str, Any]]) -> None:
+    """Remember the parsed task list of a successful extraction."""
+    with _task_cache_lock:
+        _task_cache[key] = copy.deepcopy(tasks)
+
+
+def _template_lookup(system_prompt: str, thought: str) -> list[dict[str, Any]] | None:
+    """Adapt the tasks of a structurally identical thought, if the template tier is on."""
+    settings = get_settings()
+    if not settings.task_template_cache:
+        return None
+    return prompt_cache.lookup(template_key(settings.task_extract_model, system_prompt), thought)
+
+
+def _template_store(system_prompt: str, thought: str, tasks: list[dict[str, Any]]) -> None:
+    """Remember tasks for the thought's skeleton, if the template tier is on."""
+    settings = get_settings()
+    if settings.task_template_cache:
+        prompt_cache.add(template_key(settings.task_extract_model, system_prompt), thought, tasks)
+
+
+# Pre-filter (opt-in via `task_prefilter`): thoughts shorter than this, or
+# without any of these action cues, are answered with no tasks locally
+MIN_THOUGHT_CHARS = 8
+_ACTION_CUES = re.compile(
+    r"\b(?:need|needs|have to|has to|got to|gotta|should|must|todo|to-do|remember|"
+    r"don'?t forget|buy|call|email|send|write|finish|book|pay|schedule|fix|plan|"
+    r"pick up|submit|review|prepare|follow up|reply|order|cancel|renew|clean)\b",
+    re.IGNORECASE,
+)
+
+
+def is_trivial_thought(thought: str) -> bool:
+    """
+    Whether a thought can be answered with no tasks without calling the LLM.
+
+    Thoughts without a letter or digit always are. With `task_prefilter`
+    enabled, so are very short thoughts and ones with no action cue.
+    """
+    text = thought.strip()
+    if not any(c.isalnum() for c in text):
+        return True
+    if not get_settings().task_prefilter:
+        return False
+    return len(text) < MIN_THOUGHT_CHARS or not _ACTION_CUES.search(text)
+
+
+def _semantic_lookup(
+    thought: str,
+    prompt_key: str,
+) -> tuple[list[float] | None, list[dict[str, Any]] | None]:
+    """
+    Embed a thought and look up the tasks of a near-identical earlier one
+    extracted under the same model and prompt.
+
+    Returns:
+        (embedding or None if embedding failed, cached tasks or None)
+    """
+    try:
+        embedding = get_embedding_service().embed_query(thought)
+    except Exception as e:
+        logger.warning("Task cache embedding failed: %s", e)
+        return None, None
+    return embedding, lookup_tasks(embedding, prompt_key)
+
+
+async def _semantic_lookup_async(
+    thought: str,
+    prompt_key: str,
+) -> tuple[list[float] | None, list[dict[str, Any]] | None]:
+    """Async variant of `_semantic_lookup`."""
+    try:
+        embedding = await embed_batcher.submit(thought, input_type="query")
+    except Exception as e:
+        logger.warning("Task cache embedding failed: %s", e)
+        return None, None
+    return embedding, await lookup_tasks_async(embedding, prompt_key)
+
+
+def _response_format() -> dict | None:
+    """Schema-constrained output if enabled, else the default JSON mode."""
+    return TASKS_RESPONSE_FORMAT if get_settings().task_json_schema else None
 
 
-def extract_tasks(thought: str) -> list[dict[str, Any]]:
+def parse_tasks(response: str | bytes) -> list[dict[str, Any]]:
+    """
+    Parse the task list out of an extraction response.
+
+    Raises:
+        ValueError: If the response isn't a JSON object with a list of tasks
+    """
+    data = orjson.loads(response)
+    tasks = data.get("tasks", []) if isinstance(data, dict) else None
+    if not isinstance(tasks, list):
+        raise ValueError("response has no task list")
+    return tasks
+
+
+def _context_message(context: list[str] | None) -> str | None:
+    """
+    Render related notes as the message sent after the thought.
+
+    Context goes in its own message, keeping the system prompt a stable,
+    cacheable prefix.
+    """
+    if not context:
+        return None
+    return "\n".join(["Context from related notes:", *(f"- {c}" for c in context)])
+
+
+class _Extraction:
+    """
+    The I/O-free steps of one extraction, shared by `extract_tasks` and
+    `extract_tasks_async`: those differ only in how they await the semantic
+    tier, the LLM call and the semantic store.
+    """
+
+    def __init__(self, thought: str, context: list[str] | None, system_prompt: str):
+        self.thought = thought
+        self.system_prompt = system_prompt
+        self.context_message = _context_message(context)
+        self.key = _task_cache_key(system_prompt, thought, self.context_message)
+        # Semantic-tier entries are only reused under the same model and prompt
+        self.prompt_key = template_key(get_settings().task_extract_model, system_prompt)
+        # The template and semantic tiers key on the thought alone
+        self.reusable = self.context_message is None
+        self.embedding: list[float] | None = None
+
+    @classmethod
+    def start(cls, thought: str, context: list[str] | None) -> "_Extraction | None":
+        """Begin an extraction, or return None if it can only yield no tasks."""
+        if is_trivial_thought(thought):
+            return None
+        try:
+            system_prompt = load_prompt(PROMPT_FILE)
+        except FileNotFoundError:
+            logger.error("Prompt file not found: %s", PROMPT_FILE)
+            return None
+        return cls(thought, context, system_prompt)
+
+    def local_hit(self) -> list[dict[str, Any]] | None:
+        """Answer from the exact-match tier, else the template tier."""
+        cached = _cached_tasks(self.key)
+        if cached is not None or not self.reusable:
+            return cached
+        cached = _template_lookup(self.system_prompt, self.thought)
+        if cached is not None:
+            _cache_tasks(self.key, cached)
+        return cached
+
+    @property
+    def wants_semantic(self) -> bool:
+        return self.reusable and get_settings().task_semantic_cache
+
+    def semantic_hit(
+        self,
+        embedding: list[float] | None,
+        cached: list[dict[str, Any]] | None,
+    ) -> list[dict[str, Any]] | None:
+        """Record a semantic lookup's result; returns its tasks on a hit."""
+        self.embedding = embedding
+        if cached is not None:
+            _cache_tasks(self.key, cached)
+        return cached
+
+    def llm_kwargs(self) -> dict[str, Any]:
+        return {
+            "system_prompt": self.system_prompt,
+            "user_input": self.thought,
+            "response_format": _response_format(),
+            "context": self.context_message,
+            "model": get_settings().task_extract_model,
+        }
+
+    def finish(self, response: str) -> list[dict[str, Any]]:
+        """
+        Parse the LLM response and remember it in the local tiers.
+
+        Raises:
+            ValueError: If the response isn't a JSON object with a list of tasks
+        """
+        tasks = parse_tasks(response)
+        _cache_tasks(self.key, tasks)
+        if self.reusable:
+            _template_store(self.system_prompt, self.thought, tasks)
+        return tasks
+
+
+def _extraction_failed(e: Exception, strict: bool = False) -> list[dict[str, Any]]:
+    """
+    Log a failed extraction and answer it with no tasks.
+
+    Raises:
+        LLMSaturatedError: Always re-raised, so the route can shed load
+        LLMError: Instead of answering, when `strict` is set
+    """
+    if isinstance(e, LLMSaturatedError):
+        raise e
+    if isinstance(e, ValueError):
+        logger.warning("Failed to parse task response: %s", e)
+        if strict:
+            raise LLMError("LLM returned invalid task JSON", details={"reason": str(e)})
+    else:
+        logger.error("Task extraction failed: %s", e)
+        if strict:
+            raise e if isinstance(e, LLMError) else LLMError(f"Task extraction failed: {e}")
+    return []
+
+
+def extract_tasks(
+    thought: str,
+    context: list[str] | None = None,
+) -> list[dict[str, Any]]:
     """
     Extract actionable tasks from a messy thought.
 
+    Repeated extractions of the same thought (and context) with the same
+    prompt and model are answered from an exact-match cache of parsed task
+    lists. Without context, two more tiers apply: with
+    `task_template_cache` enabled, thoughts differing from an earlier one
+    only in literal values reuse its tasks with the values swapped in; with
+    `task_semantic_cache` enabled, paraphrases of a recent thought are then
+    answered from the semantic task cache. Thoughts that can't hold a task
+    (see `is_trivial_thought`) return no tasks without any of this.
+
     Args:
         thought: Raw user thought/input text
+        context: Optional list of related context strings
 
     Returns:
         List of task dicts with 'task' and 'priority' keys
     """
-    try:
-        system_prompt = PROMPT_PATH.read_text()
-    except FileNotFoundError:
-        logger.error(f"Prompt file not found: {PROMPT_PATH}")
+    extraction = _Extraction.start(thought, context)
+    if extraction is None:
         return []
-
-    # Inject the thought into the prompt template
-    formatted_prompt = system_prompt.replace("{thought}", thought)
+    tasks = extraction.local_hit()
+    if tasks is None and extraction.wants_semantic:
+        tasks = extraction.semantic_hit(*_semantic_lookup(thought, extraction.prompt_key))
+    if tasks is not None:
+        return tasks
 
     try:
-        response = run_llm_structured(
-            system_prompt=formatted_prompt,
-            user_input=thought,
-        )
-        data = json.loads(response)
-        return data.get("tasks", [])
-    except json.JSONDecodeError as e:
-        logger.warning(f"Failed to parse task response: {e}")
-        return []
+        tasks = extraction.finish(run_llm_structured(**extraction.llm_kwargs()))
     except Exception as e:
-        logger.error(f"Task extraction failed: {e}")
-        return []
+        return _extraction_failed(e)
+    if extraction.embedding is not None:
+        store_tasks(extraction.embedding, thought, tasks, extraction.prompt_key)
+    return tasks
 
 
 def extract_tasks_with_context(
     thought: str,
     context: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Extract tasks with optional context from related ideas (alias of `extract_tasks`)."""
+    return extract_tasks(thought, context)
+
+
+async def extract_tasks_async(
+    thought: str,
+    context: list[str] | None = None,
+    strict: bool = False,
 ) -> list[dict[str, Any]]:
     """
-    Extract tasks with optional context from related ideas.
+    Async variant of `extract_tasks` for use from async API routes.
+
+    Every step awaits (the LLM call on the shared AsyncOpenAI client), so
+    concurrent requests overlap their I/O instead of queueing on threads.
 
     Args:
         thought: Raw user thought/input text
         context: Optional list of related context strings
+        strict: Raise on a failed extraction instead of returning no tasks,
+            so callers can tell "no tasks" from "couldn't tell"
 
     Returns:
-        List of task dicts
+        List of task dicts with 'task' and 'priority' keys
+
+    Raises:
+        LLMSaturatedError: If every LLM concurrency slot stays busy
+        LLMError: If `strict` is set and the LLM call or its output failed
     """
-    try:
-        system_prompt = PROMPT_PATH.read_text()
-    except FileNotFoundError:
+    extraction = _Extraction.start(thought, context)
+    if extraction is None:
         return []
+    tasks = extraction.local_hit()
+    if tasks is None and extraction.wants_semantic:
+        tasks = extraction.semantic_hit(
+            *await _semantic_lookup_async(thought, extraction.prompt_key)
+        )
+    if tasks is not None:
+        return tasks
+
+    try:
+        tasks = extraction.finish(await run_llm_structured_async(**extraction.llm_kwargs()))
+    except Exception as e:
+        return _extraction_failed(e, strict)
+    if extraction.embedding is not None:
+        await store_tasks_async(extraction.embedding, thought, tasks, extraction.prompt_key)
+    return tasks
+
+
+class _TaskStreamParser:
+    """
+    Pull complete task objects out of a streamed {"tasks": [...]} response.
+
+    Fed text deltas as they arrive; each task is returned as soon as its
+    closing brace has been seen, without waiting for the rest of the list.
+    """
+
+    _ARRAY_START = re.compile(r'"tasks"\s*:\s*\[')
+
+    def __init__(self):
+        self.text = ""
+        self._pos = -1  # scan position inside the tasks array; -1 until found
+        self._depth = 0
+        self._start = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
 
-    formatted_prompt = system_prompt.replace("{thought}", thought)
+    def feed(self, delta: str) -> list[dict[str, Any]]:
+        """Add a delta and return the tasks it completed."""
+        self.text += delta
+        if self._pos < 0:
+            match = self._ARRAY_START.search(self.text)
+            if match is None:
+                return []
+            self._pos = match.end()
 
-    if context:
-        context_block = "\n\nContext from related notes:\n" + "\n".join(f"- {c}" for c in context)
-        formatted_prompt += context_block
+        tasks = []
+        text = self.text
+        while self._pos < len(text) and not self._done:
+            c = text[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                if self._depth == 0:
+                    self._start = self._pos
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 0:
+                    # End of the tasks array
+                    self._done = True
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        try:
+                            item = orjson.loads(text[self._start:self._pos + 1])
+                        except ValueError:
+                            item = None
+                        if isinstance(item, dict):
+                            tasks.append(item)
+            self._pos += 1
+        return tasks
 
+
+async def extract_tasks_stream(
+    thought: str,
+    context: list[str] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Streaming variant of `extract_tasks_async`: yields each task as soon as
+    the model has emitted it, so a UI can show the first task early.
+
+    Exact-cache hits are replayed at once; the template and semantic tiers
+    are not consulted. A completed stream is cached like a normal extraction.
+
+    Args:
+        thought: Raw user thought/input text
+        context: Optional list of related context strings
+
+    Yields:
+        Task dicts with 'task' and 'priority' keys
+
+    Raises:
+        LLMSaturatedError: If every LLM concurrency slot stays busy
+        LLMError: If the stream breaks off or its output isn't valid task
+            JSON; tasks already yielded are not cached
+    """
+    extraction = _Extraction.start(thought, context)
+    if extraction is None:
+        return
+    cached = _cached_tasks(extraction.key)
+    if cached is not None:
+        for task in cached:
+            yield task
+        return
+
+    parser = _TaskStreamParser()
     try:
-        response = run_llm_structured(
-            system_prompt=formatted_prompt,
-            user_input=thought,
-        )
-        data = json.loads(response)
-        return data.get("tasks", [])
+        async for delta in stream_llm_structured_async(**extraction.llm_kwargs()):
+            for task in parser.feed(delta):
+                yield task
+    except LLMSaturatedError:
+        raise
     except Exception as e:
-        logger.error(f"Task extraction with context failed: {e}")
-        return []
+        _extraction_failed(e, strict=True)
+
+    try:
+        extraction.finish(parser.text)
+    except ValueError as e:
+        _extraction_failed(e, strict=True)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Bulk extraction: several thoughts per chat completion
+# ─────────────────────────────────────────────────────────────────
+
+BULK_CHUNK_SIZE = 10
+
+_BULK_INSTRUCTIONS = (
+    "Extract tasks from each numbered thought below independently. Return ONLY "
+    'valid JSON of the form {"results": [{"index": <number>, "tasks": [...]}]} '
+    "with one entry per thought, each tasks list following the output format above.\n\n"
+)
+
+
+def _build_bulk_input(thoughts: list[str]) -> str:
+    """Pack thoughts into one indexed user message."""
+    return _BULK_INSTRUCTIONS + "\n".join(f"[{i}] {t}" for i, t in enumerate(thoughts))
+
+
+def _parse_bulk_output(response: str, count: int) -> list[list[dict[str, Any]] | None]:
+    """
+    Map a bulk response back to its thoughts.
+
+    Returns:
+        One task list per thought, or None where the response had no valid entry
+    """
+    results: list[list[dict[str, Any]] | None] = [None] * count
+    try:
+        entries = orjson.loads(response).get("results", [])
+    except (ValueError, AttributeError) as e:
+        logger.warning("Failed to parse bulk task response: %s", e)
+        return results
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index, tasks = entry.get("index"), entry.get("tasks")
+        if isinstance(index, int) and 0 <= index < count and isinstance(tasks, list):
+            results[index] = tasks
+    return results
+
+
+def _bulk_pending(
+    system_prompt: str,
+    thoughts: list[str],
+    results: list[list[dict[str, Any]] | None],
+) -> list[int]:
+    """Fill trivial and cached results in place and return the indices still to extract."""
+    pending = []
+    for i, thought in enumerate(thoughts):
+        if is_trivial_thought(thought):
+            results[i] = []
+            continue
+        results[i] = _cached_tasks(_task_cache_key(system_prompt, thought))
+        if results[i] is None:
+            pending.append(i)
+    return pending
+
+
+def _bulk_chunks(pending: list[int], chunk_size: int) -> list[list[int]]:
+    return [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+
+def _bulk_merge(
+    system_prompt: str,
+    thoughts: list[str],
+    chunk: list[int],
+    response: str,
+    results: list[list[dict[str, Any]] | None],
+) -> None:
+    """Record a chunk's parsed tasks in `results` and the exact-match cache."""
+    for i, tasks in zip(chunk, _parse_bulk_output(response, len(chunk))):
+        if tasks is None:
+            logger.warning("Bulk task response had no entry for thought %s", i)
+            continue
+        thought = thoughts[i]
+        _cache_tasks(_task_cache_key(system_prompt, thought), tasks)
+        results[i] = tasks
+
+
+def extract_tasks_bulk(
+    thoughts: list[str],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[list[dict[str, Any]]]:
+    """
+    Extract tasks from many thoughts, several per chat completion.
+
+    Thoughts are packed `chunk_size` at a time into one indexed user message,
+    so the system prompt is sent once per chunk and N thoughts cost about
+    N / chunk_size requests. Thoughts already in the exact-match cache are
+    not sent. Keep `chunk_size` small enough that a chunk's combined answer
+    fits in `llm_max_tokens`.
+
+    Args:
+        thoughts: Raw user thoughts
+        chunk_size: Thoughts per completion
+
+    Returns:
+        One task list per thought, in order (empty where extraction failed)
+    """
+    try:
+        system_prompt = load_prompt(PROMPT_FILE)
+    except FileNotFoundError:
+        logger.error("Prompt file not found: %s", PROMPT_FILE)
+        return [[] for _ in thoughts]
+
+    results: list[list[dict[str, Any]] | None] = [None] * len(thoughts)
+    for chunk in _bulk_chunks(_bulk_pending(system_prompt, thoughts, results), chunk_size):
+        try:
+            response = run_llm_structured(
+                system_prompt=system_prompt,
+                user_input=_build_bulk_input([thoughts[i] for i in chunk]),
+                response_format=JSON_MODE,
+                model=get_settings().task_extract_model,
+            )
+        except Exception as e:
+            logger.error("Bulk task extraction failed: %s", e)
+            continue
+        _bulk_merge(system_prompt, thoughts, chunk, response, results)
+    return [tasks if tasks is not None else [] for tasks in results]
+
+
+async def extract_tasks_bulk_async(
+    thoughts: list[str],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[list[dict[str, Any]]]:
+    """
+    Async variant of `extract_tasks_bulk`; chunks are sent concurrently.
+
+    Args:
+        thoughts: Raw user thoughts
+        chunk_size: Thoughts per completion
+
+    Returns:
+        One task list per thought, in order (empty where extraction failed)
+    """
+    try:
+        system_prompt = load_prompt(PROMPT_FILE)
+    except FileNotFoundError:
+        logger.error("Prompt file not found: %s", PROMPT_FILE)
+        return [[] for _ in thoughts]
+
+    results: list[list[dict[str, Any]] | None] = [None] * len(thoughts)
+    chunks = _bulk_chunks(_bulk_pending(system_prompt, thoughts, results), chunk_size)
+    responses = await asyncio.gather(
+        *(
+            run_llm_structured_async(
+                system_prompt=system_prompt,
+                user_input=_build_bulk_input([thoughts[i] for i in chunk]),
+                response_format=JSON_MODE,
+                model=get_settings().task_extract_model,
+            )
+            for chunk in chunks
+        ),
+        return_exceptions=True,
+    )
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, LLMSaturatedError):
+            raise response
+        if isinstance(response, BaseException):
+            logger.error("Bulk task extraction failed: %s", response)
+            continue
+        _bulk_merge(system_prompt, thoughts, chunk, response, results)
+    return [tasks if tasks is not None else [] for tasks in results]
@@ -1,9 +1,12 @@
 """
 Tests for the idea processing service.
 """
+import asyncio
 import json
+import time
+import numpy as np
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 
 class TestIdeaService:
@@ -30,9 +33,9 @@ class TestIdeaService:
 
         result = process_idea("need to finish thesis and also call mom")
 
-        assert "clean_note" in result
-        assert result["context_used"] is True
-        assert result["related_ideas_count"] == 1
+        assert result.clean_note == "Finish thesis and call mom"
+        assert result.context_used is True
+        assert result.related_ideas_count == 1
         mock_store.assert_called_once()
 
     @patch("app.services.idea_service.run_llm_with_context")
@@ -52,24 +55,151 @@ class TestIdeaService:
 
         result = process_idea("brand new idea")
 
-        assert result["context_used"] is False
-        assert result["related_ideas_count"] == 0
+        assert result.context_used is False
+        assert result.related_ideas_count == 0
 
     @patch("app.services.idea_service.run_llm_with_context")
     @patch("app.services.idea_service.retrieve_similar_ideas")
     @patch("app.services.idea_service.store_idea")
     def test_process_idea_invalid_json(self, mock_store, mock_retrieve, mock_llm):
-        """Test handling of invalid JSON from LLM."""
+        """Test invalid JSON from the LLM raises LLMError with the raw output."""
+        from app.core.exceptions import LLMError
         from app.services.idea_service import process_idea
 
         mock_retrieve.return_value = []
         mock_llm.return_value = "This is not valid JSON"
         mock_store.return_value = "doc-789"
 
-        result = process_idea("some idea")
+        with pytest.raises(LLMError) as exc_info:
+            process_idea("some idea")
 
-        assert "error" in result
-        assert "raw_output" in result
+        assert exc_info.value.details["raw_output"] == "This is not valid JSON"
+
+    @patch("app.services.idea_service.run_llm_with_context_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.search_similar_ideas_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.store_idea_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.embed_batcher")
+    def test_process_idea_async_success(self, mock_batcher, mock_store, mock_search, mock_llm):
+        """Test async idea processing awaits retrieval, LLM and storage."""
+        from app.services import idea_service
+        from app.services.semantic_cache import SemanticCache
+
+        mock_batcher.submit = AsyncMock(return_value=[1.0, 0.0, 0.0])
+        mock_search.return_value = ["related idea 1"]
+        mock_llm.return_value = json.dumps({
+            "clean_note": "Finish thesis",
+            "themes": ["academic"],
+            "suggested_tasks": [],
+        })
+        mock_store.side_effect = ["doc-123", "doc-456"]
+
+        with patch.object(idea_service, "semantic_cache", SemanticCache(dim=3)):
+            result = asyncio.run(idea_service.process_idea_async("need to finish thesis"))
+            # A paraphrase with a near-identical embedding is served from cache
+            mock_batcher.submit.return_value = [0.999, 0.01, 0.0]
+            cached = asyncio.run(idea_service.process_idea_async("gotta finish my thesis"))
+
+        assert result.clean_note == "Finish thesis"
+        assert result.context_used is True
+        assert result.memory_id == "doc-123"
+        # The paraphrase is stored too, under its own ID
+        assert cached == result.model_copy(update={"memory_id": "doc-456"})
+        mock_llm.assert_awaited_once()
+        assert mock_store.await_count == 2
+        assert mock_store.await_args.args[0] == "gotta finish my thesis"
+        # The document embedding for storage is computed alongside the LLM call
+        input_types = [c.kwargs["input_type"] for c in mock_batcher.submit.await_args_list]
+        assert input_types.count("document") == 1
+        assert mock_store.await_args_list[0].kwargs["embedding"] == [1.0, 0.0, 0.0]
+
+    @patch("app.services.idea_service.store_idea_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.embed_batcher")
+    def test_cache_hit_on_stored_idea_still_stores_paraphrase(self, mock_batcher, mock_store):
+        """Test a hit whose cached entry already has a memory_id still stores the new text."""
+        from app.api.schemas import IdeaResponse
+        from app.services import idea_service
+        from app.services.semantic_cache import SemanticCache
+
+        mock_batcher.submit = AsyncMock(return_value=[1.0, 0.0])
+        mock_store.return_value = "doc-new"
+        earlier = IdeaResponse(
+            clean_note="Call mom", context_used=False, related_ideas_count=0, memory_id="doc-old"
+        )
+
+        cache = SemanticCache(dim=2)
+        cache.add([1.0, 0.0], earlier)
+        with patch.object(idea_service, "semantic_cache", cache):
+            result = asyncio.run(idea_service.process_idea_async("ring my mother"))
+
+        assert result.memory_id == "doc-new"
+        assert mock_store.await_args.args[0] == "ring my mother"
+        assert cache.lookup([1.0, 0.0]).memory_id == "doc-old"
+
+    @patch("app.services.idea_service.delete_idea")
+    @patch("app.services.idea_service.run_llm_with_context_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.search_similar_ideas_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.store_idea_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.embed_batcher")
+    def test_process_idea_async_stores_during_llm_and_rolls_back(
+        self, mock_batcher, mock_store, mock_search, mock_llm, mock_delete
+    ):
+        """Test the idea is stored while the LLM runs and deleted if the LLM fails."""
+        from app.core.exceptions import LLMError
+        from app.services import idea_service
+        from app.services.semantic_cache import SemanticCache
+
+        async def failing_llm(**kwargs):
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert mock_store.await_count == 1  # upsert overlapped the LLM call
+            raise LLMError("LLM unavailable")
+
+        mock_batcher.submit = AsyncMock(return_value=[1.0, 0.0])
+        mock_search.return_value = []
+        mock_store.return_value = "doc-9"
+        mock_llm.side_effect = failing_llm
+
+        with patch.object(idea_service, "semantic_cache", SemanticCache(dim=2)):
+            with pytest.raises(LLMError):
+                asyncio.run(idea_service.process_idea_async("call mom"))
+
+        mock_delete.assert_called_once_with("doc-9")
+
+    @patch("app.services.idea_service.stream_llm_with_context_async")
+    @patch("app.services.idea_service.search_similar_ideas_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.store_idea_async", new_callable=AsyncMock)
+    @patch("app.services.idea_service.embed_batcher")
+    def test_stream_idea_async(self, mock_batcher, mock_store, mock_search, mock_stream):
+        """Test streaming yields deltas followed by the structured result."""
+        from app.api.schemas import IdeaResponse
+        from app.services import idea_service
+        from app.services.semantic_cache import SemanticCache
+
+        output = json.dumps({"clean_note": "Call mom", "themes": [], "suggested_tasks": []})
+
+        async def fake_stream(**kwargs):
+            for i in range(0, len(output), 10):
+                yield output[i:i + 10]
+
+        mock_batcher.submit = AsyncMock(return_value=[1.0, 0.0])
+        mock_search.return_value = []
+        mock_store.return_value = "doc-1"
+        mock_stream.side_effect = fake_stream
+
+        async def collect():
+            return [e async for e in idea_service.stream_idea_async("call mom")]
+
+        with patch.object(idea_service, "semantic_cache", SemanticCache(dim=2)):
+            events = asyncio.run(collect())
+
+        deltas = [data["delta"] for event, data in events if event == "delta"]
+        assert "".join(deltas) == output
+        assert events[-1] == ("result", IdeaResponse(
+            clean_note="Call mom",
+            context_used=False,
+            related_ideas_count=0,
+            memory_id="doc-1",
+        ))
 
 
 class TestTaskService:
@@ -104,6 +234,446 @@ class TestTaskService:
 
         assert tasks == []
 
+    @patch("app.services.task_service.run_llm_structured")
+    def test_trivial_thoughts_skip_llm(self, mock_llm):
+        """Blank thoughts, and with the pre-filter on cue-less ones, never reach the LLM."""
+        from app.services import task_service
+
+        mock_llm.return_value = json.dumps({"tasks": [{"task": "Buy milk", "priority": "low"}]})
+        with patch.dict(task_service._task_cache, clear=True):
+            assert task_service.extract_tasks("   ") == []
+            assert task_service.extract_tasks("?!") == []
+            with patch.object(task_service.get_settings(), "task_prefilter", True):
+                assert task_service.extract_tasks("I wonder what the weather is like") == []
+                mock_llm.assert_not_called()
+                assert task_service.extract_tasks("need to buy milk") != []
+        mock_llm.assert_called_once()
+
+    @patch("app.services.task_service.run_llm_structured")
+    def test_extract_tasks_rejects_malformed_task_list(self, mock_llm):
+        """A response without a list of tasks yields no tasks and isn't cached."""
+        from app.services import task_service
+
+        mock_llm.side_effect = ['["not an object"]', '{"tasks": "call mom"}']
+        with patch.dict(task_service._task_cache, clear=True):
+            assert task_service.extract_tasks("call mom") == []
+            assert task_service.extract_tasks("call mom") == []
+        assert mock_llm.call_count == 2
+
+    def test_extract_tasks_requests_structured_output(self):
+        """Extraction uses the task model, JSON mode by default and the task schema when enabled."""
+        from app.services import llm_service, task_service
+
+        with patch.object(llm_service, "get_client") as mock_client, \
+                patch.dict(task_service._task_cache, clear=True):
+            create = mock_client.return_value.chat.completions.create
+            create.return_value.choices[0].message.content = '{"tasks": []}'
+            task_service.extract_tasks("water the plants")
+            assert create.call_args.kwargs["response_format"] == {"type": "json_object"}
+            assert create.call_args.kwargs["model"] == task_service.get_settings().task_extract_model
+
+            with patch.object(task_service.get_settings(), "task_json_schema", True):
+                task_service.extract_tasks("feed the cat")
+            response_format = create.call_args.kwargs["response_format"]
+            assert response_format["type"] == "json_schema"
+            assert response_format["json_schema"]["schema"]["required"] == ["tasks"]
+
+    @patch("app.services.task_service.run_llm_structured_async", new_callable=AsyncMock)
+    def test_extract_tasks_async_success(self, mock_llm):
+        """Test async task extraction."""
+        from app.services.task_service import extract_tasks_async
+
+        mock_llm.return_value = json.dumps({
+            "tasks": [{"task": "Call dentist", "priority": "high"}]
+        })
+
+        tasks = asyncio.run(extract_tasks_async("call the dentist"))
+
+        assert tasks == [{"task": "Call dentist", "priority": "high"}]
+
+    @patch("app.services.task_service.run_llm_structured_async", new_callable=AsyncMock)
+    def test_extract_tasks_async_with_context(self, mock_llm):
+        """Test async extraction sends related notes as context."""
+        from app.services import task_service
+
+        mock_llm.return_value = json.dumps({"tasks": []})
+        with patch.dict(task_service._task_cache, clear=True):
+            asyncio.run(task_service.extract_tasks_async("plan the trip", context=["book flights"]))
+
+        assert mock_llm.await_args.kwargs["user_input"] == "plan the trip"
+        assert "- book flights" in mock_llm.await_args.kwargs["context"]
+
+    @patch("app.services.task_service.run_llm_structured_async", new_callable=AsyncMock)
+    def test_extract_route_does_not_cache_failures(self, mock_llm):
+        """Test a failed extraction answers 503 and the next request retries the LLM."""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services import task_service
+
+        mock_llm.return_value = "not json"
+        client = TestClient(app, raise_server_exceptions=False)
+        with patch.dict(task_service._task_cache, clear=True):
+            response = client.post("/tasks/extract", json={"content": "renew the car insurance"})
+            assert response.status_code == 503
+            assert response.json()["error"] == "llm_error"
+
+            mock_llm.return_value = json.dumps({"tasks": [{"task": "Renew insurance", "priority": "high"}]})
+            response = client.post("/tasks/extract", json={"content": "renew the car insurance"})
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 1
+        assert mock_llm.await_count == 2
+
+    @patch("app.services.task_service.stream_llm_structured_async")
+    def test_extract_tasks_stream_yields_tasks_early(self, mock_stream):
+        """Test each task is yielded once its object is complete, then the list is cached."""
+        from app.services import task_service
+
+        output = json.dumps({"tasks": [
+            {"task": "Email \"Q3 {draft}\"", "priority": "high"},
+            {"task": "Book flights", "priority": "low"},
+        ]})
+        first_task_end = output.index("}") + 1
+        seen_at = []
+
+        async def fake_stream(**kwargs):
+            for i in range(0, len(output), 7):
+                seen_at.append(i + 7)
+                yield output[i:i + 7]
+
+        mock_stream.side_effect = fake_stream
+
+        async def collect():
+            tasks = []
+            async for task in task_service.extract_tasks_stream("email the q3 draft, book flights"):
+                tasks.append((task, seen_at[-1]))
+            return tasks
+
+        with patch.dict(task_service._task_cache, clear=True):
+            streamed = asyncio.run(collect())
+            cached = asyncio.run(collect())
+
+        assert [t for t, _ in streamed] == json.loads(output)["tasks"]
+        # The first task arrives before the stream has finished
+        assert streamed[0][1] < len(output) and streamed[0][1] >= first_task_end
+        assert [t for t, _ in cached] == json.loads(output)["tasks"]
+        mock_stream.assert_called_once()
+
+    @patch("app.services.task_service.stream_llm_structured_async")
+    def test_stream_route_reports_broken_stream(self, mock_stream):
+        """Test a stream that breaks off ends in an error event and is not cached."""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services import task_service
+
+        async def broken_stream(**kwargs):
+            yield '{"tasks": [{"task": "Book flights", "priority": "low"}, '
+            raise ConnectionError("connection reset")
+
+        async def truncated_stream(**kwargs):
+            yield '{"tasks": [{"task": "Book flights", "priority": "low"}, {"ta'
+
+        client = TestClient(app)
+        with patch.dict(task_service._task_cache, clear=True):
+            for fake_stream in (broken_stream, truncated_stream):
+                mock_stream.side_effect = fake_stream
+                response = client.post("/tasks/extract/stream", json={"content": "book the flights to lisbon"})
+                assert "event: error" in response.text
+                assert "event: result" not in response.text
+            assert mock_stream.call_count == 2
+
+    @patch("app.services.task_service.run_llm_structured")
+    def test_context_sent_after_thought(self, mock_llm):
+        """Test context goes in its own message and the system prompt stays static."""
+        from app.services.task_service import extract_tasks_with_context
+
+        mock_llm.return_value = json.dumps({"tasks": []})
+
+        extract_tasks_with_context("plan the trip", context=["book flights"])
+        extract_tasks_with_context("plan the trip", context=["pack bags"])
+
+        first, second = mock_llm.call_args_list
+        assert first.kwargs["system_prompt"] == second.kwargs["system_prompt"]
+        assert "plan the trip" not in first.kwargs["system_prompt"]
+        assert first.kwargs["context"] == "Context from related notes:\n- book flights"
+        assert second.kwargs["context"].endswith("- pack bags")
+
+    @patch("app.services.task_service.run_llm_structured")
+    def test_repeat_extraction_cached(self, mock_llm):
+        """Test an identical thought is served from the exact-match cache."""
+        from cachetools import TTLCache
+        from app.services import task_service
+
+        mock_llm.return_value = json.dumps({"tasks": [{"task": "Pay rent", "priority": "high"}]})
+
+        with patch.object(task_service, "_task_cache", TTLCache(maxsize=8, ttl=60)):
+            first = task_service.extract_tasks("pay rent")
+            first[0]["task"] = "mutated by caller"
+            second = task_service.extract_tasks("pay rent")
+            task_service.extract_tasks("pay the rent")
+
+        assert second == [{"task": "Pay rent", "priority": "high"}]
+        assert mock_llm.call_count == 2
+
+    @patch("app.services.task_service.store_tasks_async", new_callable=AsyncMock)
+    @patch("app.services.task_service.lookup_tasks_async", new_callable=AsyncMock)
+    @patch("app.services.task_service.embed_batcher")
+    @patch("app.services.task_service.run_llm_structured_async", new_callable=AsyncMock)
+    def test_semantic_task_cache(self, mock_llm, mock_batcher, mock_lookup, mock_store):
+        """Test a paraphrase is served from the semantic tier and a miss is stored."""
+        from cachetools import TTLCache
+        from app.services import task_service
+
+        tasks = [{"task": "Call mom", "priority": "high"}]
+        mock_batcher.submit = AsyncMock(return_value=[1.0, 0.0])
+        mock_lookup.side_effect = [None, tasks]
+        mock_llm.return_value = json.dumps({"tasks": tasks})
+
+        with patch.object(task_service, "_task_cache", TTLCache(maxsize=8, ttl=60)), \
+                patch.object(task_service.get_settings(), "task_semantic_cache", True):
+            first = asyncio.run(task_service.extract_tasks_async("need to call mom"))
+            second = asyncio.run(task_service.extract_tasks_async("gotta phone mom"))
+
+        assert first == second == tasks
+        mock_llm.assert_awaited_once()
+        prompt_key = mock_store.await_args.args[3]
+        mock_store.assert_awaited_once_with([1.0, 0.0], "need to call mom", tasks, prompt_key)
+        assert prompt_key == task_service.template_key(
+            task_service.get_settings().task_extract_model,
+            task_service.load_prompt(task_service.PROMPT_FILE),
+        )
+        assert [c.args[1] for c in mock_lookup.await_args_list] == [prompt_key] * 2
+
+    @patch("app.rag.task_cache.get_task_store")
+    def test_semantic_task_entries_keyed_and_purged(self, mock_get_store):
+        """Test entries carry their prompt key, lookups filter on it and expired entries are deleted."""
+        from app.rag import task_cache
+
+        store = mock_get_store.return_value
+        store.search.return_value = []
+        with patch.object(task_cache, "_next_purge", 0.0):
+            task_cache.store_tasks([1.0, 0.0], "call mom", [], "key-a")
+            task_cache.store_tasks([1.0, 0.0], "call dad", [], "key-a")
+            task_cache.lookup_tasks([1.0, 0.0], "key-b")
+
+        assert store.add.call_args.args[2] == {"tasks": [], "prompt_key": "key-a"}
+        conditions = store.search.call_args.kwargs["filter_conditions"]["must"]
+        assert {"key": "prompt_key", "match": {"value": "key-b"}} in conditions
+        # Expired entries are deleted once per interval, not on every store
+        store.delete_where.assert_called_once()
+        expired = store.delete_where.call_args.args[0]["must"][0]
+        assert expired["key"] == "created_at" and "lt" in expired["range"]
+
+    @patch("app.services.task_service.run_llm_structured")
+    def test_extract_tasks_bulk_packs_thoughts(self, mock_llm):
+        """Test bulk extraction sends several thoughts per call and maps results by index."""
+        from cachetools import TTLCache
+        from app.services import task_service
+
+        def respond(system_prompt, user_input, response_format, model):
+            lines = [l for l in user_input.splitlines() if l.startswith("[")]
+            return json.dumps({"results": [
+                {"index": i, "tasks": [{"task": line.split("] ", 1)[1], "priority": "low"}]}
+                for i, line in enumerate(lines)
+                if "skip" not in line
+            ]})
+
+        mock_llm.side_effect = respond
+        thoughts = ["water plants", "skip me", "book flights"]
+
+        with patch.object(task_service, "_task_cache", TTLCache(maxsize=8, ttl=60)):
+            results = task_service.extract_tasks_bulk(thoughts, chunk_size=2)
+            again = task_service.extract_tasks_bulk(thoughts, chunk_size=2)
+
+        assert [r[0]["task"] if r else None for r in results] == ["water plants", None, "book flights"]
+        assert again == results
+        # Two chunks, then only the thought without a result is retried
+        assert mock_llm.call_count == 3
+
+    @patch("app.services.batch_task_service.time.sleep")
+    @patch("app.services.batch_task_service.get_client")
+    def test_extract_tasks_via_batch(self, mock_client, mock_sleep):
+        """Test the Batch API path uploads one request per non-trivial thought and maps results back."""
+        from app.services.batch_task_service import extract_tasks_via_batch
+
+        client = mock_client.return_value
+        client.files.create.return_value = MagicMock(id="file-in")
+        client.batches.create.return_value = MagicMock(id="batch-1")
+        client.batches.retrieve.side_effect = [
+            MagicMock(status="in_progress"),
+            MagicMock(status="completed", output_file_id="file-out"),
+        ]
+        output = {"tasks": [{"task": "Book flights", "priority": "medium"}]}
+        client.files.content.return_value.content = json.dumps({
+            "custom_id": "1",
+            "response": {"body": {"choices": [{"message": {"content": json.dumps(output)}}]}},
+        }).encode()
+
+        results = extract_tasks_via_batch(["water plants", "  ", "book flights"])
+
+        # The blank thought isn't uploaded, and results keep the input order
+        assert results == [[], [], output["tasks"]]
+        _, payload = client.files.create.call_args.kwargs["file"]
+        lines = [json.loads(line) for line in payload.splitlines()]
+        assert [l["custom_id"] for l in lines] == ["0", "1"]
+        assert lines[1]["body"]["messages"][1]["content"] == "book flights"
+        mock_sleep.assert_called_once()
+
+    @patch("app.services.task_service.run_llm_structured")
+    def test_template_cache_swaps_literal_values(self, mock_llm):
+        """Test a thought differing only in numbers reuses tasks, and misses when unsure."""
+        from cachetools import TTLCache
+        from app.services import task_service
+        from app.services.prompt_cache import PromptCache
+
+        mock_llm.return_value = json.dumps({
+            "tasks": [{"task": "Pay 1200 rent by the 5th", "priority": "high"}]
+        })
+
+        with patch.object(task_service, "_task_cache", TTLCache(maxsize=8, ttl=60)), \
+                patch.object(task_service, "prompt_cache", PromptCache()), \
+                patch.object(task_service.get_settings(), "task_template_cache", True):
+            task_service.extract_tasks("pay 1200 rent by the 5th")
+            adapted = task_service.extract_tasks("Pay 950 rent by the 12th")
+            # "3" never appears in the cached tasks, so it can't be adapted
+            mock_llm.return_value = json.dumps({"tasks": [{"task": "Call plumber", "priority": "low"}]})
+            task_service.extract_tasks("call plumber in 3 days")
+            task_service.extract_tasks("call plumber in 4 days")
+
+        assert adapted == [{"task": "Pay 950 rent by the 12th", "priority": "high"}]
+        assert mock_llm.call_count == 3
+
+
+class TestPrompts:
+    """Test cases for prompt.py"""
+
+    def test_load_prompt_caches_and_renders(self, tmp_path):
+        """Test prompts are read once and placeholders filled in one pass."""
+        from app.prompts.prompt import _read_prompt, load_prompt
+
+        prompt_file = tmp_path / "greet.txt"
+        prompt_file.write_text("Hello {{ name }}, keep {\"json\": true} and {{ other }}")
+
+        assert load_prompt(str(prompt_file), name="Ada") == "Hello Ada, keep {\"json\": true} and {{ other }}"
+        prompt_file.write_text("changed")
+        assert load_prompt(str(prompt_file)) == "Hello {{ name }}, keep {\"json\": true} and {{ other }}"
+        _read_prompt.cache_clear()
+
+    @patch("app.prompts.prompt.get_settings")
+    def test_hot_reload_rereads_edited_prompt(self, mock_settings, tmp_path):
+        """Test an edited prompt is picked up when hot reload is enabled."""
+        import os
+        from app.prompts.prompt import _read_prompt, load_prompt
+
+        mock_settings.return_value.prompt_hot_reload = True
+        prompt_file = tmp_path / "greet.txt"
+        prompt_file.write_text("first")
+        os.utime(prompt_file, ns=(1, 1))
+        assert load_prompt(str(prompt_file)) == "first"
+
+        prompt_file.write_text("second")
+        os.utime(prompt_file, ns=(2, 2))
+        assert load_prompt(str(prompt_file)) == "second"
+        _read_prompt.cache_clear()
+
+
+class TestRequestSchemas:
+    """Test cases for request validation in schemas.py"""
+
+    def test_content_is_trimmed_and_junk_rejected(self):
+        """Test blank and binary content fail validation before any RAG work."""
+        from pydantic import ValidationError
+        from app.api.schemas import IdeaRequest, TaskExtractRequest
+
+        assert IdeaRequest(content="  call mom \n").content == "call mom"
+
+        for schema in (IdeaRequest, TaskExtractRequest):
+            for content in (" \n\t ", "PK\x03\x04\x00binary"):
+                with pytest.raises(ValidationError):
+                    schema(content=content)
+
+
+class TestLLMConcurrency:
+    """Test cases for the Groq concurrency cap"""
+
+    def test_saturated_llm_sheds_load(self):
+        """Test a call fails fast once every slot is held."""
+        from app.core.exceptions import LLMSaturatedError
+        from app.services import llm_service
+
+        async def scenario():
+            async with llm_service._llm_slot():
+                await llm_service.run_llm_async("system", "input")
+
+        with patch.object(llm_service.get_settings(), "llm_max_concurrency", 1), \
+                patch.object(llm_service.get_settings(), "llm_acquire_timeout_s", 0.01), \
+                patch.object(llm_service, "get_async_client") as mock_client:
+            with pytest.raises(LLMSaturatedError):
+                asyncio.run(scenario())
+
+        mock_client.assert_not_called()
+
+    @patch("tenacity.nap.time.sleep")
+    def test_structured_call_retries_transient_errors_only(self, mock_sleep):
+        """Test rate limits are retried with backoff while client errors fail at once."""
+        import httpx
+        from openai import BadRequestError, RateLimitError
+        from app.core.exceptions import LLMError
+        from app.services import llm_service
+
+        def api_error(cls, status):
+            response = httpx.Response(status, request=httpx.Request("POST", "https://groq.test"))
+            return cls("error", response=response, body=None)
+
+        ok = MagicMock(choices=[MagicMock(message=MagicMock(content='{"tasks": []}'))])
+        with patch.object(llm_service, "get_client") as mock_client:
+            create = mock_client.return_value.chat.completions.create
+            create.side_effect = [api_error(RateLimitError, 429), ok]
+            assert llm_service.run_llm_structured("system", "input") == '{"tasks": []}'
+            assert create.call_count == 2
+            mock_sleep.assert_called_once()
+
+            create.reset_mock()
+            create.side_effect = api_error(BadRequestError, 400)
+            with pytest.raises(LLMError):
+                llm_service.run_llm_structured("system", "input")
+            assert create.call_count == 1
+
+    def test_batch_runs_concurrently_and_isolates_failures(self):
+        """Test run_llm_batch overlaps calls up to its limit and returns errors per item."""
+        from app.core.exceptions import LLMError
+        from app.services import llm_service
+
+        in_flight = 0
+        peak = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            user_input = kwargs["messages"][1]["content"]
+            if user_input == "bad":
+                raise RuntimeError("boom")
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=user_input.upper()))])
+
+        pairs = [("system", "a"), ("system", "bad"), ("system", "b"), ("system", "c")]
+        with patch.object(llm_service, "get_async_client") as mock_client:
+            mock_create = AsyncMock(side_effect=create)
+            mock_client.return_value.chat.completions.create = mock_create
+            results = asyncio.run(llm_service.run_llm_batch(
+                pairs, concurrency=2, temperature=0.0, model="small-model"
+            ))
+
+        assert results[0] == "A" and results[2:] == ["B", "C"]
+        assert isinstance(results[1], LLMError)
+        assert peak == 2
+        # Non-transient errors fail at once instead of being retried
+        assert mock_create.await_count == 4
+        assert mock_create.await_args.kwargs["model"] == "small-model"
+        assert mock_create.await_args.kwargs["temperature"] == 0.0
+
 
 class TestEmbeddingService:
     """Test cases for embedding_service.py"""
@@ -125,6 +695,469 @@ class TestEmbeddingService:
         assert provider.dimension == 1536
 
 
+class TestSemanticCache:
+    """Test cases for semantic_cache.py"""
+
+    def test_lookup_threshold(self):
+        """Test hits require cosine similarity above the threshold."""
+        from app.services.semantic_cache import SemanticCache
+
+        cache = SemanticCache(dim=2, threshold=0.97)
+        cache.add([3.0, 0.0], {"clean_note": "a"})
+
+        assert cache.lookup([1.0, 0.01]) == {"clean_note": "a"}
+        assert cache.lookup([0.0, 1.0]) is None
+
+    def test_lsh_lookup_and_eviction(self):
+        """Test LSH candidate search and oldest-entry eviction."""
+        from app.services.semantic_cache import SemanticCache
+
+        rng = np.random.default_rng(1)
+        vectors = rng.standard_normal((8, 16))
+        cache = SemanticCache(dim=16, max_entries=4, lsh_min_entries=2)
+        for i, vec in enumerate(vectors):
+            cache.add(vec, {"i": i})
+
+        assert len(cache) == 4
+        assert cache.lookup(vectors[7]) == {"i": 7}
+        assert cache.lookup(vectors[0]) is None
+
+    def test_tiled_float16_scan(self):
+        """Test the tiled float16 scan finds the same match as a float32 scan."""
+        from app.services.semantic_cache import SemanticCache
+
+        rng = np.random.default_rng(2)
+        vectors = rng.standard_normal((50, 64))
+        cache = SemanticCache(dim=64, max_entries=64, lsh_min_entries=1000, tile_rows=8)
+        for i, vec in enumerate(vectors):
+            cache.add(vec, {"i": i})
+
+        assert cache._matrix.dtype == np.float16
+        query = vectors[37] + 0.01 * rng.standard_normal(64)
+        assert cache.lookup(query) == {"i": 37}
+
+    def test_invalidate_doc(self):
+        """Test invalidated responses no longer match."""
+        from app.services.semantic_cache import SemanticCache
+
+        cache = SemanticCache(dim=2)
+        cache.add([1.0, 0.0], {"memory_id": "doc-1"})
+
+        assert cache.invalidate_doc("doc-1") == 1
+        assert cache.lookup([1.0, 0.0]) is None
+
+    def test_scoped_lookup(self):
+        """Test entries are only returned to lookups in the same scope."""
+        from app.services.semantic_cache import SemanticCache
+
+        cache = SemanticCache(dim=2)
+        cache.add([1.0, 0.0], {"note": "mine"}, scope="user-1")
+
+        assert cache.lookup([1.0, 0.0], scope="user-1") == {"note": "mine"}
+        assert cache.lookup([1.0, 0.0], scope="user-2") is None
+        assert cache.lookup([1.0, 0.0]) is None
+
+    @pytest.mark.parametrize("lsh_min_entries", [1000, 1])
+    def test_other_scope_does_not_shadow_match(self, lsh_min_entries):
+        """Test a closer entry from another scope doesn't hide one in the caller's scope."""
+        from app.services.semantic_cache import SemanticCache
+
+        cache = SemanticCache(dim=2, threshold=0.95, lsh_min_entries=lsh_min_entries, lsh_bits=1)
+        cache.add([1.0, 0.0], {"note": "theirs"}, scope="user-2")
+        cache.add([1.0, 0.1], {"note": "mine"}, scope="user-1")
+
+        assert cache.lookup([1.0, 0.0], scope="user-1") == {"note": "mine"}
+
+    def test_invalidate_near(self):
+        """Test only entries within the threshold of a new document are dropped."""
+        from app.services.semantic_cache import SemanticCache
+
+        cache = SemanticCache(dim=2)
+        cache.add([1.0, 0.0], ["near"])
+        cache.add([0.0, 1.0], ["far"])
+
+        assert cache.invalidate_near([0.9, 0.1], threshold=0.7) == 1
+        assert cache.lookup([1.0, 0.0]) is None
+        assert cache.lookup([0.0, 1.0]) == ["far"]
+
+
+class TestEmbedBatcher:
+    """Test cases for embed_batcher.py"""
+
+    @patch("app.rag.embed_batcher.get_embedding_service")
+    def test_concurrent_requests_are_batched(self, mock_service):
+        """Test concurrent submits share one API call per input type."""
+        from app.rag.embed_batcher import EmbedBatcher
+
+        async def fake_embed(texts, input_type):
+            return [[3.0 * len(t), 4.0 * len(t)] for t in texts]
+
+        mock_service.return_value.embed_batch_async = AsyncMock(side_effect=fake_embed)
+        batcher = EmbedBatcher(max_batch=8, max_wait_ms=5)
+
+        async def run():
+            results = await asyncio.gather(
+                batcher.submit("a", "query"),
+                batcher.submit("bb", "query"),
+                batcher.submit("ccc", "document"),
+            )
+            await batcher.stop()
+            return results
+
+        for vector in asyncio.run(run()):
+            assert np.allclose(vector, [0.6, 0.8])
+        calls = mock_service.return_value.embed_batch_async.await_args_list
+        assert sorted(c.args[0] for c in calls) == [["a", "bb"], ["ccc"]]
+
+    @patch("app.rag.embed_batcher.get_embedding_service")
+    def test_short_vector_list_fails_every_caller(self, mock_service):
+        """Test a response with fewer vectors than texts fails all callers instead of hanging."""
+        from app.core.exceptions import EmbeddingError
+        from app.rag.embed_batcher import EmbedBatcher
+
+        mock_service.return_value.embed_batch_async = AsyncMock(return_value=[[1.0, 0.0]])
+        batcher = EmbedBatcher(max_batch=8, max_wait_ms=5)
+
+        async def run():
+            results = await asyncio.wait_for(asyncio.gather(
+                batcher.submit("a", "query"),
+                batcher.submit("bb", "query"),
+                return_exceptions=True,
+            ), timeout=1)
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, EmbeddingError) for r in results)
+
+    @patch("app.rag.embed_batcher.get_embedding_service")
+    def test_repeated_texts_are_cached(self, mock_service):
+        """Test duplicate texts are embedded once and served from the LRU."""
+        from app.rag.embed_batcher import EmbedBatcher
+
+        mock_service.return_value.embed_batch_async = AsyncMock(return_value=[[3.0, 4.0]])
+        batcher = EmbedBatcher(max_batch=8, max_wait_ms=5)
+
+        async def run():
+            first = await asyncio.gather(batcher.submit("same"), batcher.submit("same"))
+            second = await batcher.submit("same")
+            await batcher.stop()
+            return first, second
+
+        (a, b), c = asyncio.run(run())
+
+        assert a is b is c
+        assert a.dtype == np.float32
+        assert np.allclose(a, [0.6, 0.8])
+        mock_service.return_value.embed_batch_async.assert_awaited_once_with(["same"], input_type="query")
+        assert batcher.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+class TestSearchBatcher:
+    """Test cases for qdrant_batcher.py"""
+
+    def test_concurrent_searches_are_batched(self):
+        """Test concurrent searches share one batch request."""
+        from app.rag.qdrant_batcher import SearchBatcher
+
+        store = MagicMock()
+        store.asearch_batch = AsyncMock(
+            side_effect=lambda queries: [[{"text": str(q[0][0])}] for q in queries]
+        )
+        batcher = SearchBatcher(lambda: store, max_batch=8, max_wait_ms=5)
+
+        async def run():
+            results = await asyncio.gather(
+                batcher.submit([1.0], top_k=3, score_threshold=0.5),
+                batcher.submit([2.0], top_k=3, score_threshold=0.5),
+            )
+            await batcher.stop()
+            return results
+
+        assert asyncio.run(run()) == [[{"text": "1.0"}], [{"text": "2.0"}]]
+        store.asearch_batch.assert_awaited_once()
+
+
+class TestSingletons:
+    """Test cases for lazily created service singletons"""
+
+    @patch("app.rag.retriever.QdrantVectorStore")
+    def test_vector_store_created_once_under_concurrency(self, mock_store_cls):
+        """Test concurrent first calls construct a single vector store."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.rag import retriever
+
+        def slow_store(**kwargs):
+            time.sleep(0.01)
+            return MagicMock()
+
+        mock_store_cls.side_effect = slow_store
+
+        with patch.object(retriever, "_vector_store", None):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                stores = list(pool.map(lambda _: retriever.get_vector_store(), range(8)))
+
+        assert mock_store_cls.call_count == 1
+        assert all(store is stores[0] for store in stores)
+
+    @patch("app.services.llm_service.OpenAI")
+    @patch("app.services.llm_service.get_sync_http_client")
+    def test_sync_llm_client_reuses_pooled_http_client(self, mock_http, mock_openai):
+        """Test the sync Groq client is built once on the shared HTTP client."""
+        from app.services import llm_service
+
+        with patch.object(llm_service, "_client", None):
+            first = llm_service.get_client()
+            second = llm_service.get_client()
+
+        assert first is second
+        mock_openai.assert_called_once()
+        assert mock_openai.call_args.kwargs["http_client"] is mock_http.return_value
+        # Only the call sites' own retry policies retry, not the SDK as well
+        assert mock_openai.call_args.kwargs["max_retries"] == 0
+
+    def test_http_clients_share_ssl_context(self):
+        """Test the sync and async HTTP clients reuse one SSL context across rebuilds."""
+        from app.core import http
+
+        with patch.object(http, "_CLIENT", None), patch.object(http, "_SYNC_CLIENT", None), \
+                patch.object(http.httpx, "AsyncClient") as mock_async, \
+                patch.object(http.httpx, "Client") as mock_sync:
+            mock_async.return_value.is_closed = True
+            http.get_http_client()
+            http.get_http_client()
+            http.get_sync_http_client()
+
+        contexts = [c.kwargs["verify"] for c in mock_async.call_args_list + mock_sync.call_args_list]
+        assert len(contexts) == 3
+        assert all(ctx is contexts[0] for ctx in contexts)
+
+
+class TestUpsertBatcher:
+    """Test cases for the upsert batcher in qdrant_batcher.py"""
+
+    def test_concurrent_inserts_share_one_upsert(self):
+        """Test concurrent stores are written in one upsert and get their own IDs."""
+        from app.rag.qdrant_batcher import UpsertBatcher
+
+        store = MagicMock()
+        store.aadd_batch = AsyncMock(side_effect=lambda e, texts, m: [f"id-{t}" for t in texts])
+        batcher = UpsertBatcher(lambda: store, max_batch=8, max_wait_ms=5)
+
+        async def run():
+            results = await asyncio.gather(
+                batcher.submit([1.0], "a", {"source": "x"}),
+                batcher.submit([2.0], "b"),
+            )
+            await batcher.stop()
+            return results
+
+        assert asyncio.run(run()) == ["id-a", "id-b"]
+        store.aadd_batch.assert_awaited_once_with([[1.0], [2.0]], ["a", "b"], [{"source": "x"}, {}])
+
+
+class TestSearchCache:
+    """Test cases for the retriever's search-result cache"""
+
+    @patch("app.rag.retriever.upsert_batcher")
+    @patch("app.rag.retriever.search_batcher")
+    def test_repeat_search_cached_until_nearby_store(self, mock_batcher, mock_upsert):
+        """Test repeated searches skip Qdrant until a relevant idea is stored."""
+        from app.rag import retriever
+        from app.services.semantic_cache import SemanticCache
+
+        mock_batcher.submit = AsyncMock(return_value=[{"text": "Old idea"}])
+        mock_upsert.submit = AsyncMock(return_value="doc-1")
+
+        async def run():
+            first = await retriever.search_similar_ideas_async([1.0, 0.0])
+            second = await retriever.search_similar_ideas_async([1.0, 0.01])
+            await retriever.store_idea_async("New idea", embedding=np.array([0.9, 0.1]))
+            third = await retriever.search_similar_ideas_async([1.0, 0.0])
+            return first, second, third
+
+        with patch.object(retriever, "search_cache", SemanticCache(dim=2)):
+            results = asyncio.run(run())
+
+        assert results == (["Old idea"],) * 3
+        assert mock_batcher.submit.await_count == 2
+
+    @patch("app.rag.retriever.search_batcher")
+    def test_search_in_flight_during_store_not_cached(self, mock_batcher):
+        """Test results fetched across an invalidation aren't cached, and entries expire."""
+        from app.rag import retriever
+        from app.services.semantic_cache import SemanticCache
+
+        async def search_racing_store(*args):
+            retriever._invalidate_search_cache([1.0, 0.0])
+            return [{"text": "Old idea"}]
+
+        mock_batcher.submit = AsyncMock(side_effect=search_racing_store)
+        cache = SemanticCache(dim=2, ttl=60)
+        with patch.object(retriever, "search_cache", cache):
+            asyncio.run(retriever.search_similar_ideas_async([1.0, 0.0]))
+            assert len(cache) == 0
+
+            mock_batcher.submit = AsyncMock(return_value=[{"text": "Old idea"}])
+            asyncio.run(retriever.search_similar_ideas_async([1.0, 0.0]))
+            assert cache.lookup([1.0, 0.0]) == ["Old idea"]
+            with patch("app.services.semantic_cache.time.monotonic", return_value=time.monotonic() + 61):
+                assert cache.lookup([1.0, 0.0]) is None
+
+    @patch("app.rag.retriever.search_batcher")
+    def test_user_searches_filtered_and_scoped(self, mock_batcher):
+        """Test a user's search filters by owner and isn't served another user's cache."""
+        from app.rag import retriever
+        from app.rag.qdrant_store import idea_filter
+        from app.services.semantic_cache import SemanticCache
+
+        mock_batcher.submit = AsyncMock(return_value=[{"text": "Idea"}])
+
+        async def run():
+            await retriever.search_similar_ideas_async([1.0, 0.0], user_id="user-1")
+            await retriever.search_similar_ideas_async([1.0, 0.0], user_id="user-2")
+
+        with patch.object(retriever, "search_cache", SemanticCache(dim=2)):
+            asyncio.run(run())
+
+        assert mock_batcher.submit.await_count == 2
+        conditions = mock_batcher.submit.await_args_list[0].args[3]
+        assert conditions == idea_filter("user-1")
+        assert {"key": "user_id", "match": {"value": "user-1"}} in conditions["must"]
+
+    @patch("app.services.embedding_service.get_sync_http_client")
+    @patch("app.services.embedding_service.get_settings")
+    def test_sync_embeddings_cached(self, mock_settings, mock_http):
+        """Test whitespace variants of a text share one sync API call."""
+        from app.services.embedding_service import EmbeddingService
+
+        mock_settings.return_value.voyage_api_key = "test-key"
+        mock_settings.return_value.embed_cache_max_entries = 16
+        mock_settings.return_value.embed_cache_ttl_s = 60
+        mock_http.return_value.post.return_value.content = b'{"data": [{"embedding": [0.6, 0.8]}]}'
+        service = EmbeddingService()
+
+        assert service.embed_query("same text") == [0.6, 0.8]
+        assert service.embed_query("  same   text\n") == [0.6, 0.8]
+        mock_http.return_value.post.assert_called_once()
+
+    @patch("app.services.embedding_service.get_sync_http_client")
+    @patch("app.services.embedding_service.get_settings")
+    def test_only_transient_errors_retried(self, mock_settings, mock_http):
+        """Test a 429 on a query is retried once and a 400 not at all."""
+        import httpx
+        from app.core.exceptions import EmbeddingError
+        from app.services.embedding_service import EmbeddingService
+
+        mock_settings.return_value.voyage_api_key = "test-key"
+        mock_settings.return_value.embed_cache_max_entries = 16
+        mock_settings.return_value.embed_cache_ttl_s = 60
+        request = httpx.Request("POST", "https://api.voyageai.com/v1/embeddings")
+        service = EmbeddingService()
+
+        mock_http.return_value.post.return_value = httpx.Response(429, request=request)
+        with pytest.raises(EmbeddingError):
+            service.embed_query("rate limited")
+        assert mock_http.return_value.post.call_count == 2
+
+        mock_http.return_value.post.reset_mock()
+        mock_http.return_value.post.return_value = httpx.Response(400, request=request)
+        with pytest.raises(EmbeddingError):
+            service.embed_document("bad request")
+        assert mock_http.return_value.post.call_count == 1
+
+
+class TestSimilarity:
+    """Test cases for similarity.py"""
+
+    def test_rank_matches_full_sort(self):
+        """Test partial-sort ranking agrees with a full argsort and applies the threshold."""
+        from app.rag.similarity import normalize, rank
+
+        rng = np.random.default_rng(3)
+        matrix = np.stack([normalize(v) for v in rng.standard_normal((100, 32))])
+        query = normalize(rng.standard_normal(32))
+
+        order, scores = rank(matrix, query, top_k=10)
+        expected = np.argsort(-(matrix @ query))[:10]
+
+        assert order.tolist() == expected.tolist()
+        assert np.all(np.diff(scores) <= 0)
+
+        order, scores = rank(matrix, query, top_k=10, score_threshold=float(scores[4]))
+        assert order.tolist() == expected[:5].tolist()
+
+
+class TestSessionPrefetcher:
+    """Test cases for prefetch.py"""
+
+    def test_follow_up_served_from_pool(self):
+        """Test nearby follow-ups are rescored locally and far queries fall back."""
+        from app.rag.prefetch import SessionPrefetcher
+
+        store = MagicMock()
+        store.asearch_with_vectors = AsyncMock(return_value=[
+            {"text": "thesis outline", "vector": [1.0, 0.0, 0.0]},
+            {"text": "thesis deadline", "vector": [0.8, 0.6, 0.0]},
+            {"text": "groceries", "vector": [0.0, 0.0, 1.0]},
+        ])
+        prefetcher = SessionPrefetcher(lambda: store, anchor_similarity=0.8)
+
+        async def run():
+            prefetcher.schedule("s1", [1.0, 0.1, 0.0])
+            await asyncio.gather(*prefetcher._tasks)
+
+        asyncio.run(run())
+
+        assert prefetcher.lookup("s1", [0.95, 0.2, 0.0], top_k=2, score_threshold=0.7) == [
+            "thesis outline",
+            "thesis deadline",
+        ]
+        assert prefetcher.lookup("s1", [0.0, 0.0, 1.0]) is None
+        assert prefetcher.lookup("s2", [1.0, 0.0, 0.0]) is None
+        assert prefetcher.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+class TestPointIds:
+    """Test cases for ids.py"""
+
+    def test_ids_are_unique_increasing_u64(self):
+        """Test IDs increase, fit in 63 bits and survive sequence overflow."""
+        from app.core.ids import SnowflakeGenerator
+
+        generator = SnowflakeGenerator(worker_id=7)
+        with patch("app.core.ids.time.time", return_value=1_800_000_000.0):
+            ids = [generator.next_id() for _ in range(5000)]
+
+        assert ids == sorted(set(ids))
+        assert all(0 < i < 2**63 for i in ids)
+        assert (ids[0] >> 12) & 0x3FF == 7
+
+    def test_unconfigured_worker_uses_random_ids(self):
+        """Test processes without a worker get random 63-bit IDs, not a shared snowflake worker."""
+        from app.core import ids
+
+        with patch.object(ids.get_settings(), "point_id_worker", None):
+            random_ids = {ids.new_point_id() for _ in range(1000)}
+        assert len(random_ids) == 1000
+        assert all(0 < i < 2**63 for i in random_ids)
+
+        with patch.object(ids, "_generator", None), \
+                patch.object(ids.get_settings(), "point_id_worker", 5):
+            assert (ids.new_point_id() >> 12) & 0x3FF == 5
+
+    def test_parse_point_id(self):
+        """Test integer IDs parse to int and legacy UUIDs pass through."""
+        from app.core.ids import parse_point_id
+
+        legacy = "6a7c1b9e-3c1a-4d6b-9b1a-0c1d2e3f4a5b"
+        assert parse_point_id("123456789") == 123456789
+        assert parse_point_id(legacy) == legacy
+        assert parse_point_id("\u00b2") == "\u00b2"
+        assert parse_point_id("\u0661") == "\u0661"
+
+
 class TestQdrantStore:
     """Test cases for qdrant_store.py"""
 
@@ -138,6 +1171,9 @@ class TestQdrantStore:
             qdrant_api_key="",
             qdrant_collection_name="test",
             active_embedding_dim=1536,
+            rag_inmemory_fallback=False,
+            qdrant_int8_quantization=True,
+            qdrant_vectors_on_disk=False,
         )
 
         mock_instance = MagicMock()
@@ -149,6 +1185,9 @@ class TestQdrantStore:
         store = QdrantVectorStore(collection_name="test", embedding_dim=1536)
 
         mock_instance.create_collection.assert_called_once()
+        quantization = mock_instance.create_collection.call_args.kwargs["quantization_config"]
+        assert quantization.scalar.type == "int8"
+        assert quantization.scalar.always_ram is True
 
     @patch("app.rag.qdrant_store.QdrantClient")
     @patch("app.rag.qdrant_store.get_settings")
@@ -160,6 +1199,7 @@ class TestQdrantStore:
             qdrant_api_key="",
             qdrant_collection_name="test",
             active_embedding_dim=1536,
+            rag_inmemory_fallback=False,
         )
 
         mock_instance = MagicMock()
@@ -173,3 +1213,333 @@ class TestQdrantStore:
         store = QdrantVectorStore(collection_name="test", embedding_dim=1536)
 
         mock_instance.create_collection.assert_not_called()
+        mock_instance.recreate_collection.assert_not_called()
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_get_all_paginates(self, mock_settings, mock_client):
+        """Test get_all skips `offset` records by cursor and never fetches their payloads."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=1536,
+            rag_inmemory_fallback=False,
+        )
+
+        records = [MagicMock(id=i, payload={"text": f"idea {i}", "type": "idea"}) for i in range(5)]
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.scroll.side_effect = [(records[:3], 3), (records[3:], None)]
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=1536)
+        page = store.get_all(limit=2, offset=3)
+
+        assert [m["id"] for m in page] == ["3", "4"]
+        assert page[0]["metadata"] == {"type": "idea"}
+        skip, read = (c.kwargs for c in mock_instance.scroll.call_args_list)
+        # Skipped points are fetched as IDs only; the page starts at their cursor
+        assert skip["limit"] == 3 and skip["with_payload"] is False
+        assert read["limit"] == 2 and read["offset"] == 3
+        assert read["with_payload"].exclude == ["embedding"]
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_search_texts_fetches_text_only(self, mock_settings, mock_client):
+        """Test search_texts requests only the text payload and stops below threshold."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=False,
+        )
+
+        hits = [
+            MagicMock(id=1, score=0.9, payload={"text": "close"}),
+            MagicMock(id=2, score=0.5, payload={"text": "far"}),
+        ]
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.query_points.return_value = MagicMock(points=hits)
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+
+        assert store.search_texts([1.0, 0.0], top_k=2, score_threshold=0.7) == ["close"]
+        kwargs = mock_instance.query_points.call_args.kwargs
+        assert kwargs["with_payload"].include == ["text"]
+
+    @patch("app.rag.qdrant_store.AsyncQdrantClient")
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_clients_prefer_grpc_and_asearch_awaits(self, mock_settings, mock_client, mock_aclient):
+        """Test both clients use gRPC and asearch goes through the async client."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_grpc_port=6334,
+            qdrant_prefer_grpc=True,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=False,
+        )
+
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_client.return_value = mock_instance
+        hit = MagicMock(id=7, score=0.9, payload={"text": "idea", "type": "idea"})
+        mock_aclient.return_value.query_points = AsyncMock(return_value=MagicMock(points=[hit]))
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+        results = asyncio.run(store.asearch([1.0, 0.0], top_k=1, score_threshold=0.5))
+
+        assert mock_client.call_args.kwargs["prefer_grpc"] is True
+        assert mock_aclient.call_args.kwargs["prefer_grpc"] is True
+        assert results == [{"id": "7", "text": "idea", "score": 0.9, "metadata": {"type": "idea"}}]
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_default_search_fast_path(self, mock_settings, mock_client):
+        """Test a default search uses the defaults snapshotted at construction."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=False,
+            rag_top_k=4,
+            rag_score_threshold=0.6,
+        )
+
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.query_points.return_value = MagicMock(points=[])
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+        mock_settings.reset_mock()
+        store.search([1.0, 0.0])
+
+        mock_settings.assert_not_called()
+        kwargs = mock_instance.query_points.call_args.kwargs
+        assert (kwargs["limit"], kwargs["score_threshold"]) == (4, 0.6)
+        assert "query_filter" not in kwargs
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_bulk_add_batch_pauses_indexing(self, mock_settings, mock_client):
+        """Test bulk ingestion disables indexing and restores the previous threshold."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=False,
+        )
+
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.get_collection.return_value.config.optimizer_config.indexing_threshold = 5000
+        mock_instance.upsert.side_effect = lambda **kwargs: mock_instance.update_collection.assert_called_once()
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+        store.add_batch([[1.0, 0.0], [0.0, 1.0]], ["a", "b"], bulk=True)
+
+        thresholds = [
+            c.kwargs["optimizers_config"].indexing_threshold
+            for c in mock_instance.update_collection.call_args_list
+        ]
+        assert thresholds == [0, 5000]
+        mock_instance.upsert.assert_called_once()
+
+        # Nested sections pause once, and a leftover 0 restores the default
+        from app.rag.qdrant_store import DEFAULT_INDEXING_THRESHOLD
+
+        mock_instance.update_collection.reset_mock()
+        mock_instance.get_collection.return_value.config.optimizer_config.indexing_threshold = 0
+        with store.bulk_indexing():
+            with store.bulk_indexing():
+                pass
+            assert mock_instance.update_collection.call_count == 1
+        assert mock_instance.update_collection.call_args.kwargs[
+            "optimizers_config"
+        ].indexing_threshold == DEFAULT_INDEXING_THRESHOLD
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_collection_info_cached_until_write(self, mock_settings, mock_client):
+        """Test count and health share one get_collection call until a write."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=False,
+            collection_info_ttl_s=60,
+        )
+
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.get_collection.return_value = MagicMock(points_count=3)
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+        assert store.count() == 3
+        assert store.health_check()["points_count"] == 3
+        assert mock_instance.get_collection.call_count == 1
+
+        store.add([1.0, 0.0], "New idea")
+        store.count()
+        assert mock_instance.get_collection.call_count == 2
+
+    def test_build_points(self):
+        """Test batch points share a timestamp, merge metadata and take list vectors."""
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        doc_ids, points = QdrantVectorStore._build_points(
+            [np.array([0.6, 0.8], dtype=np.float32), [1.0, 0.0]],
+            ["a", "b"],
+            [{"source": "x"}, None],
+        )
+
+        assert doc_ids == [str(p.id) for p in points]
+        assert points[0].vector == pytest.approx([0.6, 0.8])
+        assert points[0].payload["source"] == "x"
+        assert points[1].payload.keys() == {"text", "created_at"}
+        assert points[0].payload["created_at"] == points[1].payload["created_at"]
+
+    @patch("app.rag.qdrant_store.QdrantClient")
+    @patch("app.rag.qdrant_store.get_settings")
+    def test_inmemory_search(self, mock_settings, mock_client):
+        """Test small collections are mirrored and searched without Qdrant queries."""
+        mock_settings.return_value = MagicMock(
+            qdrant_host="localhost",
+            qdrant_port=6333,
+            qdrant_api_key="",
+            qdrant_collection_name="test",
+            active_embedding_dim=2,
+            rag_inmemory_fallback=True,
+            rag_inmemory_max_points=100,
+            collection_info_ttl_s=2,
+            rag_top_k=5,
+            rag_score_threshold=0.7,
+        )
+
+        mock_instance = MagicMock()
+        mock_instance.get_collections.return_value = MagicMock(collections=[])
+        mock_instance.get_collection.return_value = MagicMock(points_count=1)
+        mock_instance.scroll.return_value = (
+            [MagicMock(id=1, vector=[1.0, 0.0], payload={"text": "Old idea"})],
+            None,
+        )
+        mock_client.return_value = mock_instance
+
+        from app.rag.qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore(collection_name="test", embedding_dim=2)
+        new_id = store.add([0.0, 1.0], "New idea")
+
+        assert store.search_texts([0.9, 0.1]) == ["Old idea"]
+        assert store.search_texts([0.1, 0.9]) == ["New idea"]
+        store.delete(new_id)
+        assert store.search_texts([0.1, 0.9]) == []
+        mock_instance.query_points.assert_not_called()
+
+
+class TestMemoryRoutes:
+    """Test cases for conditional GETs on the memory debug routes"""
+
+    @patch("app.api.routes.ideas.get_all_memories")
+    def test_read_memory_etag(self, mock_memories):
+        """Test a matching If-None-Match returns 304 without a body."""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        mock_memories.return_value = [
+            {"id": "1", "text": "call mom", "metadata": {"created_at": "2026-01-01T00:00:00"}},
+        ]
+        client = TestClient(app)
+
+        first = client.get("/ideas/memory")
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "private, max-age=10"
+
+        second = client.get("/ideas/memory", headers={"If-None-Match": first.headers["etag"]})
+        assert second.status_code == 304
+        assert second.content == b""
+
+        mock_memories.return_value = []
+        third = client.get("/ideas/memory", headers={"If-None-Match": first.headers["etag"]})
+        assert third.status_code == 200
+
+    @patch("app.api.routes.ideas.get_all_memories")
+    def test_errors_mapped_by_global_handlers(self, mock_memories):
+        """Test RAG errors map to 503 by type and anything else to a generic 500."""
+        from fastapi.testclient import TestClient
+        from app.core.exceptions import VectorStoreError
+        from app.main import app
+
+        client = TestClient(app, raise_server_exceptions=False)
+
+        mock_memories.side_effect = VectorStoreError("Qdrant down")
+        response = client.get("/ideas/memory")
+        assert response.status_code == 503
+        assert response.json() == {"error": "vector_store_error", "message": "Qdrant down", "details": {}}
+
+        mock_memories.side_effect = KeyError("boom")
+        response = client.get("/ideas/memory")
+        assert response.status_code == 500
+        assert response.json()["error"] == "internal_error"
+
+
+class TestResponseCache:
+    """Test cases for response_cache.py"""
+
+    def test_hit_returns_copy(self):
+        """Test cached responses are returned as independent copies."""
+        from app.core.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        key = cache.make_key("idea", "call mom", True)
+        assert cache.get(key) is None
+
+        cache.set(key, {"clean_note": "Call mom", "themes": ["family"]})
+        hit = cache.get(key)
+        hit["themes"].append("mutated")
+
+        assert cache.get(key)["themes"] == ["family"]
+        assert cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+    def test_invalidate_doc(self):
+        """Test only entries referencing the deleted memory are dropped."""
+        from app.core.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.set("a", {"memory_id": "doc-1"})
+        cache.set("b", {"memory_id": "doc-2"})
+
+        assert cache.invalidate_doc("doc-1") == 1
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
@@ -0,0 +1,80 @@
+"""
+Tests for the application import graph.
+Guards against duplicate app, router or middleware definitions.
+"""
+import gc
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+
+
+def _api_routes(routes, prefix=""):
+    """Yield (full_path, route) pairs, descending into included routers."""
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield prefix + route.path, route
+        elif hasattr(route, "original_router"):
+            yield from _api_routes(
+                route.original_router.routes,
+                prefix + route.include_context.prefix,
+            )
+
+
+class TestImportGraph:
+    """Test cases for app wiring in main.py and router.py"""
+
+    def test_single_app_instance(self):
+        """Test importing app.main creates exactly one FastAPI app."""
+        import app.main
+
+        apps = [obj for obj in gc.get_objects() if isinstance(obj, FastAPI)]
+
+        assert apps == [app.main.app]
+
+    def test_one_router_module_per_prefix(self):
+        """Test each route prefix is served by a single routes module."""
+        from app.main import app
+
+        modules_by_prefix: dict[str, set[str]] = {}
+        for path, route in _api_routes(app.routes):
+            if path.count("/") > 1:
+                prefix = "/" + path.split("/")[1]
+                modules_by_prefix.setdefault(prefix, set()).add(route.endpoint.__module__)
+
+        assert modules_by_prefix == {
+            "/ideas": {"app.api.routes.ideas"},
+            "/tasks": {"app.api.routes.tasks"},
+        }
+
+    def test_no_duplicate_routes(self):
+        """Test no method/path pair is registered twice."""
+        from app.main import app
+
+        seen = set()
+        for path, route in _api_routes(app.routes):
+            for method in route.methods:
+                key = (method, path)
+                assert key not in seen, key
+                seen.add(key)
+
+        assert ("POST", "/ideas/") in seen
+        assert ("POST", "/tasks/extract") in seen
+
+    def test_json_routes_declare_response_models(self):
+        """Test every JSON route has a response model so FastAPI serializes via Pydantic."""
+        from app.main import app
+
+        for path, route in _api_routes(app.routes):
+            if route.response_class is StreamingResponse:
+                continue
+            assert route.response_model is not None, path
+
+    def test_cors_middleware_added_once(self):
+        """Test CORS middleware is registered a single time."""
+        from app.main import app
+
+        cors = [m for m in app.user_middleware if m.cls is CORSMiddleware]
+
+        assert len(cors) == 1